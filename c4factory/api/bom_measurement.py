@@ -0,0 +1,123 @@
+from __future__ import annotations
+
+import frappe
+from frappe.utils import cint, flt
+
+# measurement type -> (dimensions it needs, quantity per finished unit)
+MEASUREMENT_FORMULAS = {
+    "area": (("width", "height"), lambda w, h, d: w * h),
+    "perimeter": (("width", "height"), lambda w, h, d: 2 * (w + h)),
+    "value": (("width", "height", "depth"), lambda w, h, d: w * h * d),
+}
+
+
+@frappe.whitelist()
+def get_bom_measurement_quantities(
+    rows,
+    width=None,
+    height=None,
+    depth=None,
+    quantity=None,
+    overwrite=0,
+) -> list[dict]:
+    """
+    Quantities of BOM Item rows measured by area, perimeter or value.
+
+    ``rows`` is a list of {name, item_code, qty}. The measurement metadata of
+    every item is read with one query and every row is computed from the BOM
+    header width, height and depth (times the BOM quantity) in one pass.
+
+    Each result row carries the technical UOM with its conversion factor, the
+    Item's stock UOM and, when the row is measured, either the new ``qty`` or
+    the ``missing`` dimensions. A technical UOM the Item has no conversion
+    row for is flagged ``conversion_missing`` and gets no quantity.
+    A row that already has a quantity keeps it unless ``overwrite`` is set.
+    """
+    rows = frappe.parse_json(rows) or []
+    dimensions = {"width": flt(width), "height": flt(height), "depth": flt(depth)}
+    fg_qty = flt(quantity) or 1.0
+    items = _get_measurement_metadata({row.get("item_code") for row in rows})
+
+    result = []
+    for row in rows:
+        item = items.get(row.get("item_code"))
+        if not item:
+            continue
+
+        out = {
+            "name": row.get("name"),
+            "item_code": row.get("item_code"),
+            "uom": item.technical_uom,
+            "conversion_factor": item.conversion_factor,
+            "stock_uom": item.stock_uom,
+            "measurement_type": item.measurement_type,
+        }
+        result.append(out)
+
+        if item.conversion_missing:
+            out["conversion_missing"] = 1
+            continue
+
+        formula = MEASUREMENT_FORMULAS.get(item.measurement_type)
+        if not formula or (flt(row.get("qty")) > 0 and not cint(overwrite)):
+            continue
+
+        needed, compute = formula
+        missing = [dimension for dimension in needed if dimensions[dimension] <= 0]
+        if missing:
+            out["missing"] = missing
+            continue
+
+        qty = compute(dimensions["width"], dimensions["height"], dimensions["depth"]) * fg_qty
+        if qty > 0:
+            out["qty"] = round(qty, 6)
+
+    return result
+
+
+def _get_measurement_metadata(item_codes) -> dict[str, frappe._dict]:
+    item_codes = [item_code for item_code in item_codes if item_code]
+    if not item_codes:
+        return {}
+
+    meta = frappe.get_meta("Item")
+    fields = ["name", "stock_uom"]
+    for fieldname in ("custom_measurement_type", "custom_techniacl_uom"):
+        if meta.has_field(fieldname):
+            fields.append(fieldname)
+
+    items = {}
+    for item in frappe.get_all("Item", filters={"name": ["in", item_codes]}, fields=fields):
+        item.measurement_type = (item.get("custom_measurement_type") or "").strip().lower()
+        item.technical_uom = item.get("custom_techniacl_uom") or None
+        items[item.name] = item
+
+    _set_technical_uom_conversion_factors(items)
+    return items
+
+
+def _set_technical_uom_conversion_factors(items) -> None:
+    """Conversion factor of each Item's technical UOM from its UOM table, in one query."""
+    technical = {item.name: item for item in items.values() if item.technical_uom}
+    factors = {}
+    if technical:
+        for row in frappe.get_all(
+            "UOM Conversion Detail",
+            filters={
+                "parenttype": "Item",
+                "parent": ["in", list(technical)],
+                "uom": ["in", list({item.technical_uom for item in technical.values()})],
+            },
+            fields=["parent", "uom", "conversion_factor"],
+        ):
+            factors[(row.parent, row.uom)] = flt(row.conversion_factor)
+
+    for item in items.values():
+        item.conversion_missing = False
+        if not item.technical_uom:
+            item.conversion_factor = None
+        elif item.technical_uom == item.stock_uom:
+            item.conversion_factor = 1.0
+        else:
+            item.conversion_factor = factors.get((item.name, item.technical_uom)) or None
+            item.conversion_missing = not item.conversion_factor
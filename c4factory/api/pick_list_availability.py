@@ -0,0 +1,211 @@
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from c4factory.c4_manufacturing.stock_netting import allocate_by_priority
+from c4factory.c4factory.doctype.c4factory_settings.c4factory_settings import (
+    get_c4factory_setting,
+)
+
+
+def is_availability_check_enabled() -> bool:
+    return bool(cint(get_c4factory_setting("check_pick_list_availability", 0)))
+
+
+def get_bin_availability(pairs) -> dict[tuple[str, str], frappe._dict]:
+    """
+    Read Bin quantities for many (item_code, warehouse) pairs in one query.
+
+    Available qty is actual stock less the quantity reserved against Sales
+    Orders; pairs without a Bin have nothing available.
+    """
+    pairs = sorted({(item_code, warehouse) for item_code, warehouse in pairs if item_code and warehouse})
+    if not pairs:
+        return {}
+
+    bins = {}
+    for row in frappe.db.sql(
+        """
+        SELECT item_code, warehouse, actual_qty, reserved_qty
+        FROM `tabBin`
+        WHERE (item_code, warehouse) IN %(pairs)s
+        """,
+        {"pairs": tuple(pairs)},
+        as_dict=True,
+    ):
+        row.available_qty = max(flt(row.actual_qty) - flt(row.reserved_qty), 0.0)
+        bins[(row.item_code, row.warehouse)] = row
+
+    return bins
+
+
+def check_rows_availability(rows) -> list[frappe._dict]:
+    """
+    Net demand rows against Bin stock, earlier rows first.
+
+    ``rows`` are dicts with item_code, warehouse and qty. Rows drawing on the
+    same Bin share it, so the second Pick List does not count stock that the
+    first one already needs. Returns copies with actual_qty, reserved_qty,
+    available_qty (free when the row is served) and shortage_qty.
+    """
+    rows = [frappe._dict(row) for row in rows]
+    bins = get_bin_availability((row.item_code, row.warehouse) for row in rows)
+
+    supply_index = {}
+    supply_available = []
+    demand_supply = []
+    for row in rows:
+        key = (row.item_code, row.warehouse)
+        if key not in supply_index:
+            supply_index[key] = len(supply_available)
+            supply_available.append(flt((bins.get(key) or {}).get("available_qty")))
+        demand_supply.append([supply_index[key]])
+
+    before, allotted = allocate_by_priority(
+        supply_available, [flt(row.qty) for row in rows], demand_supply
+    )
+
+    for index, row in enumerate(rows):
+        bin_row = bins.get((row.item_code, row.warehouse)) or {}
+        row.actual_qty = flt(bin_row.get("actual_qty"))
+        row.reserved_qty = flt(bin_row.get("reserved_qty"))
+        row.available_qty = before[index][0] if before[index] else 0.0
+        row.shortage_qty = max(flt(row.qty) - sum(allotted[index]), 0.0)
+
+    return rows
+
+
+def annotate_pick_list_availability(doc) -> None:
+    """Pick List validate: show available and short quantities on each row."""
+    if not is_availability_check_enabled() or not doc.get("work_order"):
+        return
+
+    locations = doc.get("locations") or []
+    checked = check_rows_availability(
+        {
+            "item_code": row.item_code,
+            "warehouse": row.warehouse,
+            "qty": flt(row.get("custom_pl_qty")) or flt(row.qty),
+        }
+        for row in locations
+    )
+
+    for row, result in zip(locations, checked, strict=True):
+        if row.meta.has_field("custom_available_qty"):
+            row.custom_available_qty = result.available_qty
+        if row.meta.has_field("custom_shortage_qty"):
+            row.custom_shortage_qty = result.shortage_qty
+
+
+def validate_transfer_availability(pl_rows_and_qty) -> None:
+    """
+    Reject a partial transfer up front when its source stock is short.
+
+    All shortfalls are reported together instead of one failed submit at a time.
+    """
+    if not is_availability_check_enabled():
+        return
+
+    checked = check_rows_availability(
+        {"item_code": pl_row.item_code, "warehouse": pl_row.warehouse, "qty": qty}
+        for pl_row, qty in pl_rows_and_qty
+    )
+    short = [
+        _("{0} in {1}: short by {2}").format(row.item_code, row.warehouse, flt(row.shortage_qty, 3))
+        for row in checked
+        if row.shortage_qty > 0.000001
+    ]
+    if short:
+        frappe.throw(
+            "<br>".join([_("Not enough stock to transfer:"), *short]),
+            title=_("Insufficient Stock"),
+        )
+
+
+@frappe.whitelist()
+def get_pick_list_availability(pick_lists: str | list) -> list[dict]:
+    """
+    Availability of the open rows of one or many Pick Lists.
+
+    Submitted Pick Lists are checked for their untransferred balance, drafts
+    for their full quantity. Pick Lists are served in the given order.
+    """
+    from c4factory.api.work_order_flow import _get_pick_list_balances_map
+
+    rows = []
+    for pick_list in _parse_pick_lists(pick_lists):
+        pl = frappe.get_doc("Pick List", pick_list)
+        pl.check_permission("read")
+
+        balances = _get_pick_list_balances_map(pl) if pl.docstatus == 1 else {}
+        for location in pl.get("locations") or []:
+            if pl.docstatus == 1:
+                qty = flt((balances.get(location.name) or {}).get("balance"))
+            else:
+                qty = flt(location.get("custom_pl_qty")) or flt(location.qty)
+
+            if qty <= 0.000001:
+                continue
+
+            rows.append(
+                {
+                    "pick_list": pl.name,
+                    "pick_list_item": location.name,
+                    "work_order": pl.get("work_order"),
+                    "company": pl.company,
+                    "item_code": location.item_code,
+                    "item_name": location.item_name,
+                    "uom": location.get("stock_uom") or location.get("uom"),
+                    "warehouse": location.warehouse,
+                    "qty": qty,
+                }
+            )
+
+    return check_rows_availability(rows)
+
+
+@frappe.whitelist()
+def make_material_request_for_shortages(
+    pick_lists: str | list,
+    material_request_type: str = "Purchase",
+) -> str:
+    """Create one Material Request for the combined shortfall of the Pick Lists."""
+    from c4factory.api.planning_reports import (
+        create_material_request_from_total_materials,
+    )
+
+    shortages = {}
+    company = None
+    for row in get_pick_list_availability(pick_lists):
+        if row.shortage_qty <= 0.000001:
+            continue
+
+        company = company or row.company
+        key = (row.item_code, row.warehouse)
+        if key not in shortages:
+            shortages[key] = {
+                "item_code": row.item_code,
+                "item_name": row.item_name,
+                "uom": row.uom,
+                "warehouse": row.warehouse,
+                "to_request": 0.0,
+            }
+        shortages[key]["to_request"] += row.shortage_qty
+
+    if not shortages:
+        frappe.throw(_("All Pick List materials are available in their source warehouses."))
+
+    return create_material_request_from_total_materials(
+        list(shortages.values()),
+        company=company,
+        material_request_type=material_request_type,
+    )
+
+
+def _parse_pick_lists(pick_lists) -> list[str]:
+    if isinstance(pick_lists, str):
+        pick_lists = frappe.parse_json(pick_lists) if pick_lists.startswith("[") else [pick_lists]
+
+    return list(dict.fromkeys(name for name in pick_lists or [] if name))
@@ -0,0 +1,266 @@
+from __future__ import annotations
+
+import hashlib
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt
+
+from c4factory.api.work_order_flow import (
+    _get_pick_list_balances_map,
+    _get_wo_transfer_state_stamp,
+)
+
+WORK_ORDER_SUMMARY_FIELDS = (
+    "status",
+    "docstatus",
+    "qty",
+    "produced_qty",
+    "material_transferred_for_manufacturing",
+    "custom_disable_operation",
+    "c4_raw_material_cost",
+    "c4_scrap_material_cost",
+    "c4_operating_cost",
+    "c4_total_cost",
+)
+
+
+@frappe.whitelist()
+def get_pick_list_workspace(pick_list: str, etag: str | None = None) -> dict:
+    """
+    Everything the Pick List form shows in one payload: row balances, Work
+    Order summary, operation flag, Sub Pick Lists with balances, Job Card
+    summary and operation cost.
+
+    ``etag`` (or an If-None-Match header) is the tag of a payload the client
+    already holds; when nothing behind it changed only
+    ``{"etag": ..., "not_modified": 1}`` is returned.
+    """
+    pl = frappe.get_doc("Pick List", pick_list)
+    pl.check_permission("read")
+
+    current = get_pick_list_workspace_etag(pl)
+    if (etag or frappe.get_request_header("If-None-Match") or "").strip('"') == current:
+        return {"etag": current, "not_modified": 1}
+
+    work_order = _get_work_order_summary(pl.get("work_order"))
+    return {
+        "etag": current,
+        "not_modified": 0,
+        "pick_list": {
+            "name": pl.name,
+            "status": pl.status,
+            "docstatus": pl.docstatus,
+            "work_order": pl.get("work_order"),
+            "manually_completed": cint(pl.get("custom_manually_completed")),
+        },
+        "rows": _get_row_balances(pl),
+        "work_order": work_order,
+        "operation_disabled": bool(work_order and cint(work_order.get("custom_disable_operation"))),
+        "sub_pick_lists": _get_sub_pick_lists(pl),
+        "job_cards": _get_job_card_summary(pl.name),
+        "operation_cost": flt(pl.get("custom_operation_cost")),
+    }
+
+
+def get_pick_list_workspace_etag(pl) -> str:
+    """
+    Checksum of everything the workspace payload is built from.
+
+    The Pick List itself, its Sub Pick Lists and Job Cards, and the transfer
+    stamp of its Work Order, which moves with every Stock Entry or Pick List
+    of the Work Order.
+    """
+    params = {"pl": pl.name, "wo": pl.get("work_order") or ""}
+    job_card_query = "SELECT NULL"
+    if frappe.get_meta("Job Card").has_field("custom_pick_list"):
+        job_card_query = """
+            SELECT CONCAT_WS('/', COUNT(*), SUM(docstatus), MAX(modified))
+            FROM `tabJob Card` WHERE custom_pick_list = %(pl)s
+        """
+
+    state = frappe.db.sql(
+        f"""
+        SELECT
+            (SELECT CONCAT_WS('/', COUNT(*), SUM(docstatus), MAX(modified))
+             FROM `tabSub Pick List` WHERE main_pick_list = %(pl)s),
+            ({job_card_query}),
+            (SELECT CONCAT_WS('/', modified, custom_disable_operation)
+             FROM `tabWork Order` WHERE name = %(wo)s)
+        """,
+        params,
+    )
+    wo_stamp = _get_wo_transfer_state_stamp(pl.work_order) if pl.get("work_order") else ""
+    # custom_operation_cost is written without touching modified
+    own = (str(pl.modified), pl.status, flt(pl.get("custom_operation_cost")))
+    return hashlib.md5(repr((own, state, wo_stamp)).encode()).hexdigest()
+
+
+def _get_row_balances(pl) -> list[dict]:
+    if pl.docstatus != 1:
+        return []
+
+    return [
+        {
+            "pl_item_name": pl_item_name,
+            "item_code": info.get("item_code"),
+            "item_name": info.get("item_name"),
+            "pl_qty": flt(info.get("pl_qty")),
+            "transferred": flt(info.get("transferred")),
+            "balance": flt(info.get("balance")),
+        }
+        for pl_item_name, info in _get_pick_list_balances_map(pl).items()
+    ]
+
+
+def _get_work_order_summary(wo_name: str | None) -> dict | None:
+    if not wo_name:
+        return None
+
+    meta = frappe.get_meta("Work Order")
+    fields = [
+        fieldname
+        for fieldname in WORK_ORDER_SUMMARY_FIELDS
+        if fieldname == "docstatus" or meta.has_field(fieldname)
+    ]
+    values = frappe.db.get_value("Work Order", wo_name, ["name", *fields], as_dict=True)
+    return dict(values) if values else None
+
+
+def _get_sub_pick_lists(pl) -> list[dict]:
+    if not pl.get("work_order") or not frappe.has_permission("Sub Pick List", "read"):
+        return []
+
+    from c4factory.c4factory.doctype.sub_pick_list.sub_pick_list import (
+        get_work_order_additional_materials,
+    )
+
+    return get_work_order_additional_materials(
+        work_order=pl.work_order, pick_list=pl.name
+    )["sub_pick_lists"]
+
+
+def _get_job_card_summary(pl_name: str) -> dict:
+    summary = {"count": 0, "by_status": {}, "for_quantity": 0.0, "completed_qty": 0.0}
+    jc_meta = frappe.get_meta("Job Card")
+    if not jc_meta.has_field("custom_pick_list"):
+        return summary
+
+    has_for_quantity = jc_meta.has_field("for_quantity")
+    has_completed_qty = jc_meta.has_field("total_completed_qty")
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            status,
+            COUNT(*) AS count,
+            {"SUM(for_quantity)" if has_for_quantity else "0"} AS for_quantity,
+            {"SUM(total_completed_qty)" if has_completed_qty else "0"} AS completed_qty
+        FROM `tabJob Card`
+        WHERE custom_pick_list = %(pl)s
+          AND docstatus < 2
+        GROUP BY status
+        """,
+        {"pl": pl_name},
+        as_dict=True,
+    )
+
+    for row in rows:
+        summary["count"] += cint(row.count)
+        summary["by_status"][row.status or ""] = cint(row.count)
+        summary["for_quantity"] += flt(row.for_quantity)
+        summary["completed_qty"] += flt(row.completed_qty)
+
+    return summary
+
+
+@frappe.whitelist()
+def get_pick_list_scan_index(pick_list: str) -> dict:
+    """
+    Barcode index of the open rows of a submitted Pick List for scan mode.
+
+    ``index`` maps every item code, item barcode and batch number to the open
+    rows it can fill, in row order; ``serials`` maps a serial number to its
+    row and ``batches`` marks which codes are batch numbers. One scan adds one
+    unit, so the client resolves and checks scans against
+    ``rows[...].balance`` without calling the server.
+    """
+    pl = frappe.get_doc("Pick List", pick_list)
+    pl.check_permission("read")
+    if pl.docstatus != 1:
+        frappe.throw(_("Pick List {0} must be submitted").format(pl.name))
+
+    balances = _get_pick_list_balances_map(pl)
+    open_rows = [
+        row
+        for row in pl.get("locations") or []
+        if flt((balances.get(row.name) or {}).get("balance")) > 0.000001
+    ]
+
+    rows = {}
+    index = {}
+    serials = {}
+    batches = {}
+    for row in open_rows:
+        rows[row.name] = {
+            "item_code": row.item_code,
+            "item_name": row.item_name,
+            "batch_no": row.get("batch_no"),
+            "warehouse": row.warehouse,
+            "balance": flt(balances[row.name]["balance"]),
+        }
+        _add_to_index(index, row.item_code, row.name)
+        if row.get("batch_no"):
+            _add_to_index(index, row.batch_no, row.name)
+            batches[row.batch_no] = 1
+        for serial_no in (row.get("serial_no") or "").split("\n"):
+            if serial_no.strip():
+                serials[serial_no.strip()] = row.name
+
+    rows_by_item = {}
+    for row in open_rows:
+        rows_by_item.setdefault(row.item_code, []).append(row.name)
+
+    if rows_by_item:
+        for barcode, item_code in frappe.get_all(
+            "Item Barcode",
+            filters={"parenttype": "Item", "parent": ["in", list(rows_by_item)]},
+            fields=["barcode", "parent"],
+            as_list=True,
+        ):
+            for pl_item_name in rows_by_item[item_code]:
+                _add_to_index(index, barcode, pl_item_name)
+
+    _add_bundle_entries(open_rows, index, serials, batches)
+    return {"pick_list": pl.name, "rows": rows, "index": index, "serials": serials, "batches": batches}
+
+
+def _add_to_index(index: dict, key: str | None, pl_item_name: str) -> None:
+    if not key:
+        return
+
+    names = index.setdefault(key, [])
+    if pl_item_name not in names:
+        names.append(pl_item_name)
+
+
+def _add_bundle_entries(open_rows, index: dict, serials: dict, batches: dict) -> None:
+    """Batches and serials reserved on the rows through Serial and Batch Bundles."""
+    bundles = {
+        row.get("serial_and_batch_bundle"): row.name
+        for row in open_rows
+        if row.get("serial_and_batch_bundle")
+    }
+    if not bundles:
+        return
+
+    for entry in frappe.get_all(
+        "Serial and Batch Entry",
+        filters={"parent": ["in", list(bundles)]},
+        fields=["parent", "serial_no", "batch_no"],
+    ):
+        pl_item_name = bundles[entry.parent]
+        if entry.serial_no:
+            serials[entry.serial_no] = pl_item_name
+        if entry.batch_no:
+            batches[entry.batch_no] = 1
+        _add_to_index(index, entry.batch_no, pl_item_name)
@@ -1,6 +1,8 @@
 import frappe
 from frappe import _
 
+from c4factory.c4_manufacturing.bom_index import get_default_boms
+
 
 @frappe.whitelist()
 def create_plan_bom_request(rows):
@@ -13,6 +15,8 @@ def create_plan_bom_request(rows):
 	if doc.meta.has_field("date"):
 		doc.date = frappe.utils.nowdate()
 
+	default_boms = get_default_boms(row.get("item_code") for row in rows if not row.get("bom_no"))
+
 	for row in rows:
 		sales_order = row.get("name")
 		item_code = row.get("item_code")
@@ -20,11 +24,7 @@ def create_plan_bom_request(rows):
 		if not sales_order or not item_code:
 			continue
 
-		bom_no = row.get("bom_no") or frappe.db.get_value(
-			"BOM",
-			{"item": item_code, "is_default": 1, "is_active": 1},
-			"name",
-		)
+		bom_no = row.get("bom_no") or default_boms.get(item_code)
 
 		item_description = frappe.db.get_value("Item", item_code, "description")
 
@@ -76,6 +76,7 @@ def create_production_plan_from_operation_status(rows):
 	items_table = _get_production_plan_items_table(pp)
 	items_doctype = pp.meta.get_field(items_table).options
 	items_meta = frappe.get_meta(items_doctype)
+	default_boms = get_default_boms(row.get("item_code") for row in rows if not row.get("bom_no"))
 
 	for row in rows:
 		sales_order = row.get("name")
@@ -83,11 +84,7 @@ def create_production_plan_from_operation_status(rows):
 		if not item_code:
 			continue
 
-		bom_no = row.get("bom_no") or frappe.db.get_value(
-			"BOM",
-			{"item": item_code, "is_default": 1, "is_active": 1},
-			"name",
-		)
+		bom_no = row.get("bom_no") or default_boms.get(item_code)
 
 		child = pp.append(items_table, {})
 		_set_if_present(child, items_meta, "item_code" if items_meta.has_field("item_code") else "item", item_code)
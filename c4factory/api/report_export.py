@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+import csv
+import os
+
+import frappe
+from frappe import _
+from frappe.utils import add_days, cstr, now_datetime
+
+# Reports that can be exported in the background. Each module provides
+# get_columns() and iter_data(filters), which yields rows one at a time.
+EXPORTABLE_REPORTS = {
+    "C4 Production Planning Report": (
+        "c4factory.c4factory.report.c4_production_planning_report."
+        "c4_production_planning_report"
+    ),
+    "Manufacture Plan": "c4factory.c4factory.report.manufacture_plan.manufacture_plan",
+    "Operation Status": "c4factory.c4factory.report.operation_status.operation_status",
+}
+
+EXPORT_FORMATS = ("CSV", "Excel")
+EXPORT_CHUNK_SIZE = 1000
+EXPORT_READY_EVENT = "c4_report_export_ready"
+EXPORT_RETENTION_DAYS = 7
+
+
+@frappe.whitelist()
+def enqueue_report_export(
+    report_name: str,
+    filters: str | dict | None = None,
+    file_format: str = "CSV",
+) -> dict:
+    """
+    Queue a streaming export of a planning report.
+
+    The job writes rows straight to a private file while they are read, so the
+    worker memory does not grow with the size of the report. The user gets a
+    realtime notification with the file URL when it is done.
+    """
+    if report_name not in EXPORTABLE_REPORTS:
+        frappe.throw(_("Report {0} does not support background export").format(report_name))
+
+    if file_format not in EXPORT_FORMATS:
+        frappe.throw(_("Unsupported export format {0}").format(file_format))
+
+    frappe.get_doc("Report", report_name).check_permission("read")
+    if not frappe.has_permission("Report", "export"):
+        frappe.throw(_("Not permitted to export reports"), frappe.PermissionError)
+
+    job = frappe.enqueue(
+        "c4factory.api.report_export.export_report",
+        queue="long",
+        timeout=3600,
+        report_name=report_name,
+        filters=frappe.parse_json(filters) if filters else {},
+        file_format=file_format,
+        user=frappe.session.user,
+        enqueue_after_commit=True,
+    )
+    return {"job_id": getattr(job, "id", None), "report_name": report_name}
+
+
+def export_report(
+    report_name: str,
+    filters: dict | None = None,
+    file_format: str = "CSV",
+    user: str | None = None,
+) -> str | None:
+    """Background job: stream one report into a private File and notify the user."""
+    module = frappe.get_module(EXPORTABLE_REPORTS[report_name])
+    filters = frappe._dict(filters or {})
+    columns = _get_export_columns(module, filters)
+
+    extension = "xlsx" if file_format == "Excel" else "csv"
+    file_name = "{}-{}.{}".format(
+        frappe.scrub(report_name),
+        now_datetime().strftime("%Y%m%d-%H%M%S"),
+        extension,
+    )
+    file_path = frappe.get_site_path("private", "files", file_name)
+
+    try:
+        rows = module.iter_data(filters)
+        if extension == "xlsx":
+            row_count = _write_xlsx(file_path, report_name, columns, rows)
+        else:
+            row_count = _write_csv(file_path, columns, rows)
+
+        file_doc = frappe.get_doc(
+            {
+                "doctype": "File",
+                "file_name": file_name,
+                "file_url": f"/private/files/{file_name}",
+                "is_private": 1,
+                "attached_to_doctype": "Report",
+                "attached_to_name": report_name,
+            }
+        )
+        file_doc.flags.ignore_permissions = True
+        file_doc.insert()
+        frappe.db.commit()
+    except Exception:
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        frappe.log_error(frappe.get_traceback(), f"C4Factory: report export failed ({report_name})")
+        _notify(user, report_name, error=_("Export of {0} failed").format(report_name))
+        return None
+
+    _notify(user, report_name, file_url=file_doc.file_url, row_count=row_count)
+    return file_doc.file_url
+
+
+def purge_old_report_exports() -> None:
+    """Scheduled daily: delete export files older than EXPORT_RETENTION_DAYS."""
+    for report_name in EXPORTABLE_REPORTS:
+        for file_name in frappe.get_all(
+            "File",
+            filters={
+                "attached_to_doctype": "Report",
+                "attached_to_name": report_name,
+                "is_private": 1,
+                "file_name": ["like", f"{frappe.scrub(report_name)}-%"],
+                "creation": ["<", add_days(now_datetime(), -EXPORT_RETENTION_DAYS)],
+            },
+            pluck="name",
+        ):
+            try:
+                frappe.delete_doc("File", file_name, ignore_permissions=True)
+                frappe.db.commit()
+            except Exception:
+                frappe.db.rollback()
+                frappe.log_error(frappe.get_traceback(), f"C4Factory: report export purge failed ({file_name})")
+
+
+def _get_export_columns(module, filters) -> list[dict]:
+    try:
+        columns = module.get_columns(filters)
+    except TypeError:
+        columns = module.get_columns()
+
+    return [
+        column
+        for column in columns
+        if isinstance(column, dict) and column.get("fieldname")
+    ]
+
+
+def _get_row_values(columns, row) -> list:
+    return [row.get(column["fieldname"]) for column in columns]
+
+
+def _write_csv(file_path: str, columns, rows) -> int:
+    row_count = 0
+    with open(file_path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow([_(column.get("label") or column["fieldname"]) for column in columns])
+
+        chunk = []
+        for row in rows:
+            chunk.append([cstr(value) for value in _get_row_values(columns, row)])
+            if len(chunk) >= EXPORT_CHUNK_SIZE:
+                writer.writerows(chunk)
+                row_count += len(chunk)
+                chunk = []
+
+        writer.writerows(chunk)
+        row_count += len(chunk)
+
+    return row_count
+
+
+def _write_xlsx(file_path: str, report_name: str, columns, rows) -> int:
+    from openpyxl import Workbook
+
+    # write_only keeps a constant memory footprint: rows are serialized to a
+    # temporary sheet file as they are appended.
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=report_name[:31])
+    sheet.append([_(column.get("label") or column["fieldname"]) for column in columns])
+
+    row_count = 0
+    for row in rows:
+        sheet.append(
+            [
+                value if isinstance(value, int | float) or value is None else cstr(value)
+                for value in _get_row_values(columns, row)
+            ]
+        )
+        row_count += 1
+
+    workbook.save(file_path)
+    return row_count
+
+
+def _notify(user: str | None, report_name: str, **payload) -> None:
+    if not user:
+        return
+
+    frappe.publish_realtime(
+        EXPORT_READY_EVENT,
+        {"report_name": report_name, **payload},
+        user=user,
+    )
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.model import table_fields
+from frappe.utils import cint
+
+from c4factory.c4_manufacturing.recompute_batch import (
+    batched_recompute,
+    flush_deferred_recompute,
+)
+
+EVENT_DOCTYPE = "Shop Floor Event"
+MAX_EVENTS = 200
+EVENTS_PER_COMMIT = 20
+
+EVENT_TYPES = {
+    "pick_list_transfer": "Pick List Transfer",
+    "sub_pick_list_transfer": "Sub Pick List Transfer",
+    "job_card_update": "Job Card Update",
+}
+JOB_CARD_TIME_LOG_FIELDS = ("employee", "from_time", "to_time", "time_in_mins", "completed_qty")
+# Raised when another request already holds or has just written the client_id
+CLAIM_ERRORS = (frappe.DuplicateEntryError, frappe.QueryTimeoutError, frappe.QueryDeadlockError)
+
+
+@frappe.whitelist(methods=["POST"])
+def submit_shop_floor_events(events, device: str | None = None, batch_id: str | None = None) -> dict:
+    """
+    Apply a queue of shop-floor events recorded offline, in order.
+
+    Each event is {client_id, type, ...} with type one of pick_list_transfer
+    {pick_list, items: [{pl_item_name, qty}], submit}, sub_pick_list_transfer
+    {sub_pick_list, items: [{sub_pick_list_item, qty}], submit} or
+    job_card_update {job_card, values, time_logs, submit}.
+
+    Every client_id is applied once: its log row is claimed before the event
+    runs, so a repeated id, also one still in flight in another request, is
+    reported as Duplicate. Events run in savepoints and are committed every
+    EVENTS_PER_COMMIT events, so a failing event is reported without undoing
+    the others. Pick List and Work Order recomputes are deferred and run once
+    per commit.
+    """
+    events = frappe.parse_json(events) or []
+    if len(events) > MAX_EVENTS:
+        frappe.throw(_("Send at most {0} events per request").format(MAX_EVENTS))
+
+    client_ids = [event.get("client_id") for event in events]
+    if not all(client_ids):
+        frappe.throw(_("Every event needs a client_id"))
+
+    logged = {
+        row.name: row
+        for row in frappe.get_all(
+            EVENT_DOCTYPE,
+            filters={"name": ["in", client_ids]},
+            fields=["name", "status", "reference_doctype", "reference_name", "error"],
+        )
+    }
+
+    results = []
+    with batched_recompute() as deferred:
+        for index, event in enumerate(events, start=1):
+            previous = logged.get(event["client_id"])
+            if previous and previous.status == "Applied":
+                results.append(_get_result(previous, duplicate=True))
+                continue
+
+            log = _apply_event(event, previous, device, batch_id)
+            if log:
+                logged[log.name] = log
+                results.append(_get_result(log))
+            else:
+                results.append(_get_result(frappe._dict(name=event["client_id"]), duplicate=True))
+
+            if index % EVENTS_PER_COMMIT == 0:
+                flush_deferred_recompute(deferred)
+                frappe.db.commit()
+
+    frappe.db.commit()
+    return {"results": results}
+
+
+def _apply_event(event, previous, device, batch_id):
+    """Claim the event's client_id, apply it and log the result; None when it is already claimed."""
+    event_type = EVENT_TYPES.get(event.get("type"))
+    log = _claim_event(event, event_type, previous, device, batch_id)
+    if not log:
+        return None
+
+    savepoint = f"c4_shop_floor_{frappe.generate_hash(length=8)}"
+    frappe.db.savepoint(savepoint)
+
+    values = {"status": "Applied", "error": None, "reference_doctype": None, "reference_name": None}
+    try:
+        if not event_type:
+            frappe.throw(_("Unknown event type {0}").format(event.get("type")))
+
+        reference = _APPLIERS[event["type"]](event)
+        values.update(reference_doctype=reference.doctype, reference_name=reference.name)
+    except Exception as e:
+        frappe.db.rollback(save_point=savepoint)
+        frappe.clear_messages()
+        values.update(status="Failed", error=str(e) or e.__class__.__name__)
+
+    log.update(values)
+    log.save(ignore_permissions=True)
+    return log
+
+
+def _claim_event(event, event_type, previous, device, batch_id):
+    """
+    Insert (or lock, for a retried failure) the event's log row before the
+    event runs, so two requests never apply the same client_id.
+    """
+    savepoint = f"c4_shop_floor_claim_{frappe.generate_hash(length=8)}"
+    frappe.db.savepoint(savepoint)
+    try:
+        if previous:
+            log = frappe.get_doc(EVENT_DOCTYPE, previous.name, for_update=True)
+            if log.status == "Applied":
+                return None
+        else:
+            log = frappe.new_doc(EVENT_DOCTYPE)
+
+        log.update(
+            {
+                "client_id": event["client_id"],
+                "event_type": event_type,
+                "status": "Pending",
+                "device": device,
+                "batch_id": batch_id,
+                "payload": frappe.as_json(event),
+            }
+        )
+        log.save(ignore_permissions=True)
+    except CLAIM_ERRORS:
+        frappe.db.rollback(save_point=savepoint)
+        frappe.clear_messages()
+        return None
+
+    return log
+
+
+def _get_result(log, duplicate: bool = False) -> dict:
+    return {
+        "client_id": log.name,
+        "status": "Duplicate" if duplicate else log.status,
+        "reference_doctype": log.reference_doctype,
+        "reference_name": log.reference_name,
+        "error": log.error,
+    }
+
+
+def _apply_pick_list_transfer(event):
+    from c4factory.api.work_order_flow import insert_partial_stock_entry_from_pick_list
+
+    frappe.has_permission("Stock Entry", "create", throw=True)
+    se = insert_partial_stock_entry_from_pick_list(event.get("pick_list"), event.get("items") or [])
+    if cint(event.get("submit")):
+        se.submit()
+    return se
+
+
+def _apply_sub_pick_list_transfer(event):
+    from c4factory.c4factory.doctype.sub_pick_list.sub_pick_list import (
+        make_partial_stock_entry,
+    )
+
+    se_name = make_partial_stock_entry(
+        event.get("sub_pick_list"), frappe.as_json(event.get("items") or [])
+    )
+    se = frappe.get_doc("Stock Entry", se_name)
+    if cint(event.get("submit")):
+        se.submit()
+    return se
+
+
+def _apply_job_card_update(event):
+    jc = frappe.get_doc("Job Card", event.get("job_card"))
+    jc.check_permission("write")
+    if jc.docstatus != 0:
+        frappe.throw(_("Job Card {0} is not a draft").format(jc.name))
+
+    for fieldname, value in (event.get("values") or {}).items():
+        df = jc.meta.get_field(fieldname)
+        if not df or df.read_only or df.fieldtype in table_fields:
+            frappe.throw(_("Field {0} cannot be set from the shop floor").format(fieldname))
+        jc.set(fieldname, value)
+
+    for time_log in event.get("time_logs") or []:
+        jc.append(
+            "time_logs",
+            {
+                fieldname: time_log.get(fieldname)
+                for fieldname in JOB_CARD_TIME_LOG_FIELDS
+                if fieldname in time_log
+            },
+        )
+
+    if cint(event.get("submit")):
+        jc.submit()
+    else:
+        jc.save()
+    return jc
+
+
+_APPLIERS = {
+    "pick_list_transfer": _apply_pick_list_transfer,
+    "sub_pick_list_transfer": _apply_sub_pick_list_transfer,
+    "job_card_update": _apply_job_card_update,
+}
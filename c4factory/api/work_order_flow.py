@@ -1,10 +1,28 @@
 from __future__ import annotations
 
+import hashlib
+
 import frappe
 from frappe import _
 from frappe.utils import flt, nowdate
 
+from c4factory.api.pick_list_availability import (
+    annotate_pick_list_availability,
+    validate_transfer_availability,
+)
+from c4factory.c4_manufacturing.legacy_pick_list_links import (
+    legacy_pick_list_links_pending,
+)
+from c4factory.c4_manufacturing.progress_events import (
+    queue_pick_list_progress,
+    queue_work_order_progress,
+)
+from c4factory.c4_manufacturing.recompute_batch import defer_recompute
+from c4factory.c4_manufacturing.work_order_freeze import is_work_order_frozen
 from c4factory.c4_manufacturing.work_order_hooks import get_default_source_warehouse
+from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+    cost_snapshot_reference,
+)
 
 
 # ================================================================
@@ -71,10 +89,14 @@ def on_work_order_submit(doc, method=None):
 # ================================================================
 
 
-def _get_pick_list_balances_map(pl_doc_or_name):
+def _get_pick_list_balances_map(pl_doc_or_name, transferred_rows=None, unlinked_rows=None):
     """
     Build a balance map for each Pick List Item row.
 
+    ``transferred_rows`` (custom_pick_list_item, total_qty) and
+    ``unlinked_rows`` (item_code, total_qty) let batch callers pass grouped
+    Stock Entry quantities they read for many Pick Lists at once.
+
     Returns dict:
       {
         "<pl_item_name>": {
@@ -112,20 +134,21 @@ def _get_pick_list_balances_map(pl_doc_or_name):
 
     # Sum transferred qty from submitted Stock Entry Detail
     # using custom_pick_list_item field.
-    transferred_rows = frappe.db.sql(
-        """
-        SELECT sed.custom_pick_list_item, COALESCE(SUM(sed.qty), 0) AS total_qty
-        FROM `tabStock Entry Detail` sed
-        INNER JOIN `tabStock Entry` se ON se.name = sed.parent
-        WHERE se.docstatus = 1
-          AND se.pick_list = %(pick_list)s
-          AND COALESCE(se.custom_is_additional_material, 0) = 0
-          AND sed.custom_pick_list_item IS NOT NULL
-        GROUP BY sed.custom_pick_list_item
-        """,
-        {"pick_list": pl.name},
-        as_dict=True,
-    )
+    if transferred_rows is None:
+        transferred_rows = frappe.db.sql(
+            """
+            SELECT sed.custom_pick_list_item, COALESCE(SUM(sed.qty), 0) AS total_qty
+            FROM `tabStock Entry Detail` sed
+            INNER JOIN `tabStock Entry` se ON se.name = sed.parent
+            WHERE se.docstatus = 1
+              AND se.pick_list = %(pick_list)s
+              AND COALESCE(se.custom_is_additional_material, 0) = 0
+              AND sed.custom_pick_list_item IS NOT NULL
+            GROUP BY sed.custom_pick_list_item
+            """,
+            {"pick_list": pl.name},
+            as_dict=True,
+        )
 
     for row in transferred_rows:
         pl_item_name = row.custom_pick_list_item
@@ -137,21 +160,40 @@ def _get_pick_list_balances_map(pl_doc_or_name):
     # some Stock Entries are linked to Pick List only at header level
     # (se.pick_list) without row-level custom_pick_list_item.
     # In that case, distribute unlinked transferred qty by item_code
-    # across matching Pick List rows in row order.
-    unlinked_rows = frappe.db.sql(
-        """
-        SELECT sed.item_code, COALESCE(SUM(sed.qty), 0) AS total_qty
-        FROM `tabStock Entry Detail` sed
-        INNER JOIN `tabStock Entry` se ON se.name = sed.parent
-        WHERE se.docstatus = 1
-          AND se.pick_list = %(pick_list)s
-          AND COALESCE(se.custom_is_additional_material, 0) = 0
-          AND (sed.custom_pick_list_item IS NULL OR sed.custom_pick_list_item = '')
-        GROUP BY sed.item_code
-        """,
-        {"pick_list": pl.name},
-        as_dict=True,
-    )
+    # across matching Pick List rows in row order. Skipped once the legacy
+    # link backfill has linked those rows.
+    if legacy_pick_list_links_pending():
+        _add_unlinked_transfers(pl, locations, result, unlinked_rows)
+
+    for info in result.values():
+        info["balance"] = max(flt(info["pl_qty"]) - flt(info["transferred"]), 0.0)
+
+    # A manually completed Pick List intentionally waives any quantity that was
+    # not transferred. Keep the planned and transferred quantities intact for
+    # audit/reporting, but expose no actionable balance.
+    if flt(pl.get("custom_manually_completed")):
+        for info in result.values():
+            info["balance"] = 0.0
+
+    return result
+
+
+def _add_unlinked_transfers(pl, locations, result, unlinked_rows=None) -> None:
+    if unlinked_rows is None:
+        unlinked_rows = frappe.db.sql(
+            """
+            SELECT sed.item_code, COALESCE(SUM(sed.qty), 0) AS total_qty
+            FROM `tabStock Entry Detail` sed
+            INNER JOIN `tabStock Entry` se ON se.name = sed.parent
+            WHERE se.docstatus = 1
+              AND se.pick_list = %(pick_list)s
+              AND COALESCE(se.custom_is_additional_material, 0) = 0
+              AND (sed.custom_pick_list_item IS NULL OR sed.custom_pick_list_item = '')
+            GROUP BY sed.item_code
+            """,
+            {"pick_list": pl.name},
+            as_dict=True,
+        )
 
     rows_by_item_code = {}
     for row in locations:
@@ -181,18 +223,6 @@ def _get_pick_list_balances_map(pl_doc_or_name):
             if remaining <= 0.000001:
                 break
 
-    for info in result.values():
-        info["balance"] = max(flt(info["pl_qty"]) - flt(info["transferred"]), 0.0)
-
-    # A manually completed Pick List intentionally waives any quantity that was
-    # not transferred. Keep the planned and transferred quantities intact for
-    # audit/reporting, but expose no actionable balance.
-    if flt(pl.get("custom_manually_completed")):
-        for info in result.values():
-            info["balance"] = 0.0
-
-    return result
-
 
 def _update_pick_list_status_from_db(pick_list_name: str):
     """
@@ -218,6 +248,7 @@ def _update_pick_list_status_from_db(pick_list_name: str):
     try:
         frappe.db.set_value("Pick List", pl.name, "status", new_status)
         pl.status = new_status
+        queue_pick_list_progress(pl.name)
     except Exception:
         frappe.log_error(
             frappe.get_traceback(), "C4Factory: update_pick_list_status_from_db error"
@@ -308,6 +339,7 @@ def complete_pick_list(pick_list: str) -> dict:
             "status": "Completed",
         },
     )
+    queue_pick_list_progress(pl.name)
     _recompute_wo_material_transfer_from_pls(pl.work_order)
 
     return {
@@ -427,6 +459,7 @@ def on_pick_list_validate(doc, method=None):
     set_pick_list_warehouses_from_item_group(doc)
     sync_pick_list_items_from_work_order(doc)
     validate_pick_list_matches_work_order(doc)
+    annotate_pick_list_availability(doc)
 
 
 def sync_pick_list_items_from_work_order(doc) -> None:
@@ -673,6 +706,21 @@ def make_partial_stock_entry_from_pick_list(pick_list: str, items_json: str) ->
     - Uses balance calculated by _get_pick_list_balances_map
     - Uses only the WIP Warehouse from the Work Order
     """
+    se = insert_partial_stock_entry_from_pick_list(
+        pick_list, frappe.parse_json(items_json) or []
+    )
+    frappe.db.commit()
+
+    return se.name
+
+
+def insert_partial_stock_entry_from_pick_list(pick_list: str, items: list[dict]):
+    """
+    Insert the draft partial transfer without committing; returns the Stock Entry.
+
+    A row may name the ``serial_nos`` and ``batches`` ({batch_no: qty}) to move,
+    e.g. from scan mode; it is then split into one Stock Entry row per batch.
+    """
     if not pick_list:
         frappe.throw(_("Pick List is required"))
 
@@ -689,13 +737,12 @@ def make_partial_stock_entry_from_pick_list(pick_list: str, items_json: str) ->
     if not wo.get("wip_warehouse"):
         frappe.throw(_("Work Order {0} has no WIP Warehouse set").format(wo.name))
 
-    # Parse items from dialog
-    items = frappe.parse_json(items_json) or []
     if not items:
         frappe.throw(_("No items were selected to transfer"))
 
     balances = _get_pick_list_balances_map(pl)
     pl_rows_by_name = {row.name: row for row in (pl.get("locations") or [])}
+    serial_batches = _get_serial_no_batches(items)
 
     # Create Stock Entry header
     se = frappe.new_doc("Stock Entry")
@@ -708,6 +755,7 @@ def make_partial_stock_entry_from_pick_list(pick_list: str, items_json: str) ->
         se.work_order = wo.name
 
     # Build items
+    selected_rows = []
     for row in items:
         pl_item_name = row.get("pl_item_name")
         qty = flt(row.get("qty"))
@@ -733,34 +781,92 @@ def make_partial_stock_entry_from_pick_list(pick_list: str, items_json: str) ->
                 )
             )
 
-        item = se.append("items", {})
-        item.item_code = pl_row.item_code
-        item.item_name = pl_row.item_name
-        item.uom = pl_row.uom
-        item.qty = qty
-
-        # From Pick List warehouse to Work Order WIP warehouse
-        item.s_warehouse = pl_row.warehouse
-        item.t_warehouse = wo.wip_warehouse
-
-        # Optional link to PL item if custom field exists
-        # (custom_pick_list_item on Stock Entry Detail)
-        try:
-            item.custom_pick_list_item = pl_row.name
-        except Exception:
-            pass
-        try:
-            item.custom_work_order_item = pl_row.get("custom_work_order_item")
-        except Exception:
-            pass
+        selected_rows.append((pl_row, qty))
+        for part_qty, batch_no, serial_nos in _split_by_serial_and_batch(
+            pl_row, qty, row, serial_batches
+        ):
+            item = se.append("items", {})
+            item.item_code = pl_row.item_code
+            item.item_name = pl_row.item_name
+            item.uom = pl_row.uom
+            item.qty = part_qty
+
+            # From Pick List warehouse to Work Order WIP warehouse
+            item.s_warehouse = pl_row.warehouse
+            item.t_warehouse = wo.wip_warehouse
+
+            # Move exactly the scanned serials / batches
+            if batch_no or serial_nos:
+                item.use_serial_batch_fields = 1
+                item.batch_no = batch_no
+                item.serial_no = "\n".join(serial_nos)
+
+            # Optional link to PL item if custom field exists
+            # (custom_pick_list_item on Stock Entry Detail)
+            try:
+                item.custom_pick_list_item = pl_row.name
+            except Exception:
+                pass
+            try:
+                item.custom_work_order_item = pl_row.get("custom_work_order_item")
+            except Exception:
+                pass
 
     if not se.get("items"):
         frappe.throw(_("No valid items to transfer for Work Order {0}").format(wo.name))
 
+    validate_transfer_availability(selected_rows)
+
     se.insert(ignore_permissions=True)
-    frappe.db.commit()
+    return se
+
+
+def _get_serial_no_batches(items) -> dict[str, frappe._dict]:
+    """Item and batch of every serial number named in the transfer rows, in one query."""
+    serial_nos = {serial_no for row in items for serial_no in row.get("serial_nos") or []}
+    if not serial_nos:
+        return {}
+
+    return {
+        row.name: row
+        for row in frappe.get_all(
+            "Serial No",
+            filters={"name": ["in", list(serial_nos)]},
+            fields=["name", "item_code", "batch_no"],
+        )
+    }
+
+
+def _split_by_serial_and_batch(pl_row, qty: float, row: dict, serial_batches: dict) -> list[tuple]:
+    """
+    (qty, batch_no, serial_nos) parts of one transfer row: scanned serials
+    grouped by their batch, scanned batches, then any remaining quantity.
+    """
+    by_batch = {}
+    for serial_no in row.get("serial_nos") or []:
+        serial = serial_batches.get(serial_no)
+        if not serial or serial.item_code != pl_row.item_code:
+            frappe.throw(_("Serial No {0} does not belong to Item {1}").format(serial_no, pl_row.item_code))
+        by_batch.setdefault(serial.batch_no or None, []).append(serial_no)
+
+    parts = [(len(serials), batch_no, serials) for batch_no, serials in by_batch.items()]
+    parts += [
+        (flt(batch_qty), batch_no, [])
+        for batch_no, batch_qty in (row.get("batches") or {}).items()
+        if flt(batch_qty) > 0
+    ]
+
+    remaining = qty - sum(part[0] for part in parts)
+    if remaining < -1e-9:
+        frappe.throw(
+            _("Item {0}: scanned serials and batches exceed the Transfer Qty ({1})").format(
+                pl_row.item_code, qty
+            )
+        )
+    if remaining > 1e-9:
+        parts.append((remaining, None, []))
 
-    return se.name
+    return parts
 
 
 @frappe.whitelist()
@@ -789,7 +895,7 @@ def create_job_cards_from_pick_list(pick_list: str) -> list[str]:
     if not job_cards:
         frappe.msgprint(_("No new Job Cards were created for Pick List {0}.").format(pl.name))
 
-    update_pick_list_operation_cost(pl.name)
+    mark_pick_list_operation_cost_dirty(pl.name)
     frappe.db.commit()
     return job_cards
 
@@ -806,6 +912,9 @@ def on_stock_entry_submit(doc, method=None):
     Do NOT modify or save the Stock Entry document here.
     Only update related Work Order and Pick List.
     """
+    if defer_recompute([doc.get("pick_list")], [doc.get("work_order")]):
+        return
+
     pl_name = doc.get("pick_list")
     if pl_name:
         try:
@@ -836,8 +945,11 @@ def _recompute_wo_material_transfer_from_pls(wo_name: str):
     """
     Recompute Work Order.material_transferred_for_manufacturing from actual
     submitted material-transfer Stock Entry rows.
+
+    Frozen (finished) Work Orders are left as they are unless a posting
+    thawed them.
     """
-    if not wo_name:
+    if not wo_name or is_work_order_frozen(wo_name):
         return
 
     wo = frappe.get_doc("Work Order", wo_name)
@@ -866,6 +978,72 @@ def _recompute_wo_material_transfer_from_pls(wo_name: str):
     # timestamp which causes the client-side "Document has been modified" alert
     # when users have the Work Order open while Stock Entry is submitted.
 
+    _set_wo_transfer_state_stamp(wo_name)
+    queue_work_order_progress(wo_name)
+
+
+# Checksum of the transfer state the last recompute of a Work Order saw
+TRANSFER_STATE_STAMP_FIELD = "custom_transfer_state_stamp"
+
+
+def _get_wo_transfer_state_stamp(wo_name: str) -> str:
+    """
+    Checksum of what the transfer recompute reads for one Work Order.
+
+    Built from the count, docstatus total and last modification of its Stock
+    Entries and Pick Lists plus the Work Order quantities and status, so any
+    submit, cancel, delete or status change gives a new value.
+    """
+    state = frappe.db.sql(
+        """
+        SELECT
+            (SELECT CONCAT_WS('/', COUNT(*), SUM(docstatus), MAX(modified))
+             FROM `tabStock Entry` WHERE work_order = %(wo)s),
+            (SELECT CONCAT_WS('/', COUNT(*), SUM(docstatus), MAX(modified))
+             FROM `tabPick List` WHERE work_order = %(wo)s),
+            (SELECT CONCAT_WS('/', qty, produced_qty, docstatus, status)
+             FROM `tabWork Order` WHERE name = %(wo)s)
+        """,
+        {"wo": wo_name},
+    )
+    return hashlib.md5(repr(state).encode()).hexdigest()
+
+
+def _has_transfer_state_stamp() -> bool:
+    return frappe.get_meta("Work Order").has_field(TRANSFER_STATE_STAMP_FIELD)
+
+
+def _set_wo_transfer_state_stamp(wo_name: str) -> None:
+    if not _has_transfer_state_stamp():
+        return
+
+    frappe.db.set_value(
+        "Work Order",
+        wo_name,
+        TRANSFER_STATE_STAMP_FIELD,
+        _get_wo_transfer_state_stamp(wo_name),
+        update_modified=False,
+    )
+
+
+def ensure_wo_material_transfer_consistent(wo_name: str) -> bool:
+    """
+    Recompute the Work Order transfer only when its Stock Entries or Pick
+    Lists changed since the last recompute stamped it.
+
+    Returns True when the recompute ran.
+    """
+    if not wo_name:
+        return False
+
+    if _has_transfer_state_stamp():
+        stamp = frappe.db.get_value("Work Order", wo_name, TRANSFER_STATE_STAMP_FIELD)
+        if stamp and stamp == _get_wo_transfer_state_stamp(wo_name):
+            return False
+
+    _recompute_wo_material_transfer_from_pls(wo_name)
+    return True
+
 
 @frappe.whitelist()
 def sync_work_order_material_transfer(wo_name: str) -> float:
@@ -878,6 +1056,57 @@ def sync_work_order_material_transfer(wo_name: str) -> float:
     )
 
 
+WO_TRANSFER_STATUS_CACHE_KEY = "c4factory:wo_transfer_status"
+WO_TRANSFER_STATUS_FIELDS = (
+    "status",
+    "qty",
+    "produced_qty",
+    "material_transferred_for_manufacturing",
+)
+
+
+@frappe.whitelist()
+def get_work_order_transfer_status(wo_name: str) -> dict:
+    """
+    Read path for the Work Order form: transfer and progress state plus the
+    version stamp it was computed for.
+
+    Answered from cache while the stamp of the Work Order's Stock Entries and
+    Pick Lists is unchanged; the transfer recompute runs only when the stamp
+    shows they moved since it last ran.
+    """
+    frappe.has_permission("Work Order", "read", doc=wo_name, throw=True)
+
+    cache_key = f"{WO_TRANSFER_STATUS_CACHE_KEY}:{wo_name}"
+    if is_work_order_frozen(wo_name):
+        return _get_work_order_transfer_status_values(wo_name, version=None)
+
+    version = _get_wo_transfer_state_stamp(wo_name)
+    cached = frappe.cache().get_value(cache_key)
+    if cached and cached.get("version") == version:
+        return cached
+
+    if ensure_wo_material_transfer_consistent(wo_name):
+        version = _get_wo_transfer_state_stamp(wo_name)
+
+    status = _get_work_order_transfer_status_values(wo_name, version)
+    frappe.cache().set_value(cache_key, status, expires_in_sec=6 * 3600)
+    return status
+
+
+def _get_work_order_transfer_status_values(wo_name: str, version: str | None) -> dict:
+    values = frappe.db.get_value(
+        "Work Order", wo_name, list(WO_TRANSFER_STATUS_FIELDS), as_dict=True
+    ) or {}
+    qty = flt(values.get("qty"))
+    return {
+        "version": version,
+        **{fieldname: values.get(fieldname) for fieldname in WO_TRANSFER_STATUS_FIELDS},
+        "percent_transferred": flt(values.get("material_transferred_for_manufacturing")) / qty * 100 if qty else 0.0,
+        "percent_produced": flt(values.get("produced_qty")) / qty * 100 if qty else 0.0,
+    }
+
+
 def _get_transferred_production_qty_from_stock_entries(wo_name: str) -> float:
     """
     Convert submitted Pick Lists and transfers back to production quantity.
@@ -966,6 +1195,8 @@ def _get_transferred_production_qty_from_stock_entries(wo_name: str) -> float:
 
 
 def _get_pick_list_transfer_ratios(pl, transfer_rows) -> list[float]:
+    # Unlinked transfers are matched by item only until the legacy backfill ran.
+    use_unlinked = legacy_pick_list_links_pending()
     transfers_by_pl_item = {}
     transfers_by_item = {}
     for row in transfer_rows:
@@ -979,7 +1210,7 @@ def _get_pick_list_transfer_ratios(pl, transfer_rows) -> list[float]:
             transfers_by_pl_item[pl_item] = (
                 flt(transfers_by_pl_item.get(pl_item)) + transferred_qty
             )
-        elif item_code:
+        elif item_code and use_unlinked:
             transfers_by_item[item_code] = (
                 flt(transfers_by_item.get(item_code)) + transferred_qty
             )
@@ -1017,7 +1248,8 @@ def on_stock_entry_cancel(doc, method=None):
     # Recompute costing immediately (safe on cancel)
     if doc.work_order:
         try:
-            recompute_work_order_costing(doc.work_order)
+            with cost_snapshot_reference(doc):
+                recompute_work_order_costing(doc.work_order)
         except Exception:
             frappe.log_error(
                 frappe.get_traceback(), "C4Factory: on_stock_entry_cancel costing"
@@ -1196,19 +1428,22 @@ def on_pick_list_submit(doc, method: str | None = None):
         )
 
 
-def _ensure_job_cards_for_pick_list(pl_doc) -> None:
+def _ensure_job_cards_for_pick_list(pl_doc, wo=None, existing=None) -> list[str]:
     """
     Create one draft Job Card per Work Order operation for this Pick List.
 
     The Job Cards are tied to the Pick List through custom_pick_list when that
     custom field exists. They carry the Pick List's production quantity so
     operation cost can be allocated to the same material lot that was picked.
+
+    Bulk callers pass the loaded Work Order and the existing Job Cards read
+    for many Pick Lists with _get_existing_job_cards.
     """
     wo_name = pl_doc.get("work_order")
     if not wo_name:
         return []
 
-    wo = frappe.get_doc("Work Order", wo_name)
+    wo = wo or frappe.get_doc("Work Order", wo_name)
     if wo.get("custom_disable_operation"):
         return []
 
@@ -1217,54 +1452,28 @@ def _ensure_job_cards_for_pick_list(pl_doc) -> None:
         return []
 
     jc_meta = _ensure_job_card_pick_list_meta()
-    has_custom_pick_list = jc_meta.has_field("custom_pick_list")
+    if existing is None:
+        existing = _get_existing_job_cards([pl_doc.name], [wo.name])
+
+    field_names = {df.fieldname for df in jc_meta.fields}
+    pl_key = pl_doc.name if "custom_pick_list" in field_names else ""
+    current = existing.get((pl_key, wo.name)) or []
     pick_qty = _get_pick_list_finished_goods_qty(pl_doc)
     created = []
 
     for op in operations:
         operation = op.get("operation")
         workstation = op.get("workstation")
-
-        filters = {"work_order": wo.name}
-        if has_custom_pick_list:
-            filters["custom_pick_list"] = pl_doc.name
-        if operation and jc_meta.has_field("operation"):
-            filters["operation"] = operation
-        if workstation and jc_meta.has_field("workstation"):
-            filters["workstation"] = workstation
-
-        if frappe.db.exists("Job Card", filters):
+        if any(
+            (not operation or row.operation == operation)
+            and (not workstation or row.workstation == workstation)
+            for row in current
+        ):
             continue
 
-        jc = frappe.new_doc("Job Card")
-        _set_if_field(jc, jc_meta, "work_order", wo.name)
-        _set_if_field(jc, jc_meta, "company", wo.get("company"))
-        _set_if_field(jc, jc_meta, "bom_no", wo.get("bom_no"))
-        _set_if_field(jc, jc_meta, "posting_date", nowdate())
-        _set_if_field(jc, jc_meta, "project", wo.get("project"))
-        _set_if_field(jc, jc_meta, "production_item", wo.get("production_item"))
-        _set_if_field(jc, jc_meta, "item_name", wo.get("item_name"))
-        _set_if_field(jc, jc_meta, "operation", operation)
-        _set_if_field(jc, jc_meta, "workstation", workstation)
-        _set_if_field(jc, jc_meta, "workstation_type", op.get("workstation_type"))
-        _set_if_field(jc, jc_meta, "wip_warehouse", _get_job_card_wip_warehouse(wo, op))
-        _set_if_field(jc, jc_meta, "serial_no", op.get("serial_no"))
-        _set_if_field(jc, jc_meta, "for_quantity", pick_qty)
-        _set_if_field(jc, jc_meta, "process_loss_qty", 0)
-        _set_if_field(jc, jc_meta, "custom_pick_list", pl_doc.name)
-
-        for op_field, jc_field in (
-            ("name", "work_order_operation"),
-            ("name", "operation_id"),
-            ("idx", "sequence_id"),
-            ("idx", "operation_row_id"),
-            ("time_in_mins", "time_required"),
-            ("time_in_mins", "for_time"),
-            ("hour_rate", "hour_rate"),
-            ("bom", "bom_no"),
-        ):
-            _set_if_field(jc, jc_meta, jc_field, op.get(op_field))
-        _set_if_field(jc, jc_meta, "operation_row_number", op.name)
+        jc = frappe.get_doc(
+            _get_job_card_values(wo, op, pl_doc.name, pick_qty, field_names)
+        )
 
         if wo.get("transfer_material_against") == "Job Card" and not wo.get("skip_transfer"):
             try:
@@ -1281,6 +1490,82 @@ def _ensure_job_cards_for_pick_list(pl_doc) -> None:
     return created
 
 
+def _get_existing_job_cards(pick_lists, work_orders) -> dict[tuple[str, str], list]:
+    """
+    Job Cards already made for many Pick Lists, from one query.
+
+    Keyed by (pick_list, work_order); pick_list is "" when Job Cards carry no
+    custom_pick_list, in which case every card of the Work Order counts.
+    """
+    if frappe.get_meta("Job Card").has_field("custom_pick_list"):
+        if not pick_lists:
+            return {}
+        condition, params = "custom_pick_list IN %(names)s", {"names": tuple(pick_lists)}
+        pick_list_column = "custom_pick_list"
+    else:
+        if not work_orders:
+            return {}
+        condition, params = "work_order IN %(names)s", {"names": tuple(work_orders)}
+        pick_list_column = "''"
+
+    existing = {}
+    for row in frappe.db.sql(
+        f"""
+        SELECT {pick_list_column} AS pick_list, work_order, operation, workstation
+        FROM `tabJob Card`
+        WHERE {condition}
+        """,
+        params,
+        as_dict=True,
+    ):
+        existing.setdefault((row.pick_list, row.work_order), []).append(row)
+
+    return existing
+
+
+def _get_job_card_values(wo, op, pl_name: str, pick_qty: float, field_names) -> dict:
+    """Field values of a new Job Card, kept to the fields Job Card has."""
+    values = {
+        "work_order": wo.name,
+        "company": wo.get("company"),
+        "bom_no": wo.get("bom_no"),
+        "posting_date": nowdate(),
+        "project": wo.get("project"),
+        "production_item": wo.get("production_item"),
+        "item_name": wo.get("item_name"),
+        "operation": op.get("operation"),
+        "workstation": op.get("workstation"),
+        "workstation_type": op.get("workstation_type"),
+        "wip_warehouse": _get_job_card_wip_warehouse(wo, op),
+        "serial_no": op.get("serial_no"),
+        "for_quantity": pick_qty,
+        "process_loss_qty": 0,
+        "custom_pick_list": pl_name,
+    }
+    for op_field, jc_field in (
+        ("name", "work_order_operation"),
+        ("name", "operation_id"),
+        ("idx", "sequence_id"),
+        ("idx", "operation_row_id"),
+        ("time_in_mins", "time_required"),
+        ("time_in_mins", "for_time"),
+        ("hour_rate", "hour_rate"),
+        ("bom", "bom_no"),
+    ):
+        if op.get(op_field) is not None:
+            values[jc_field] = op.get(op_field)
+    values["operation_row_number"] = op.name
+
+    return {
+        "doctype": "Job Card",
+        **{
+            fieldname: value
+            for fieldname, value in values.items()
+            if value is not None and fieldname in field_names
+        },
+    }
+
+
 def _get_job_card_wip_warehouse(wo, op) -> str | None:
     if not wo.get("skip_transfer") or wo.get("from_wip_warehouse"):
         return wo.get("wip_warehouse") or op.get("wip_warehouse")
@@ -1299,11 +1584,6 @@ def _get_pick_list_finished_goods_qty(pl_doc) -> float:
     )
 
 
-def _set_if_field(doc, meta, fieldname: str, value) -> None:
-    if value is not None and meta.has_field(fieldname):
-        doc.set(fieldname, value)
-
-
 def _ensure_job_card_pick_list_meta():
     meta = frappe.get_meta("Job Card")
     if meta.has_field("custom_pick_list"):
@@ -1339,42 +1619,79 @@ def _ensure_job_card_pick_list_meta():
 
 
 def update_pick_list_operation_cost(pick_list_name: str | None) -> None:
-    if not pick_list_name:
-        return
+    if pick_list_name:
+        update_pick_list_operation_costs([pick_list_name])
 
-    pl_meta = frappe.get_meta("Pick List")
-    if not pl_meta.has_field("custom_operation_cost"):
-        return
 
-    wo_name = frappe.db.get_value("Pick List", pick_list_name, "work_order")
-    if not wo_name:
+def update_pick_list_operation_costs(pick_list_names) -> None:
+    """
+    Recompute custom_operation_cost of many Pick Lists, with one grouped Job
+    Card cost query per Work Order.
+    """
+    pick_list_names = [name for name in pick_list_names or [] if name]
+    if not pick_list_names or not frappe.get_meta("Pick List").has_field("custom_operation_cost"):
         return
 
-    if _is_work_order_operation_disabled(wo_name):
-        frappe.db.set_value(
-            "Pick List",
-            pick_list_name,
-            "custom_operation_cost",
-            0,
-            update_modified=False,
+    by_work_order = {}
+    for name, wo_name in frappe.get_all(
+        "Pick List",
+        filters={"name": ["in", pick_list_names], "work_order": ["is", "set"]},
+        fields=["name", "work_order"],
+        as_list=True,
+    ):
+        by_work_order.setdefault(wo_name, []).append(name)
+
+    from c4factory.c4_manufacturing.stock_entry_hooks import get_pick_list_operating_costs
+
+    updates = {}
+    for wo_name, names in by_work_order.items():
+        if _is_work_order_operation_disabled(wo_name):
+            costs = dict.fromkeys(names, 0)
+        else:
+            costs = get_pick_list_operating_costs(wo_name, names)
+        updates.update({name: {"custom_operation_cost": cost} for name, cost in costs.items()})
+
+    if updates:
+        frappe.db.bulk_update("Pick List", updates, update_modified=False)
+
+
+# Pick Lists whose Job Cards changed since the last operation cost rollup
+PL_OPERATION_COST_DIRTY_KEY = "c4factory:pick_list_operation_cost_dirty"
+
+
+def mark_pick_list_operation_cost_dirty(pick_list_name: str | None) -> None:
+    """
+    Queue a Pick List for the next operation cost rollup instead of recomputing
+    now. It is marked once the transaction commits, so the rollup never reads
+    uncommitted Job Cards.
+    """
+    if pick_list_name:
+        frappe.db.after_commit.add(
+            lambda: frappe.cache().sadd(PL_OPERATION_COST_DIRTY_KEY, pick_list_name)
         )
-        return
 
-    from c4factory.c4_manufacturing.stock_entry_hooks import (
-        _get_work_order_operating_cost_from_job_cards,
-    )
 
-    operation_cost = _get_work_order_operating_cost_from_job_cards(
-        wo_name, pick_lists={pick_list_name}
-    )
+def rollup_pick_list_operation_costs() -> None:
+    """
+    Scheduled every minute: recompute the operation cost of the Pick Lists
+    marked since the last run, so a Pick List is recomputed at most once per
+    run however many times its Job Cards were saved.
+    """
+    cache = frappe.cache()
+    names = sorted(frappe.safe_decode(name) for name in cache.smembers(PL_OPERATION_COST_DIRTY_KEY) or [])
+    if not names:
+        return
 
-    frappe.db.set_value(
-        "Pick List",
-        pick_list_name,
-        "custom_operation_cost",
-        operation_cost,
-        update_modified=False,
-    )
+    # Taken off before the recompute so saves during it are picked up next run.
+    cache.srem(PL_OPERATION_COST_DIRTY_KEY, *names)
+    try:
+        update_pick_list_operation_costs(names)
+        frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        for name in names:
+            cache.sadd(PL_OPERATION_COST_DIRTY_KEY, name)
+        frappe.log_error(frappe.get_traceback(), "C4Factory: Pick List operation cost rollup failed")
 
 
 def _is_work_order_operation_disabled(work_order_name: str | None) -> bool:
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 import frappe
 from frappe import _
-from frappe.utils import flt
+from frappe.utils import cint, flt
 
 from c4factory.c4_manufacturing.work_order_hooks import get_default_source_warehouse
 
@@ -21,6 +21,10 @@ def _resolve_work_order_arg(
     return (work_order or source_name or work_order_id or name or "").strip()
 
 
+BULK_PICK_LIST_CHUNK_SIZE = 50
+BULK_PICK_LIST_EVENT = "c4_bulk_pick_list_progress"
+
+
 def _get_component_rows(wo):
     return wo.get("required_items") or wo.get("items") or []
 
@@ -48,8 +52,12 @@ def get_remaining_pick_list_qty(wo, exclude_pick_list: str | None = None) -> flo
         )[0][0]
     )
 
-    already_covered = max(allocated_qty, flt(wo.produced_qty))
-    return max(flt(wo.qty) - already_covered, 0.0)
+    return _get_unallocated_qty(wo, allocated_qty)
+
+
+def _get_unallocated_qty(wo, allocated_qty: float) -> float:
+    already_covered = max(flt(allocated_qty), flt(wo.get("produced_qty")))
+    return max(flt(wo.get("qty")) - already_covered, 0.0)
 
 
 @frappe.whitelist()
@@ -75,19 +83,34 @@ def create_pick_list(
         frappe.throw(_("Work Order must be submitted before creating a Pick List."))
 
     # Reconcile legacy/custom partial transfers before ERPNext's next Pick List
-    # is built. Existing entries may predate fg_completed_qty population.
-    from c4factory.api.work_order_flow import (
-        _recompute_wo_material_transfer_from_pls,
-    )
+    # is built. Existing entries may predate fg_completed_qty population; the
+    # recompute is skipped while the Work Order's transfer stamp is current.
+    from c4factory.api.work_order_flow import ensure_wo_material_transfer_consistent
+
+    if ensure_wo_material_transfer_consistent(wo.name):
+        wo.reload()
 
-    _recompute_wo_material_transfer_from_pls(wo.name)
-    wo.reload()
+    pl = _build_pick_list(wo, get_remaining_pick_list_qty(wo), for_qty=for_qty)
+    return pl.as_dict()
+
+
+def _build_pick_list(
+    wo,
+    remaining_qty: float,
+    for_qty: float | None = None,
+    item_map: dict | None = None,
+    warehouse_cache: dict | None = None,
+):
+    """
+    Build an unsaved Pick List for ``remaining_qty`` (or a smaller ``for_qty``).
 
+    ``item_map`` and ``warehouse_cache`` let bulk callers pass item attributes
+    and default warehouses resolved once for many Work Orders.
+    """
     rows = _get_component_rows(wo)
     if not rows:
         frappe.throw(_("Work Order has no required items."))
 
-    remaining_qty = get_remaining_pick_list_qty(wo)
     requested_qty = flt(for_qty)
     # ERPNext's dialog defaults to the production remainder and does not know
     # about quantities already reserved by Pick Lists. Cap that default to the
@@ -127,18 +150,21 @@ def create_pick_list(
         if row_qty <= 0:
             continue
 
-        warehouse = _get_pick_list_source_warehouse(wo, wo_item)
+        item_info = (item_map or {}).get(item_code)
+        warehouse = _get_pick_list_source_warehouse(
+            wo, wo_item, item_info=item_info, warehouse_cache=warehouse_cache
+        )
         if not warehouse:
             frappe.throw(_("Source Warehouse is required for item {0}.").format(item_code))
 
         stock_uom = (
             wo_item.get("stock_uom")
             or wo_item.get("uom")
-            or frappe.db.get_value("Item", item_code, "stock_uom")
+            or (item_info.stock_uom if item_info else frappe.db.get_value("Item", item_code, "stock_uom"))
         )
         item_name = (
             wo_item.get("item_name")
-            or frappe.db.get_value("Item", item_code, "item_name")
+            or (item_info.item_name if item_info else frappe.db.get_value("Item", item_code, "item_name"))
             or item_code
         )
 
@@ -166,25 +192,231 @@ def create_pick_list(
     if count == 0:
         frappe.throw(_("No valid required items to pick for Work Order {0}.").format(wo.name))
 
-    return pl.as_dict()
+    return pl
+
+
+@frappe.whitelist()
+def enqueue_bulk_pick_lists(work_orders: str | list, submit: int | str = 0) -> dict:
+    """
+    Queue Pick List creation for many Work Orders.
+
+    Progress and the per Work Order outcome are pushed to the user with the
+    ``c4_bulk_pick_list_progress`` realtime event.
+    """
+    work_orders = _parse_work_order_names(work_orders)
+    if not work_orders:
+        frappe.throw(_("Select at least one Work Order."))
+
+    frappe.has_permission("Pick List", "create", throw=True)
+    if cint(submit):
+        frappe.has_permission("Pick List", "submit", throw=True)
+
+    job = frappe.enqueue(
+        "c4factory.api.work_order_pick_list.bulk_create_pick_lists",
+        queue="long",
+        timeout=3600,
+        work_orders=work_orders,
+        submit=cint(submit),
+        user=frappe.session.user,
+        enqueue_after_commit=True,
+    )
+    return {"job_id": getattr(job, "id", None), "work_orders": len(work_orders)}
+
+
+def bulk_create_pick_lists(
+    work_orders: list[str],
+    submit: int = 0,
+    user: str | None = None,
+) -> list[dict]:
+    """
+    Background job: create (and optionally submit) one Pick List per Work Order.
+
+    Work Orders, their required items, existing allocations, item attributes
+    and default warehouses are read once per chunk. Each Work Order is
+    committed on its own so one failure does not undo the others.
+    """
+    work_orders = _parse_work_order_names(work_orders)
+    results = []
+
+    for start in range(0, len(work_orders), BULK_PICK_LIST_CHUNK_SIZE):
+        chunk = work_orders[start : start + BULK_PICK_LIST_CHUNK_SIZE]
+        context = _prefetch_bulk_pick_list_context(chunk)
+
+        for wo_name in chunk:
+            result = _create_bulk_pick_list(wo_name, context, cint(submit))
+            results.append(result)
+            if user:
+                frappe.publish_realtime(
+                    BULK_PICK_LIST_EVENT,
+                    {"done": len(results), "total": len(work_orders), "result": result},
+                    user=user,
+                )
+
+    return results
+
+
+def _create_bulk_pick_list(wo_name: str, context: frappe._dict, submit: int) -> dict:
+    wo = context.work_orders.get(wo_name)
+    try:
+        if not wo or wo.docstatus != 1:
+            frappe.throw(_("Work Order must be submitted before creating a Pick List."))
+
+        pl = _build_pick_list(
+            wo,
+            _get_unallocated_qty(wo, context.allocated_qty.get(wo_name)),
+            item_map=context.item_map,
+            warehouse_cache=context.warehouse_cache,
+        )
+        pl.insert()
+        if submit:
+            pl.submit()
+        frappe.db.commit()
+    except Exception as e:
+        frappe.db.rollback()
+        frappe.clear_messages()
+        frappe.log_error(frappe.get_traceback(), f"C4Factory: bulk Pick List failed ({wo_name})")
+        return {"work_order": wo_name, "status": "Failed", "error": str(e)}
+
+    return {
+        "work_order": wo_name,
+        "pick_list": pl.name,
+        "status": "Submitted" if submit else "Draft",
+    }
+
+
+def _prefetch_bulk_pick_list_context(work_orders: list[str]) -> frappe._dict:
+    from c4factory.api.work_order_flow import ensure_wo_material_transfer_consistent
+
+    # Only Work Orders with submitted transfers have anything to reconcile.
+    for wo_name in frappe.get_all(
+        "Stock Entry",
+        filters={
+            "docstatus": 1,
+            "purpose": "Material Transfer for Manufacture",
+            "work_order": ["in", work_orders],
+        },
+        distinct=True,
+        pluck="work_order",
+    ):
+        savepoint = f"c4_bulk_pl_{frappe.generate_hash(length=8)}"
+        frappe.db.savepoint(savepoint)
+        try:
+            ensure_wo_material_transfer_consistent(wo_name)
+        except Exception:
+            frappe.db.rollback(save_point=savepoint)
+            frappe.log_error(
+                frappe.get_traceback(), f"C4Factory: bulk Pick List transfer check failed ({wo_name})"
+            )
+
+    # Keep the recomputes even if a Pick List of the chunk is rolled back.
+    frappe.db.commit()
+
+    headers = frappe.get_all(
+        "Work Order",
+        filters={"name": ["in", work_orders]},
+        fields=[
+            "name",
+            "docstatus",
+            "company",
+            "qty",
+            "produced_qty",
+            "wip_warehouse",
+            "source_warehouse",
+        ],
+    )
+    wo_map = {row.name: row for row in headers}
+    for row in headers:
+        row.required_items = []
+
+    for wo_item in frappe.get_all(
+        "Work Order Item",
+        filters={"parenttype": "Work Order", "parent": ["in", list(wo_map)]},
+        fields=["*"],
+        order_by="parent, idx",
+    ):
+        wo_map[wo_item.parent].required_items.append(wo_item)
+
+    allocated_qty = dict(
+        frappe.db.sql(
+            """
+            SELECT work_order, SUM(for_qty)
+            FROM `tabPick List`
+            WHERE work_order IN %(work_orders)s
+              AND docstatus = 1
+            GROUP BY work_order
+            """,
+            {"work_orders": tuple(work_orders)},
+        )
+    )
+
+    item_codes = {
+        wo_item.item_code
+        for wo in headers
+        for wo_item in wo.required_items
+        if wo_item.item_code
+    }
+    item_map = {}
+    if item_codes:
+        item_map = {
+            row.name: row
+            for row in frappe.get_all(
+                "Item",
+                filters={"name": ["in", list(item_codes)]},
+                fields=["name", "item_name", "stock_uom", "item_group"],
+            )
+        }
+
+    return frappe._dict(
+        work_orders=wo_map,
+        allocated_qty=allocated_qty,
+        item_map=item_map,
+        warehouse_cache={},
+    )
+
 
+def _parse_work_order_names(work_orders) -> list[str]:
+    if isinstance(work_orders, str):
+        work_orders = frappe.parse_json(work_orders) if work_orders.startswith("[") else [work_orders]
+
+    seen = set()
+    names = []
+    for name in work_orders or []:
+        name = (name or "").strip()
+        if name and name not in seen:
+            seen.add(name)
+            names.append(name)
+
+    return names
+
+
+def _get_pick_list_source_warehouse(
+    wo,
+    wo_item,
+    item_info=None,
+    warehouse_cache: dict | None = None,
+) -> str | None:
+    warehouse = wo_item.get("source_warehouse") or wo_item.get("from_warehouse")
+    if warehouse:
+        return warehouse
 
-def _get_pick_list_source_warehouse(wo, wo_item) -> str | None:
     item_code = wo_item.get("item_code")
-    item_group = wo_item.get("item_group")
-    if not item_group and item_code:
+    item_group = wo_item.get("item_group") or (item_info or {}).get("item_group")
+    if not item_group and item_code and item_info is None:
         item_group = frappe.db.get_value("Item", item_code, "item_group")
 
-    return (
-        wo_item.get("source_warehouse")
-        or wo_item.get("from_warehouse")
-        or get_default_source_warehouse(
+    key = (item_code, item_group, wo.get("company"))
+    if warehouse_cache is not None and key in warehouse_cache:
+        default_warehouse = warehouse_cache[key]
+    else:
+        default_warehouse = get_default_source_warehouse(
             item_code=item_code,
             item_group=item_group,
             company=wo.get("company"),
         )
-        or wo.get("source_warehouse")
-    )
+        if warehouse_cache is not None:
+            warehouse_cache[key] = default_warehouse
+
+    return default_warehouse or wo.get("source_warehouse")
 
 
 def _set_if_present(doc, fieldname: str, value) -> None:
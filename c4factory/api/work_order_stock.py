@@ -3,6 +3,10 @@ from frappe.utils import flt
 from erpnext.manufacturing.doctype.work_order.work_order import (
     make_stock_entry as erpnext_make_stock_entry,
 )
+
+from c4factory.c4_manufacturing.legacy_pick_list_links import (
+    legacy_pick_list_links_pending,
+)
 
 
 @frappe.whitelist()
@@ -286,7 +290,13 @@ def _get_transferred_items_to_wip(work_order_name, wip_warehouse):
         )
 
     consumed_qty_map = _get_consumed_pick_list_material_qty(work_order_name)
-    legacy_consumed_by_item = _get_legacy_consumed_material_qty(work_order_name)
+    # Additional material is consumed without a Pick List row link, so its
+    # consumption is still read from unlinked rows after the legacy backfill.
+    legacy_consumed_by_item = (
+        _get_legacy_consumed_material_qty(work_order_name)
+        if additional_se_names or legacy_pick_list_links_pending()
+        else {}
+    )
     aggregated = {}
     ordered_transfers = sorted(
         transferred_by_pl_item.items(),
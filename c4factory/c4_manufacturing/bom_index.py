@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import frappe
+
+# Redis hash: item_code -> default active BOM ("" when the item has none)
+DEFAULT_BOM_CACHE_KEY = "c4factory:default_bom"
+
+
+def get_default_bom(item_code: str | None) -> str | None:
+    """Default active BOM of one item, from the shared index."""
+    if not item_code:
+        return None
+
+    return get_default_boms([item_code]).get(item_code)
+
+
+def get_default_boms(item_codes) -> dict[str, str | None]:
+    """
+    Resolve the default active BOM of many items at once.
+
+    Cached items are answered from Redis; the rest are read with a single
+    query and written back, including items without a default BOM so they
+    are not looked up again until one of their BOMs changes.
+    """
+    item_codes = {item_code for item_code in item_codes or [] if item_code}
+    if not item_codes:
+        return {}
+
+    cache = frappe.cache()
+    resolved = {}
+    missing = []
+    for item_code in item_codes:
+        bom_no = cache.hget(DEFAULT_BOM_CACHE_KEY, item_code)
+        if bom_no is None:
+            missing.append(item_code)
+        else:
+            resolved[item_code] = bom_no or None
+
+    if missing:
+        found = dict(
+            frappe.db.sql(
+                """
+                SELECT item, name
+                FROM `tabBOM`
+                WHERE is_default = 1
+                  AND is_active = 1
+                  AND item IN %(items)s
+                """,
+                {"items": tuple(missing)},
+            )
+        )
+        for item_code in missing:
+            bom_no = found.get(item_code)
+            cache.hset(DEFAULT_BOM_CACHE_KEY, item_code, bom_no or "")
+            resolved[item_code] = bom_no
+
+    return resolved
+
+
+def clear_default_bom_cache(doc, method=None):
+    """
+    BOM hook: drop the cached default BOM of the item.
+
+    ERPNext moves is_default between BOMs of the same item, and db_set runs
+    on_change, so clearing by item covers every flag change.
+    """
+    item_codes = {doc.get("item")}
+
+    previous = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if previous:
+        item_codes.add(previous.get("item"))
+
+    item_codes = [item_code for item_code in item_codes if item_code]
+    if not item_codes:
+        return
+
+    def clear():
+        for item_code in item_codes:
+            frappe.cache().hdel(DEFAULT_BOM_CACHE_KEY, item_code)
+
+    # Again after commit: a concurrent read may refill from the old state meanwhile.
+    clear()
+    frappe.db.after_commit.add(clear)
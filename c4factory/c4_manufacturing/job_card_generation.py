@@ -0,0 +1,109 @@
+from __future__ import annotations
+
+import hashlib
+
+import frappe
+from frappe import _
+
+from c4factory.c4_manufacturing.recompute_batch import batched_recompute
+
+GENERATION_EVENT = "c4_job_card_generation"
+
+
+@frappe.whitelist()
+def start_job_card_generation(pick_lists) -> str:
+    """Queue Job Card generation for many Pick Lists; results are pushed to the user."""
+    frappe.has_permission("Job Card", "create", throw=True)
+
+    pick_lists = sorted(set(frappe.parse_json(pick_lists) or []))
+    if not pick_lists:
+        frappe.throw(_("Select at least one Pick List."))
+
+    digest = hashlib.md5("|".join(pick_lists).encode()).hexdigest()
+    job_id = f"c4factory:job_card_generation:{digest}"
+    frappe.enqueue(
+        "c4factory.c4_manufacturing.job_card_generation.generate_job_cards_for_pick_lists",
+        queue="long",
+        pick_lists=pick_lists,
+        user=frappe.session.user,
+        job_id=job_id,
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+    return job_id
+
+
+def generate_job_cards_for_pick_lists(pick_lists: list[str], user: str | None = None) -> dict:
+    """
+    Background job: create the missing Job Cards of many Pick Lists.
+
+    Existing Job Cards of all the Pick Lists are read with one query and each
+    Work Order is loaded once. Every Pick List is created and committed on its
+    own, so one failing list does not hold back the others. Costing and Pick
+    List operation cost are recomputed once per Work Order, after its Pick
+    Lists are done.
+
+    Returns {pick_list: {"created": [...]} | {"skipped": reason} | {"error": message}}.
+    """
+    from c4factory.api.work_order_flow import (
+        _ensure_job_card_pick_list_meta,
+        _ensure_job_cards_for_pick_list,
+        _get_existing_job_cards,
+    )
+
+    _ensure_job_card_pick_list_meta()
+    pls = {
+        row.name: row
+        for row in frappe.get_all(
+            "Pick List",
+            filters={"name": ["in", pick_lists]},
+            fields=["name", "docstatus", "work_order"],
+        )
+    }
+    existing = _get_existing_job_cards(
+        list(pls), list({row.work_order for row in pls.values() if row.work_order})
+    )
+
+    results = {}
+    groups = {}
+    for pl_name in pick_lists:
+        pl = pls.get(pl_name)
+        if not pl or pl.docstatus != 1 or not pl.work_order:
+            results[pl_name] = {"skipped": _("Not a submitted Pick List of a Work Order")}
+            continue
+        groups.setdefault(pl.work_order, []).append(pl_name)
+
+    for work_order, group in groups.items():
+        # One batch per Work Order, so its costing is recomputed and committed
+        # as soon as its Pick Lists are done.
+        with batched_recompute() as deferred:
+            wo = None
+            for pl_name in group:
+                before = {key: set(names) for key, names in deferred.items()}
+                try:
+                    if wo is None:
+                        wo = frappe.get_doc("Work Order", work_order)
+                    if wo.get("custom_disable_operation"):
+                        results[pl_name] = {"skipped": _("Operation is disabled for the Work Order")}
+                        continue
+
+                    created = _ensure_job_cards_for_pick_list(
+                        frappe.get_doc("Pick List", pl_name), wo=wo, existing=existing
+                    )
+                    frappe.db.commit()
+                    results[pl_name] = {"created": created}
+                except Exception as e:
+                    frappe.db.rollback()
+                    # Nothing of this Pick List was kept; drop what it deferred.
+                    for key, names in deferred.items():
+                        names.intersection_update(before[key])
+                    frappe.log_error(
+                        frappe.get_traceback(), f"C4Factory: Job Card generation failed ({pl_name})"
+                    )
+                    results[pl_name] = {"error": str(e)}
+
+        frappe.db.commit()
+
+    if user:
+        frappe.publish_realtime(GENERATION_EVENT, {"results": results}, user=user)
+    return results
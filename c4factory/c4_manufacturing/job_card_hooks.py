@@ -147,10 +147,28 @@ def sync_work_order_costing_from_job_card(doc, method=None):
     if not wo_name:
         return
 
+    from c4factory.c4_manufacturing.recompute_batch import defer_recompute
+    from c4factory.c4_manufacturing.work_order_freeze import thaw_work_order
+
+    if defer_recompute([doc.get("custom_pick_list")], [wo_name]):
+        if method in ("on_submit", "on_cancel"):
+            thaw_work_order(wo_name)
+        return
+
     try:
         from c4factory.c4_manufacturing.stock_entry_hooks import recompute_work_order_costing
+        from c4factory.c4_manufacturing.work_order_freeze import thawed_work_order
+        from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+            cost_snapshot_reference,
+        )
 
-        recompute_work_order_costing(wo_name)
+        # Only submit / cancel reopen a frozen Work Order; late saves do not.
+        with cost_snapshot_reference(doc):
+            if method in ("on_submit", "on_cancel"):
+                with thawed_work_order(wo_name, doc):
+                    recompute_work_order_costing(wo_name)
+            else:
+                recompute_work_order_costing(wo_name)
     except Exception:
         # Do not block Job Card save/submit due to costing sync issues.
         frappe.log_error(frappe.get_traceback(), "C4Factory: Job Card costing sync failed")
@@ -164,9 +182,10 @@ def sync_pick_list_operation_cost_from_job_card(doc, method=None):
         return
 
     try:
-        from c4factory.api.work_order_flow import update_pick_list_operation_cost
+        from c4factory.api.work_order_flow import mark_pick_list_operation_cost_dirty
 
-        update_pick_list_operation_cost(pick_list)
+        # Rolled up by the scheduler at most once a minute per Pick List.
+        mark_pick_list_operation_cost_dirty(pick_list)
     except Exception:
         frappe.log_error(
             frappe.get_traceback(), "C4Factory: Pick List operation cost sync failed"
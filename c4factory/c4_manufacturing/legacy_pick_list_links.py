@@ -0,0 +1,373 @@
+from __future__ import annotations
+
+import frappe
+from frappe.utils import cint, flt
+
+from c4factory.c4factory.doctype.c4factory_settings.c4factory_settings import (
+    get_c4factory_setting,
+)
+
+SETTINGS_DOCTYPE = "C4Factory Settings"
+BACKFILLED_FIELD = "legacy_pick_list_links_backfilled"
+UNRESOLVED_FIELD = "legacy_pick_list_links_unresolved"
+CURSOR_FIELD = "legacy_pick_list_links_cursor"
+BACKFILL_CHUNK_SIZE = 200
+
+TRANSFER_PURPOSES = ("Material Transfer for Manufacture",)
+CONSUMPTION_PURPOSES = ("Manufacture", "Process Loss")
+
+
+def legacy_pick_list_links_pending() -> bool:
+    """
+    True until the backfill has linked every legacy Stock Entry row.
+
+    While pending, Pick List balances, transfer ratios and material
+    consumption keep reading Stock Entry rows without a Pick List row link.
+    """
+    return not cint(get_c4factory_setting(BACKFILLED_FIELD, 0))
+
+
+@frappe.whitelist()
+def start_legacy_pick_list_link_backfill() -> None:
+    frappe.only_for("System Manager")
+    enqueue_legacy_pick_list_link_backfill()
+
+
+def enqueue_legacy_pick_list_link_backfill() -> None:
+    frappe.enqueue(
+        "c4factory.c4_manufacturing.legacy_pick_list_links.backfill_legacy_pick_list_links",
+        queue="long",
+        timeout=14400,
+        job_id="c4factory:legacy_pick_list_link_backfill",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+def backfill_legacy_pick_list_links(chunk_size: int = BACKFILL_CHUNK_SIZE) -> None:
+    """
+    Write custom_pick_list_item / custom_work_order_item on legacy Stock Entry
+    Detail rows of every Work Order.
+
+    Work Orders are processed in name order and the last finished one is kept
+    in C4Factory Settings after each committed chunk, so an interrupted run
+    resumes where it stopped. When a full pass leaves no row unresolved, the
+    legacy fallbacks are switched off.
+    """
+    cursor = get_c4factory_setting(CURSOR_FIELD, "") or ""
+    unresolved = cint(get_c4factory_setting(UNRESOLVED_FIELD, 0)) if cursor else 0
+
+    while True:
+        work_orders = frappe.db.sql_list(
+            """
+            SELECT DISTINCT se.work_order
+            FROM `tabStock Entry` se
+            INNER JOIN `tabStock Entry Detail` sed ON sed.parent = se.name
+            WHERE se.docstatus = 1
+              AND se.work_order > %(cursor)s
+              AND (se.purpose IN %(purposes)s OR se.stock_entry_type IN %(purposes)s)
+              AND COALESCE(se.custom_is_additional_material, 0) = 0
+              AND COALESCE(sed.is_finished_item, 0) = 0
+              AND COALESCE(sed.is_scrap_item, 0) = 0
+              AND IFNULL(sed.custom_pick_list_item, '') = ''
+            ORDER BY se.work_order
+            LIMIT %(limit)s
+            """,
+            {
+                "cursor": cursor,
+                "purposes": TRANSFER_PURPOSES + CONSUMPTION_PURPOSES,
+                "limit": cint(chunk_size) or BACKFILL_CHUNK_SIZE,
+            },
+        )
+        if not work_orders:
+            break
+
+        for wo_name in work_orders:
+            unresolved += backfill_work_order_links(wo_name)
+
+        cursor = work_orders[-1]
+        frappe.db.set_single_value(
+            SETTINGS_DOCTYPE, {CURSOR_FIELD: cursor, UNRESOLVED_FIELD: unresolved}
+        )
+        frappe.db.commit()
+
+    frappe.db.set_single_value(
+        SETTINGS_DOCTYPE,
+        {
+            CURSOR_FIELD: "",
+            UNRESOLVED_FIELD: unresolved,
+            BACKFILLED_FIELD: 0 if unresolved else 1,
+        },
+    )
+    frappe.db.commit()
+
+
+def backfill_work_order_links(wo_name: str) -> int:
+    """
+    Link the legacy Stock Entry rows of one Work Order.
+
+    Transfers go to the first Pick List row of the same item with room left,
+    in row order, after the rows already linked; consumption goes to the
+    transferred Pick List rows in transfer order once additional material of
+    the item is used up. These are the rules of the legacy fallbacks. A row
+    that would have to be split over several Pick List rows is left as is.
+
+    Returns the number of rows left unresolved.
+    """
+    pl_rows = _get_pick_list_rows(wo_name)
+    se_rows = _get_stock_entry_rows(wo_name)
+
+    transfers = [row for row in se_rows if not row.is_consumption]
+    consumption = [row for row in se_rows if row.is_consumption]
+
+    updates = {}
+    unresolved = _link_transfer_rows(transfers, pl_rows, updates)
+    unresolved += _link_consumption_rows(transfers, consumption, pl_rows, updates)
+
+    if updates:
+        has_wo_item = frappe.get_meta("Stock Entry Detail").has_field("custom_work_order_item")
+        frappe.db.bulk_update(
+            "Stock Entry Detail",
+            {
+                name: values if has_wo_item else {"custom_pick_list_item": values["custom_pick_list_item"]}
+                for name, values in updates.items()
+            },
+            update_modified=False,
+        )
+
+    return unresolved
+
+
+def link_stock_entry_pick_list_rows(doc, method=None):
+    """
+    Stock Entry validate hook.
+
+    Rows that arrive without a Pick List row link, e.g. from ERPNext's own
+    Pick List -> Stock Entry, are linked with the backfill rules so they are
+    still counted once the legacy fallbacks are switched off.
+    """
+    purposes = {(doc.get("purpose") or "").strip(), (doc.get("stock_entry_type") or "").strip()}
+    if (
+        not doc.get("work_order")
+        or cint(doc.get("custom_is_additional_material"))
+        or not purposes & set(TRANSFER_PURPOSES + CONSUMPTION_PURPOSES)
+    ):
+        return
+
+    sed_meta = frappe.get_meta("Stock Entry Detail")
+    if not sed_meta.has_field("custom_pick_list_item"):
+        return
+
+    rows = {
+        f"new-{row.idx}": row
+        for row in doc.get("items") or []
+        if not row.get("custom_pick_list_item")
+        and not cint(row.get("is_finished_item"))
+        and not cint(row.get("is_scrap_item"))
+    }
+    if not rows:
+        return
+
+    pl_rows = _get_pick_list_rows(doc.work_order)
+    if not pl_rows:
+        return
+
+    is_consumption = 1 if purposes & set(CONSUMPTION_PURPOSES) else 0
+    se_rows = _get_stock_entry_rows(doc.work_order, exclude=doc.name)
+    se_rows += [
+        frappe._dict(
+            name=key,
+            pick_list=doc.get("pick_list"),
+            is_additional=0,
+            is_consumption=is_consumption,
+            item_code=row.item_code,
+            qty=abs(flt(row.qty)),
+            custom_pick_list_item=None,
+            custom_work_order_item=row.get("custom_work_order_item"),
+        )
+        for key, row in rows.items()
+    ]
+
+    transfers = [row for row in se_rows if not row.is_consumption]
+    consumption = [row for row in se_rows if row.is_consumption]
+
+    updates = {}
+    _link_transfer_rows(transfers, pl_rows, updates)
+    _link_consumption_rows(transfers, consumption, pl_rows, updates)
+
+    has_wo_item = sed_meta.has_field("custom_work_order_item")
+    for key, row in rows.items():
+        values = updates.get(key)
+        if not values:
+            continue
+        row.custom_pick_list_item = values["custom_pick_list_item"]
+        if has_wo_item and not row.get("custom_work_order_item"):
+            row.custom_work_order_item = values["custom_work_order_item"]
+
+
+def _get_stock_entry_rows(wo_name: str, exclude: str | None = None) -> list[frappe._dict]:
+    """Submitted transfer and consumption rows of the Work Order in posting order."""
+    return frappe.db.sql(
+        """
+        SELECT
+            sed.name,
+            se.pick_list,
+            COALESCE(se.custom_is_additional_material, 0) AS is_additional,
+            IF(se.purpose IN %(consumption)s OR se.stock_entry_type IN %(consumption)s, 1, 0)
+                AS is_consumption,
+            sed.item_code,
+            ABS(sed.qty) AS qty,
+            sed.custom_pick_list_item,
+            sed.custom_work_order_item
+        FROM `tabStock Entry` se
+        INNER JOIN `tabStock Entry Detail` sed ON sed.parent = se.name
+        WHERE se.docstatus = 1
+          AND se.work_order = %(wo)s
+          AND se.name != %(exclude)s
+          AND (se.purpose IN %(purposes)s OR se.stock_entry_type IN %(purposes)s)
+          AND COALESCE(sed.is_finished_item, 0) = 0
+          AND COALESCE(sed.is_scrap_item, 0) = 0
+        ORDER BY se.posting_date, se.posting_time, se.creation, sed.idx
+        """,
+        {
+            "wo": wo_name,
+            "exclude": exclude or "",
+            "consumption": CONSUMPTION_PURPOSES,
+            "purposes": TRANSFER_PURPOSES + CONSUMPTION_PURPOSES,
+        },
+        as_dict=True,
+    )
+
+
+def _get_pick_list_rows(wo_name: str) -> dict[str, frappe._dict]:
+    pick_lists = frappe.get_all(
+        "Pick List",
+        filters={"work_order": wo_name, "docstatus": 1},
+        order_by="creation asc",
+        pluck="name",
+    )
+    if not pick_lists:
+        return {}
+
+    rows = frappe.get_all(
+        "Pick List Item",
+        filters={"parenttype": "Pick List", "parent": ["in", pick_lists]},
+        fields=["name", "parent", "idx", "item_code", "qty", "custom_pl_qty", "custom_work_order_item"],
+    )
+    order = {name: index for index, name in enumerate(pick_lists)}
+    rows.sort(key=lambda row: (order[row.parent], row.idx))
+
+    for row in rows:
+        row.pl_qty = flt(row.custom_pl_qty) or flt(row.qty)
+    return {row.name: row for row in rows}
+
+
+def _link_transfer_rows(transfers, pl_rows, updates) -> int:
+    transferred = {}
+    for row in transfers:
+        if row.custom_pick_list_item:
+            transferred[row.custom_pick_list_item] = (
+                flt(transferred.get(row.custom_pick_list_item)) + flt(row.qty)
+            )
+
+    unresolved = 0
+    for row in transfers:
+        if row.custom_pick_list_item or row.is_additional or not row.pick_list:
+            continue
+
+        candidates = [
+            pl_row
+            for pl_row in pl_rows.values()
+            if pl_row.parent == row.pick_list and pl_row.item_code == row.item_code
+        ]
+        target = _pick_target(
+            candidates,
+            flt(row.qty),
+            lambda pl_row: pl_row.pl_qty - flt(transferred.get(pl_row.name)),
+        )
+        if not target:
+            unresolved += 1
+            continue
+
+        transferred[target.name] = flt(transferred.get(target.name)) + flt(row.qty)
+        _set_link(row, target, updates)
+
+    return unresolved
+
+
+def _link_consumption_rows(transfers, consumption, pl_rows, updates) -> int:
+    # Pick List rows in the order their material first reached WIP
+    remaining = {}
+    additional = {}
+    for row in transfers:
+        if row.is_additional:
+            additional[row.item_code] = flt(additional.get(row.item_code)) + flt(row.qty)
+            continue
+
+        pl_item = row.custom_pick_list_item or (updates.get(row.name) or {}).get(
+            "custom_pick_list_item"
+        )
+        if pl_item in pl_rows:
+            remaining[pl_item] = flt(remaining.get(pl_item)) + flt(row.qty)
+
+    for row in consumption:
+        if row.custom_pick_list_item in remaining:
+            remaining[row.custom_pick_list_item] -= flt(row.qty)
+
+    unresolved = 0
+    for row in consumption:
+        if row.custom_pick_list_item:
+            continue
+
+        qty = flt(row.qty)
+        candidates = [
+            pl_rows[pl_item]
+            for pl_item in remaining
+            if pl_rows[pl_item].item_code == row.item_code
+        ]
+        from_additional = min(flt(additional.get(row.item_code)), qty)
+        if from_additional > 0:
+            additional[row.item_code] -= from_additional
+            if qty - from_additional <= 0.000001:
+                # Additional material consumption carries no Pick List row link.
+                continue
+            # Only a row that could have come from a Pick List is unresolved.
+            unresolved += 1 if candidates else 0
+            continue
+
+        target = _pick_target(candidates, qty, lambda pl_row: remaining[pl_row.name])
+        if not target:
+            unresolved += 1 if candidates else 0
+            continue
+
+        remaining[target.name] -= qty
+        _set_link(row, target, updates)
+
+    return unresolved
+
+
+def _pick_target(candidates, qty, get_free_qty):
+    """
+    First candidate with room for the whole row; the last one when every
+    candidate is already full, where the extra does not change any balance.
+    """
+    if not candidates:
+        return None
+
+    free = [max(flt(get_free_qty(candidate)), 0.0) for candidate in candidates]
+    for candidate, free_qty in zip(candidates, free, strict=True):
+        if free_qty > 0.000001 and qty <= free_qty + 0.000001:
+            return candidate
+
+    if sum(free) <= 0.000001:
+        return candidates[-1]
+
+    return None
+
+
+def _set_link(row, pl_row, updates) -> None:
+    updates[row.name] = {
+        "custom_pick_list_item": pl_row.name,
+        "custom_work_order_item": row.custom_work_order_item or pl_row.custom_work_order_item,
+    }
+
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import frappe
+from frappe.utils import flt
+
+WORK_ORDER_EVENT = "c4_work_order_progress"
+PICK_LIST_EVENT = "c4_pick_list_progress"
+WORK_ORDER_FIELDS = (
+    "status",
+    "material_transferred_for_manufacturing",
+    "produced_qty",
+    "c4_raw_material_cost",
+    "c4_scrap_material_cost",
+    "c4_operating_cost",
+    "c4_total_cost",
+)
+
+
+def queue_work_order_progress(wo_name: str | None) -> None:
+    """Publish the Work Order's progress to open forms once the transaction commits."""
+    _queue("Work Order", wo_name)
+
+
+def queue_pick_list_progress(pl_name: str | None) -> None:
+    """Publish the Pick List's status and row balances once the transaction commits."""
+    _queue("Pick List", pl_name)
+
+
+def _queue(doctype: str, name: str | None) -> None:
+    """
+    Collect documents for one event each per transaction.
+
+    Recomputes run several times in one request; the values are read when
+    the transaction commits, so every event carries the final state.
+    """
+    if not name:
+        return
+
+    if frappe.flags.c4_progress_events is None:
+        frappe.flags.c4_progress_events = set()
+        frappe.db.after_commit.add(_publish_queued)
+        frappe.db.after_rollback.add(_discard_queued)
+
+    frappe.flags.c4_progress_events.add((doctype, name))
+
+
+def _discard_queued() -> None:
+    frappe.flags.c4_progress_events = None
+
+
+def _publish_queued() -> None:
+    queued = frappe.flags.c4_progress_events or set()
+    frappe.flags.c4_progress_events = None
+
+    for doctype, name in sorted(queued):
+        try:
+            if doctype == "Work Order":
+                _publish_work_order_progress(name)
+            else:
+                _publish_pick_list_progress(name)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), f"C4Factory: progress event failed ({doctype} {name})")
+
+
+def _publish_work_order_progress(name: str) -> None:
+    meta = frappe.get_meta("Work Order")
+    fields = [fieldname for fieldname in WORK_ORDER_FIELDS if meta.has_field(fieldname)]
+    values = frappe.db.get_value("Work Order", name, [*fields, "modified"], as_dict=True)
+    if not values:
+        return
+
+    frappe.publish_realtime(
+        WORK_ORDER_EVENT,
+        {"work_order": name, **values, "modified": str(values.modified)},
+        doctype="Work Order",
+        docname=name,
+    )
+
+
+def _publish_pick_list_progress(name: str) -> None:
+    from c4factory.api.work_order_flow import _get_pick_list_balances_map
+
+    fields = ["status", "docstatus", "modified"]
+    if frappe.get_meta("Pick List").has_field("custom_manually_completed"):
+        fields.append("custom_manually_completed")
+
+    values = frappe.db.get_value("Pick List", name, fields, as_dict=True)
+    if not values:
+        return
+
+    rows = {}
+    if values.docstatus == 1:
+        rows = {
+            row_name: {
+                "transferred": flt(info.get("transferred")),
+                "balance": flt(info.get("balance")),
+            }
+            for row_name, info in _get_pick_list_balances_map(name).items()
+        }
+
+    frappe.publish_realtime(
+        PICK_LIST_EVENT,
+        {
+            "pick_list": name,
+            "status": values.status,
+            "custom_manually_completed": values.get("custom_manually_completed"),
+            "modified": str(values.modified),
+            "rows": rows,
+        },
+        doctype="Pick List",
+        docname=name,
+    )
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import frappe
+
+
+def defer_recompute(pick_lists=(), work_orders=()) -> bool:
+    """
+    Inside batched_recompute, note the Pick Lists and Work Orders a hook would
+    recompute and return True; the hook then skips its own recompute.
+    """
+    deferred = frappe.flags.c4_deferred_recompute
+    if deferred is None:
+        return False
+
+    deferred["pick_lists"].update(name for name in pick_lists if name)
+    deferred["work_orders"].update(name for name in work_orders if name)
+    return True
+
+
+@contextmanager
+def batched_recompute():
+    """
+    Run many postings with the Pick List / Work Order recompute deferred, and
+    recompute every affected document once when the block finishes.
+    """
+    deferred = {"pick_lists": set(), "work_orders": set()}
+    frappe.flags.c4_deferred_recompute = deferred
+    try:
+        yield deferred
+    finally:
+        frappe.flags.c4_deferred_recompute = None
+        recompute_deferred(deferred)
+
+
+def flush_deferred_recompute(deferred: dict) -> None:
+    """
+    Recompute what was deferred so far and start over with an empty set. Call
+    it before every intermediate commit so committed postings are never left
+    with stale Pick List and Work Order state.
+    """
+    pending = {key: set(names) for key, names in deferred.items()}
+    for names in deferred.values():
+        names.clear()
+
+    previous = frappe.flags.c4_deferred_recompute
+    frappe.flags.c4_deferred_recompute = None
+    try:
+        recompute_deferred(pending)
+    finally:
+        frappe.flags.c4_deferred_recompute = previous
+
+
+def recompute_deferred(deferred: dict) -> None:
+    from c4factory.api.work_order_flow import (
+        _recompute_wo_material_transfer_from_pls,
+        _update_pick_list_status_from_db,
+        mark_pick_list_operation_cost_dirty,
+    )
+    from c4factory.c4_manufacturing.stock_entry_hooks import recompute_work_order_costing
+    from c4factory.c4_manufacturing.work_order_freeze import refreeze_work_order
+
+    for pl in sorted(deferred["pick_lists"]):
+        try:
+            _update_pick_list_status_from_db(pl)
+            mark_pick_list_operation_cost_dirty(pl)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), f"C4Factory: batched recompute (Pick List {pl})")
+
+    for wo in sorted(deferred["work_orders"]):
+        try:
+            _recompute_wo_material_transfer_from_pls(wo)
+            recompute_work_order_costing(wo)
+            # Postings thawed their frozen Work Orders; freeze them again now.
+            refreeze_work_order(wo)
+        except Exception:
+            frappe.log_error(frappe.get_traceback(), f"C4Factory: batched recompute (WO {wo})")
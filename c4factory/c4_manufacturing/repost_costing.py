@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import frappe
+
+COSTING_PURPOSES = ("Material Transfer for Manufacture", "Manufacture")
+VOUCHER_CHUNK_SIZE = 1000
+RECOMPUTE_CHUNK_SIZE = 100
+
+
+def on_repost_item_valuation_change(doc, method=None):
+    """
+    Repost Item Valuation hook (on_change).
+
+    ERPNext marks the repost Completed with db_set once the revalued rates
+    are written; only then are the Work Orders behind it refreshed. Later
+    saves of a repost that is already Completed do not queue it again.
+    """
+    if doc.get("status") != "Completed" or not doc.has_value_changed("status"):
+        return
+
+    frappe.enqueue(
+        "c4factory.c4_manufacturing.repost_costing.refresh_costing_after_repost",
+        queue="long",
+        repost_item_valuation=doc.name,
+        job_id=f"c4factory:repost_costing:{doc.name}",
+        deduplicate=True,
+        enqueue_after_commit=True,
+    )
+
+
+def refresh_costing_after_repost(repost_item_valuation: str) -> None:
+    """Queue costing recomputes for the Work Orders a repost revalued, a chunk per job."""
+    repost = frappe.get_doc("Repost Item Valuation", repost_item_valuation)
+    work_orders = get_revalued_work_orders(repost)
+
+    for start in range(0, len(work_orders), RECOMPUTE_CHUNK_SIZE):
+        frappe.enqueue(
+            "c4factory.c4_manufacturing.repost_costing.recompute_costing_for_work_orders",
+            queue="long",
+            work_orders=work_orders[start : start + RECOMPUTE_CHUNK_SIZE],
+        )
+
+
+def get_revalued_work_orders(repost) -> list[str]:
+    """
+    Work Orders whose transfer or manufacture entries were revalued.
+
+    Read from the repost's affected transactions (plus its own voucher), kept
+    to submitted Stock Entries of a costing purpose.
+    """
+    vouchers = set()
+    for row in frappe.parse_json(repost.get("affected_transactions") or "[]") or []:
+        if len(row) >= 2 and row[0] == "Stock Entry" and row[1]:
+            vouchers.add(row[1])
+
+    if repost.get("voucher_type") == "Stock Entry" and repost.get("voucher_no"):
+        vouchers.add(repost.voucher_no)
+
+    vouchers = sorted(vouchers)
+    work_orders = set()
+    for start in range(0, len(vouchers), VOUCHER_CHUNK_SIZE):
+        work_orders.update(
+            frappe.db.sql_list(
+                """
+                SELECT DISTINCT work_order
+                FROM `tabStock Entry`
+                WHERE name IN %(vouchers)s
+                  AND docstatus = 1
+                  AND IFNULL(work_order, '') != ''
+                  AND (purpose IN %(purposes)s OR stock_entry_type IN %(purposes)s)
+                """,
+                {
+                    "vouchers": tuple(vouchers[start : start + VOUCHER_CHUNK_SIZE]),
+                    "purposes": COSTING_PURPOSES,
+                },
+            )
+        )
+
+    return sorted(work_orders)
+
+
+def recompute_costing_for_work_orders(work_orders: list[str]) -> None:
+    """Background job: recompute costing of one chunk of revalued Work Orders."""
+    from c4factory.c4_manufacturing.stock_entry_hooks import recompute_work_order_costing
+    from c4factory.c4_manufacturing.work_order_freeze import thawed_work_order
+
+    for wo_name in work_orders or []:
+        try:
+            # A revaluation is a posting, so finished Work Orders are refreshed too.
+            with thawed_work_order(wo_name):
+                recompute_work_order_costing(wo_name)
+        except Exception:
+            frappe.log_error(
+                frappe.get_traceback(),
+                f"C4Factory: costing refresh after repost failed ({wo_name})",
+            )
@@ -4,6 +4,14 @@ import frappe
 from frappe import _
 from frappe.utils import flt
 
+from c4factory.c4_manufacturing.progress_events import queue_work_order_progress
+from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+    cost_snapshot_reference,
+    record_cost_snapshot,
+)
+from c4factory.c4_manufacturing.recompute_batch import defer_recompute
+from c4factory.c4_manufacturing.work_order_freeze import is_work_order_frozen
+
 
 # ============================================================
 # Helper: get WO items table regardless of field name
@@ -42,38 +50,17 @@ def validate_additional_material_transfer(doc, method: str | None = None) -> Non
             _("Additional Material Stock Entry requires an originating Pick List")
         )
 
-    pl = frappe.get_doc("Pick List", origin_pick_list)
-    if pl.docstatus != 1:
-        frappe.throw(_("Pick List {0} must be submitted").format(pl.name))
-
-    if not pl.get("work_order"):
-        frappe.throw(_("Pick List {0} is not linked to a Work Order").format(pl.name))
+    sub_pick_list = doc.get("custom_sub_pick_list")
+    context = _get_additional_material_context(doc, origin_pick_list, sub_pick_list)
+    pl, wo = context.pl, context.wo
+    sub_rows, sub_balances = context.sub_rows, context.sub_balances
 
     from c4factory.api.work_order_flow import (
         _validate_work_order_for_additional_material,
     )
 
-    wo = frappe.get_doc("Work Order", pl.work_order)
     _validate_work_order_for_additional_material(wo)
 
-    sub_pick_list = doc.get("custom_sub_pick_list")
-    sub_rows = {}
-    sub_balances = {}
-    if sub_pick_list:
-        sub = frappe.get_doc("Sub Pick List", sub_pick_list)
-        if (
-            sub.docstatus != 1
-            or sub.main_pick_list != pl.name
-            or sub.work_order != wo.name
-        ):
-            frappe.throw(_("Invalid Sub Pick List relationship"))
-        sub_rows = {row.name: row for row in sub.items}
-        from c4factory.c4factory.doctype.sub_pick_list.sub_pick_list import (
-            _get_balances,
-        )
-
-        sub_balances = _get_balances(sub)
-
     doc.stock_entry_type = "Material Transfer for Manufacture"
     doc.purpose = "Material Transfer for Manufacture"
     doc.company = wo.company
@@ -134,6 +121,55 @@ def validate_additional_material_transfer(doc, method: str | None = None) -> Non
             )
 
 
+def _get_additional_material_context(doc, origin_pick_list: str, sub_pick_list: str | None):
+    """
+    Load the Pick List, Work Order and Sub Pick List balances once per request.
+
+    validate and before_submit both run the additional-material check, so the
+    loaded documents are kept on doc.flags for the second call.
+    """
+    key = (origin_pick_list, sub_pick_list or "")
+    context = doc.flags.get("c4_additional_material_context")
+    if context and context.key == key:
+        return context
+
+    pl = frappe.get_doc("Pick List", origin_pick_list)
+    if pl.docstatus != 1:
+        frappe.throw(_("Pick List {0} must be submitted").format(pl.name))
+
+    if not pl.get("work_order"):
+        frappe.throw(_("Pick List {0} is not linked to a Work Order").format(pl.name))
+
+    wo = frappe.get_doc("Work Order", pl.work_order)
+
+    sub_rows = {}
+    sub_balances = {}
+    if sub_pick_list:
+        sub = frappe.get_doc("Sub Pick List", sub_pick_list)
+        if (
+            sub.docstatus != 1
+            or sub.main_pick_list != pl.name
+            or sub.work_order != wo.name
+        ):
+            frappe.throw(_("Invalid Sub Pick List relationship"))
+        sub_rows = {row.name: row for row in sub.items}
+        from c4factory.c4factory.doctype.sub_pick_list.sub_pick_list import (
+            _get_balances,
+        )
+
+        sub_balances = _get_balances(sub)
+
+    context = frappe._dict(
+        key=key,
+        pl=pl,
+        wo=wo,
+        sub_rows=sub_rows,
+        sub_balances=sub_balances,
+    )
+    doc.flags.c4_additional_material_context = context
+    return context
+
+
 def set_pick_list_transferred_production_qty(doc, method: str | None = None) -> None:
     """
     Set the production-equivalent quantity for a main Pick List transfer.
@@ -456,12 +492,50 @@ def _get_actual_transferred_qty(
     )
 
 
-def _set_work_order_item_balances(
-    row_name: str,
+def _get_actual_transferred_qty_map(
+    work_order: str,
+    wip_warehouse: str | None,
+    item_codes=None,
+) -> dict[tuple[str, str], float]:
+    """Grouped form of _get_actual_transferred_qty: (item_code, source) -> qty."""
+    conditions = ""
+    values = {"work_order": work_order, "wip_warehouse": wip_warehouse or ""}
+    if item_codes:
+        conditions = "AND sed.item_code IN %(item_codes)s"
+        values["item_codes"] = tuple(set(item_codes))
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            sed.item_code,
+            COALESCE(sed.s_warehouse, '') AS source_warehouse,
+            COALESCE(SUM(
+                ABS(CASE
+                    WHEN COALESCE(sed.transfer_qty, 0) != 0
+                    THEN sed.transfer_qty
+                    ELSE sed.qty * COALESCE(NULLIF(sed.conversion_factor, 0), 1)
+                END)
+            ), 0) AS qty
+        FROM `tabStock Entry Detail` sed
+        INNER JOIN `tabStock Entry` se ON se.name = sed.parent
+        WHERE se.docstatus = 1
+          AND se.work_order = %(work_order)s
+          AND se.stock_entry_type = 'Material Transfer for Manufacture'
+          AND COALESCE(sed.t_warehouse, '') = %(wip_warehouse)s
+          {conditions}
+        GROUP BY sed.item_code, COALESCE(sed.s_warehouse, '')
+        """,
+        values,
+        as_dict=True,
+    )
+    return {(row.item_code, row.source_warehouse): flt(row.qty) for row in rows}
+
+
+def _get_work_order_item_balance_values(
     required_qty: float,
     transferred_qty: float,
     consumed_qty: float,
-) -> None:
+) -> dict:
     values = {}
     meta = frappe.get_meta("Work Order Item")
     if meta.has_field("custom_balance_to_transfer"):
@@ -470,6 +544,18 @@ def _set_work_order_item_balances(
         )
     if meta.has_field("custom_balance_to_consume"):
         values["custom_balance_to_consume"] = max(required_qty - consumed_qty, 0.0)
+    return values
+
+
+def _set_work_order_item_balances(
+    row_name: str,
+    required_qty: float,
+    transferred_qty: float,
+    consumed_qty: float,
+) -> None:
+    values = _get_work_order_item_balance_values(
+        required_qty, transferred_qty, consumed_qty
+    )
     if values:
         frappe.db.set_value(
             "Work Order Item",
@@ -759,16 +845,37 @@ def _get_work_order_operating_cost_from_job_cards(
     work_order_name: str, pick_lists: set[str] | None = None
 ) -> float:
     """Return actual operating cost from Job Cards linked to the Work Order."""
+    return sum(cost for _jc, cost in _iter_job_card_operating_costs(work_order_name, pick_lists))
+
+
+def get_pick_list_operating_costs(work_order_name: str, pick_lists) -> dict[str, float]:
+    """
+    Operating cost of several Pick Lists of one Work Order, from one Job Card
+    query grouped by custom_pick_list.
+    """
+    costs = dict.fromkeys(pick_lists or [], 0.0)
+    if not costs:
+        return costs
+
+    for jc, cost in _iter_job_card_operating_costs(work_order_name, set(costs)):
+        if jc.get("custom_pick_list") in costs:
+            costs[jc.custom_pick_list] += cost
+
+    return costs
+
+
+def _iter_job_card_operating_costs(work_order_name: str, pick_lists: set[str] | None = None):
+    """Yield (job card row, actual operating cost) for the Work Order's Job Cards."""
     if not work_order_name:
-        return 0.0
+        return
 
     if flt(frappe.db.get_value("Work Order", work_order_name, "custom_disable_operation")):
-        return 0.0
+        return
 
     try:
         jc_meta = frappe.get_meta("Job Card")
     except Exception:
-        return 0.0
+        return
 
     has_total_operating_cost = jc_meta.has_field("total_operating_cost")
     has_total_time_in_mins = jc_meta.has_field("total_time_in_mins")
@@ -797,13 +904,12 @@ def _get_work_order_operating_cost_from_job_cards(
     }
     if pick_lists:
         if not jc_meta.has_field("custom_pick_list"):
-            return 0.0
+            return
         filters["custom_pick_list"] = ["in", list(pick_lists)]
         fields.append("custom_pick_list")
 
     jc_rows = frappe.get_all("Job Card", filters=filters, fields=fields)
 
-    total = 0.0
     for jc in jc_rows:
         status = (jc.get("status") or "").strip()
         if status == "Cancelled":
@@ -811,25 +917,23 @@ def _get_work_order_operating_cost_from_job_cards(
 
         cost = flt(jc.get("total_operating_cost"))
         if cost > 0:
-            total += cost
+            yield jc, cost
             continue
 
         cost = _get_job_card_cost_from_time_logs(jc.get("name"))
         if cost > 0:
-            total += cost
+            yield jc, cost
             continue
 
         cost = _get_job_card_cost_from_work_order_operation(work_order_name, jc)
         if cost > 0:
-            total += cost
+            yield jc, cost
             continue
 
         mins = flt(jc.get("total_time_in_mins"))
         rate = _get_job_card_hour_rate(jc)
         if mins > 0 and rate > 0:
-            total += (mins / 60.0) * rate
-
-    return total
+            yield jc, (mins / 60.0) * rate
 
 
 def _get_job_card_cost_from_work_order_operation(work_order_name: str, jc_row) -> float:
@@ -1025,10 +1129,11 @@ def on_submit_update_work_order_costing(doc, method: str | None = None) -> None:
     Recalculate the Work Order costing (raw / scrap / total) from all
     submitted Stock Entries linked to this Work Order.
     """
-    if not doc.work_order:
+    if not doc.work_order or defer_recompute(work_orders=[doc.work_order]):
         return
 
-    _recalculate_work_order_costs(doc.work_order)
+    with cost_snapshot_reference(doc):
+        _recalculate_work_order_costs(doc.work_order)
 
 
 @frappe.whitelist()
@@ -1058,54 +1163,87 @@ def _recalculate_work_order_costs(work_order_name: str) -> None:
       - Use transfer_qty * basic_rate as the amount
     - Operating Cost = sum of actual Job Card operating cost
     - Total Cost = Raw + Operating - Scrap
+
+    Frozen (finished) Work Orders keep their snapshot unless a posting
+    thawed them.
     """
+    if is_work_order_frozen(work_order_name):
+        return
+
     wo = frappe.get_doc("Work Order", work_order_name)
+    values = get_work_order_cost_values(
+        work_order_name,
+        _get_work_order_material_costs([work_order_name]).get(work_order_name),
+    )
+
+    record_cost_snapshot(wo, values)
+
+    # Write back to Work Order custom fields
+    for fieldname, value in values.items():
+        wo.db_set(fieldname, value)
+
+    queue_work_order_progress(work_order_name)
+
+
+def get_work_order_cost_values(work_order_name: str, material_costs=None) -> dict:
+    """
+    Cost fields of one Work Order: raw and scrap material cost from its
+    submitted Stock Entries, operating cost from its Job Cards.
+    """
+    raw_material_cost, scrap_material_cost = material_costs or (0.0, 0.0)
+
+    # Operating cost from actual Job Cards linked to the Work Order
+    operating_cost = _get_work_order_operating_cost_from_job_cards(work_order_name)
+
+    return {
+        "c4_raw_material_cost": raw_material_cost,
+        "c4_scrap_material_cost": scrap_material_cost,
+        "c4_operating_cost": operating_cost,
+        "c4_total_cost": raw_material_cost + operating_cost - scrap_material_cost,
+    }
+
+
+def _get_work_order_material_costs(work_order_names) -> dict[str, tuple[float, float]]:
+    """
+    (raw, scrap) material cost of many Work Orders from one grouped query.
+
+    Finished items are the result and are not counted; raw cost is counted
+    only on Material Transfer for Manufacture so later WIP consumption is not
+    counted a second time.
+    """
+    work_order_names = list({name for name in work_order_names or [] if name})
+    if not work_order_names:
+        return {}
 
-    # Fetch all Stock Entry rows for this Work Order
     rows = frappe.db.sql(
         """
         SELECT
-            sed.is_finished_item,
-            sed.is_scrap_item,
-            sed.transfer_qty,
-            sed.basic_rate,
-            se.stock_entry_type
+            se.work_order,
+            COALESCE(SUM(CASE
+                WHEN COALESCE(sed.is_scrap_item, 0) = 0
+                 AND COALESCE(sed.is_finished_item, 0) = 0
+                 AND se.stock_entry_type = 'Material Transfer for Manufacture'
+                THEN ABS(sed.transfer_qty) * ABS(sed.basic_rate)
+                ELSE 0
+            END), 0) AS raw_material_cost,
+            COALESCE(SUM(CASE
+                WHEN COALESCE(sed.is_scrap_item, 0) = 1
+                THEN ABS(sed.transfer_qty) * ABS(sed.basic_rate)
+                ELSE 0
+            END), 0) AS scrap_material_cost
         FROM `tabStock Entry Detail` sed
         INNER JOIN `tabStock Entry` se
             ON se.name = sed.parent
         WHERE
             se.docstatus = 1
-            AND se.work_order = %s
+            AND se.work_order IN %(work_orders)s
+        GROUP BY se.work_order
         """,
-        (work_order_name,),
+        {"work_orders": tuple(work_order_names)},
         as_dict=True,
     )
 
-    raw_material_cost = 0.0
-    scrap_material_cost = 0.0
-
-    for r in rows:
-        qty = abs(flt(r.transfer_qty))
-        rate = abs(flt(r.basic_rate))
-        amount = qty * rate
-
-        # finished item cost is not counted here (it is the result)
-        if r.is_scrap_item:
-            scrap_material_cost += amount
-        elif (
-            not r.is_finished_item
-            and r.stock_entry_type == "Material Transfer for Manufacture"
-        ):
-            raw_material_cost += amount
-
-    # Operating cost from actual Job Cards linked to the Work Order
-    operating_cost = _get_work_order_operating_cost_from_job_cards(work_order_name)
-
-    # Write back to Work Order custom fields
-    wo.db_set("c4_raw_material_cost", raw_material_cost)
-    wo.db_set("c4_scrap_material_cost", scrap_material_cost)
-    wo.db_set("c4_operating_cost", operating_cost)
-    wo.db_set(
-        "c4_total_cost",
-        raw_material_cost + operating_cost - scrap_material_cost,
-    )
+    return {
+        row.work_order: (flt(row.raw_material_cost), flt(row.scrap_material_cost))
+        for row in rows
+    }
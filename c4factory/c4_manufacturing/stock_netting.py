@@ -0,0 +1,73 @@
+from __future__ import annotations
+
+from itertools import accumulate
+
+from frappe.utils import flt
+
+
+def net_supply(available: float, demand_qtys: list[float]) -> tuple[list[float], list[float]]:
+    """
+    Allocate one supply bucket to demands already sorted by priority.
+
+    Returns two lists aligned with ``demand_qtys``:
+      - the quantity still available when each demand is served
+      - the quantity allotted to each demand
+
+    Each demand takes ``min(qty, available - earlier demand)``, so the whole
+    bucket is netted from a running sum instead of mutating shared state.
+    A bucket without positive stock allots nothing and reports its raw value.
+    """
+    available = flt(available)
+    if available <= 0:
+        return [available] * len(demand_qtys), [0.0] * len(demand_qtys)
+
+    before, allotted = [], []
+    for qty, running in zip(demand_qtys, accumulate(demand_qtys), strict=True):
+        free = max(available - (running - qty), 0.0)
+        before.append(free)
+        allotted.append(min(qty, free) if qty > 0 else 0.0)
+
+    return before, allotted
+
+
+def allocate_by_priority(
+    supply_available: list[float],
+    demand_qty: list[float],
+    demand_supply: list[list[int]],
+) -> tuple[list[list[float]], list[list[float]]]:
+    """
+    Priority-ordered netting of many demands against many supply buckets.
+
+    ``demand_qty[i]`` is served from the supply indexes in ``demand_supply[i]``
+    in order; demands are listed by priority. All demands are netted against
+    their first bucket, the remainders against their second bucket, and so on,
+    so every bucket is resolved in one pass over its consumers.
+
+    Returns ``(before, allotted)`` where ``before[i][k]`` / ``allotted[i][k]``
+    describe demand ``i`` at its ``k``-th bucket. Levels that were not reached
+    because the demand was already covered are left out.
+    """
+    supply_left = [flt(qty) for qty in supply_available]
+    remaining = [flt(qty) for qty in demand_qty]
+    before = [[] for _qty in demand_qty]
+    allotted = [[] for _qty in demand_qty]
+
+    levels = max((len(buckets) for buckets in demand_supply), default=0)
+    for level in range(levels):
+        consumers = {}
+        for index, buckets in enumerate(demand_supply):
+            if level >= len(buckets) or remaining[index] <= 0:
+                continue
+            consumers.setdefault(buckets[level], []).append(index)
+
+        for supply_index, members in consumers.items():
+            bucket_before, bucket_allotted = net_supply(
+                supply_left[supply_index], [remaining[index] for index in members]
+            )
+            for index, free, qty in zip(members, bucket_before, bucket_allotted, strict=True):
+                before[index].append(free)
+                allotted[index].append(qty)
+                remaining[index] -= qty
+            supply_left[supply_index] -= sum(bucket_allotted)
+
+    return before, allotted
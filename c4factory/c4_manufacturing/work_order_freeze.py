@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import frappe
+from frappe import _
+from frappe.utils import cint, flt, now_datetime
+
+FROZEN_FIELD = "custom_costing_frozen"
+FROZEN_ON_FIELD = "custom_costing_frozen_on"
+SNAPSHOT_FIELD = "custom_frozen_snapshot"
+FROZEN_STATUSES = ("Completed", "Closed")
+SNAPSHOT_FIELDS = (
+    "c4_raw_material_cost",
+    "c4_scrap_material_cost",
+    "c4_operating_cost",
+    "c4_total_cost",
+    "material_transferred_for_manufacturing",
+    "produced_qty",
+)
+
+
+def _has_freeze_fields() -> bool:
+    return frappe.get_meta("Work Order").has_field(FROZEN_FIELD)
+
+
+def _thawed() -> set:
+    if frappe.flags.c4_thawed_work_orders is None:
+        frappe.flags.c4_thawed_work_orders = set()
+    return frappe.flags.c4_thawed_work_orders
+
+
+def is_work_order_frozen(wo_name: str | None) -> bool:
+    """
+    True when the Work Order holds a frozen costing/transfer snapshot.
+
+    Recomputes skip frozen Work Orders unless a posting thawed them first.
+    """
+    if not wo_name or wo_name in _thawed() or not _has_freeze_fields():
+        return False
+
+    return bool(cint(frappe.db.get_value("Work Order", wo_name, FROZEN_FIELD)))
+
+
+def freeze_work_order(wo_name: str) -> dict:
+    """Store the current cost components and transfer totals as the final snapshot."""
+    values = frappe.db.get_value("Work Order", wo_name, list(SNAPSHOT_FIELDS), as_dict=True) or {}
+    snapshot = {fieldname: flt(values.get(fieldname)) for fieldname in SNAPSHOT_FIELDS}
+
+    frappe.db.set_value(
+        "Work Order",
+        wo_name,
+        {
+            FROZEN_FIELD: 1,
+            FROZEN_ON_FIELD: now_datetime(),
+            SNAPSHOT_FIELD: frappe.as_json(snapshot),
+        },
+        update_modified=False,
+    )
+    return snapshot
+
+
+def unfreeze_work_order(wo_name: str) -> None:
+    frappe.db.set_value(
+        "Work Order",
+        wo_name,
+        {FROZEN_FIELD: 0, FROZEN_ON_FIELD: None, SNAPSHOT_FIELD: None},
+        update_modified=False,
+    )
+
+
+def sync_frozen_state(doc, method=None):
+    """
+    Work Order hook (on_change).
+
+    Freezes the Work Order when it reaches Completed or Closed and releases
+    the snapshot when it is reopened or cancelled.
+    """
+    if not _has_freeze_fields() or doc.name in _thawed():
+        return
+
+    try:
+        frozen = cint(frappe.db.get_value("Work Order", doc.name, FROZEN_FIELD))
+        if doc.docstatus == 1 and doc.status in FROZEN_STATUSES:
+            if not frozen:
+                freeze_work_order(doc.name)
+        elif frozen:
+            unfreeze_work_order(doc.name)
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "C4Factory: Work Order freeze sync failed")
+
+
+def thaw_work_order(wo_name: str | None) -> None:
+    """
+    Open a Work Order to recomputes for the rest of the request.
+
+    While thawed it is neither skipped nor frozen by status changes; pair it
+    with refreeze_work_order once the posting has been applied.
+    """
+    if wo_name:
+        _thawed().add(wo_name)
+
+
+def refreeze_work_order(wo_name: str | None, source=None) -> None:
+    """
+    Freeze a thawed Work Order again if it is still finished, and note on it
+    when a posting moved the values of an earlier snapshot.
+    """
+    if not wo_name or wo_name not in _thawed():
+        return
+
+    _thawed().discard(wo_name)
+    values = frappe.db.get_value("Work Order", wo_name, ["status", SNAPSHOT_FIELD], as_dict=True)
+    if not values:
+        return
+
+    if values.status not in FROZEN_STATUSES:
+        if values.get(SNAPSHOT_FIELD):
+            unfreeze_work_order(wo_name)
+        return
+
+    previous = frappe.parse_json(values.get(SNAPSHOT_FIELD) or "{}")
+    snapshot = freeze_work_order(wo_name)
+    changed = [
+        fieldname
+        for fieldname in SNAPSHOT_FIELDS
+        if previous and abs(flt(previous.get(fieldname)) - snapshot[fieldname]) > 1e-9
+    ]
+    if changed and source:
+        frappe.get_doc("Work Order", wo_name).add_comment(
+            "Info",
+            _("Frozen costing updated by {0} {1}: {2}").format(
+                _(source.doctype), source.name, ", ".join(changed)
+            ),
+        )
+
+
+@contextmanager
+def thawed_work_order(wo_name: str, source=None):
+    """Thaw a frozen Work Order around a recompute and take a new snapshot after it."""
+    thaw_work_order(wo_name)
+    try:
+        yield
+    finally:
+        refreeze_work_order(wo_name, source)
+
+
+def thaw_for_stock_entry(doc, method=None):
+    """
+    Stock Entry hook (before_submit / before_cancel).
+
+    Runs ahead of ERPNext's own Work Order update, so the posting is applied
+    and recomputed before the Work Order is frozen again.
+    """
+    thaw_work_order(doc.get("work_order"))
+
+
+def refreeze_after_stock_entry(doc, method=None):
+    """Stock Entry hook (last on_submit / on_cancel hook)."""
+    from c4factory.c4_manufacturing.recompute_batch import defer_recompute
+
+    # A batched recompute freezes the Work Order again once it has run.
+    if defer_recompute(work_orders=[doc.get("work_order")]):
+        return
+
+    try:
+        refreeze_work_order(doc.get("work_order"), doc)
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "C4Factory: Work Order refreeze failed")
+
+
+@frappe.whitelist()
+def recompute_frozen_work_order(work_order: str) -> dict:
+    """Controlled thaw: recompute a frozen Work Order from its entries and freeze it again."""
+    frappe.only_for(("System Manager", "Manufacturing Manager"))
+
+    from c4factory.api.work_order_flow import _recompute_wo_material_transfer_from_pls
+    from c4factory.c4_manufacturing.stock_entry_hooks import recompute_work_order_costing
+
+    wo = frappe.get_doc("Work Order", work_order)
+    with thawed_work_order(wo.name, wo):
+        _recompute_wo_material_transfer_from_pls(wo.name)
+        recompute_work_order_costing(wo.name)
+
+    return frappe.parse_json(frappe.db.get_value("Work Order", wo.name, SNAPSHOT_FIELD) or "{}")
+
+
+def freeze_finished_work_orders() -> None:
+    """Freeze every finished Work Order that is not frozen yet (patch backfill)."""
+    if not _has_freeze_fields():
+        return
+
+    for wo_name in frappe.get_all(
+        "Work Order",
+        filters={"docstatus": 1, "status": ["in", FROZEN_STATUSES], FROZEN_FIELD: 0},
+        pluck="name",
+    ):
+        freeze_work_order(wo_name)
@@ -77,7 +77,13 @@ def update_scrap_and_costing(doc, method=None):
         c4_raw_material_cost    = value of Material Transfers to WIP (actual SE)
         c4_operating_cost       = actual Job Card operating cost
         c4_total_cost           = raw + operating - scrap
+
+    Skipped for frozen (finished) Work Orders, which keep their snapshot.
     """
+    from c4factory.c4_manufacturing.work_order_freeze import is_work_order_frozen
+
+    if not doc.is_new() and is_work_order_frozen(doc.name):
+        return
 
     # --- 1) Scrap rows + Scrap Material Cost ---
     total_scrap_amount = 0.0
@@ -113,6 +119,18 @@ def update_scrap_and_costing(doc, method=None):
 
     doc.c4_total_cost = float(raw) + float(op) - float(scrap)
 
+    from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+        COST_FIELDS,
+        record_cost_snapshot,
+    )
+
+    record_cost_snapshot(
+        doc,
+        {fieldname: doc.get(fieldname) for fieldname in COST_FIELDS},
+        previous=doc.get_doc_before_save() or {},
+        reference=(doc.doctype, doc.name),
+    )
+
 
 def _get_raw_material_cost_from_material_transfers(work_order_name, wip_warehouse):
     """
@@ -238,6 +256,96 @@ def get_default_source_warehouse(
     return _get_default_warehouse_from_item_group(item_group, company)
 
 
+@frappe.whitelist()
+def get_default_source_warehouses(items) -> list[str | None]:
+    """
+    Batch form of get_default_source_warehouse for grid edits.
+
+    ``items`` is a list of {item_code, company, item_group?}; the result holds
+    one warehouse (or None) per entry, in the same order. Item Groups are read
+    with one query and resolved against the cached Item Group warehouse map.
+    """
+    items = frappe.parse_json(items) or []
+    missing_groups = {
+        row.get("item_code")
+        for row in items
+        if row.get("item_code") and not row.get("item_group")
+    }
+    item_groups = {}
+    if missing_groups:
+        item_groups = dict(
+            frappe.get_all(
+                "Item",
+                filters={"name": ["in", list(missing_groups)]},
+                fields=["name", "item_group"],
+                as_list=True,
+            )
+        )
+
+    warehouse_map = get_item_group_warehouse_map()
+    return [
+        _resolve_item_group_warehouse(
+            warehouse_map,
+            row.get("item_group") or item_groups.get(row.get("item_code")),
+            row.get("company"),
+        )
+        for row in items
+    ]
+
+
+ITEM_GROUP_WAREHOUSE_MAP_CACHE_KEY = "c4factory:item_group_warehouse_map"
+
+
+def get_item_group_warehouse_map() -> dict:
+    """
+    Parent and warehouse defaults of every Item Group, read in two queries
+    and cached until an Item Group changes.
+
+    {item_group: {"parent": str, "defaults": [[company, warehouse], ...], "direct": str}}
+    """
+    warehouse_map = frappe.cache().get_value(ITEM_GROUP_WAREHOUSE_MAP_CACHE_KEY)
+    if warehouse_map is not None:
+        return warehouse_map
+
+    meta = frappe.get_meta("Item Group")
+    direct_fields = [
+        fieldname for fieldname in ("default_warehouse", "warehouse") if meta.has_field(fieldname)
+    ]
+
+    warehouse_map = {}
+    for group in frappe.get_all("Item Group", fields=["name", "parent_item_group", *direct_fields]):
+        warehouse_map[group.name] = {
+            "parent": group.parent_item_group,
+            "defaults": [],
+            "direct": next(
+                (group.get(fieldname) for fieldname in direct_fields if group.get(fieldname)), None
+            ),
+        }
+
+    for row in frappe.get_all(
+        "Item Default",
+        filters={"parenttype": "Item Group"},
+        fields=["parent", "company", "default_warehouse"],
+        order_by="parent asc, idx asc",
+    ):
+        if row.parent in warehouse_map and row.default_warehouse:
+            warehouse_map[row.parent]["defaults"].append([row.company, row.default_warehouse])
+
+    frappe.cache().set_value(ITEM_GROUP_WAREHOUSE_MAP_CACHE_KEY, warehouse_map)
+    return warehouse_map
+
+
+def clear_item_group_warehouse_map(doc=None, method=None, *args):
+    """Item Group hook (on_update / on_trash / after_rename)."""
+
+    def clear():
+        frappe.cache().delete_value(ITEM_GROUP_WAREHOUSE_MAP_CACHE_KEY)
+
+    # Again after commit: a concurrent read may rebuild the map from the old state meanwhile.
+    clear()
+    frappe.db.after_commit.add(clear)
+
+
 def _get_default_warehouse_from_item_group(item_group: str, company: str | None = None) -> str | None:
     """
     Return Item Group Defaults -> default_warehouse, traversing parent_item_group
@@ -246,12 +354,18 @@ def _get_default_warehouse_from_item_group(item_group: str, company: str | None
     ERPNext stores Item/Item Group defaults in the child DocType "Item Default".
     Prefer a row for the Work Order company, then a company-less/global row.
     """
+    return _resolve_item_group_warehouse(get_item_group_warehouse_map(), item_group, company)
+
+
+def _resolve_item_group_warehouse(
+    warehouse_map: dict, item_group: str | None, company: str | None = None
+) -> str | None:
     seen = set()
     current = item_group
 
     while current and current not in seen:
         seen.add(current)
-        group = frappe.get_cached_doc("Item Group", current)
+        group = warehouse_map.get(current)
         if not group:
             return None
 
@@ -259,7 +373,7 @@ def _get_default_warehouse_from_item_group(item_group: str, company: str | None
         if default_wh:
             return default_wh
 
-        parent = group.get("parent_item_group")
+        parent = group.get("parent")
         if not parent or parent == current:
             return None
 
@@ -268,28 +382,19 @@ def _get_default_warehouse_from_item_group(item_group: str, company: str | None
     return None
 
 
-def _get_default_warehouse_from_item_group_defaults(group, company: str | None = None) -> str | None:
-    defaults = []
-    for fieldname in ("item_group_defaults", "item_defaults", "defaults"):
-        defaults.extend(group.get(fieldname) or [])
-
-    direct_warehouse = group.get("default_warehouse") or group.get("warehouse")
+def _get_default_warehouse_from_item_group_defaults(group: dict, company: str | None = None) -> str | None:
+    defaults = group.get("defaults") or []
 
-    if defaults:
-        if company:
-            for row in defaults:
-                warehouse = row.get("default_warehouse") or row.get("warehouse")
-                if row.get("company") == company and warehouse:
-                    return warehouse
-
-        for row in defaults:
-            warehouse = row.get("default_warehouse") or row.get("warehouse")
-            if not row.get("company") and warehouse:
+    if company:
+        for row_company, warehouse in defaults:
+            if row_company == company:
                 return warehouse
 
-        for row in defaults:
-            warehouse = row.get("default_warehouse") or row.get("warehouse")
-            if warehouse:
-                return warehouse
+    for row_company, warehouse in defaults:
+        if not row_company:
+            return warehouse
+
+    if defaults:
+        return defaults[0][1]
 
-    return direct_warehouse
+    return group.get("direct")
@@ -0,0 +1,18 @@
+frappe.ui.form.on("C4Factory Settings", {
+  refresh(frm) {
+    if (!frappe.user.has_role("System Manager")) return;
+
+    frm.add_custom_button(__("Backfill Legacy Pick List Links"), () => {
+      frappe.call({
+        method:
+          "c4factory.c4_manufacturing.legacy_pick_list_links.start_legacy_pick_list_link_backfill",
+        callback: () => {
+          frappe.show_alert({
+            message: __("Backfill queued. Reload this page to see its result."),
+            indicator: "blue",
+          });
+        },
+      });
+    });
+  },
+});
@@ -0,0 +1,18 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+
+
+class C4FactorySettings(Document):
+    pass
+
+
+def get_c4factory_setting(fieldname: str, default=None):
+    """Read one C4Factory Settings value, tolerating sites not migrated yet."""
+    try:
+        value = frappe.db.get_single_value("C4Factory Settings", fieldname, cache=True)
+    except Exception:
+        return default
+
+    return default if value is None else value
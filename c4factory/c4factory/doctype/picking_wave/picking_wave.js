@@ -0,0 +1,45 @@
+frappe.ui.form.on("Picking Wave", {
+  setup(frm) {
+    frm.set_query("pick_list", "pick_lists", () => ({
+      filters: {
+        docstatus: 1,
+        company: frm.doc.company,
+        status: ["!=", "Completed"],
+      },
+    }));
+  },
+
+  refresh(frm) {
+    if (frm.is_new() || frm.doc.status !== "Draft") return;
+
+    frm.add_custom_button(
+      __("Create Transfers"),
+      () => make_wave_transfers(frm),
+      __("Factory")
+    );
+  },
+});
+
+async function make_wave_transfers(frm) {
+  if (frm.is_dirty()) {
+    await frm.save();
+  }
+
+  const { message } = await frappe.call({
+    method:
+      "c4factory.c4factory.doctype.picking_wave.picking_wave.make_wave_transfers",
+    args: { picking_wave: frm.doc.name },
+    freeze: true,
+    freeze_message: __("Creating Stock Entries..."),
+  });
+
+  const stock_entries = message || [];
+  frappe.msgprint({
+    title: __("Stock Entries Created"),
+    message: stock_entries
+      .map((name) => frappe.utils.get_form_link("Stock Entry", name, true))
+      .join("<br>"),
+    indicator: "green",
+  });
+  frm.reload_doc();
+}
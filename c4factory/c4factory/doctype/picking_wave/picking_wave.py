@@ -0,0 +1,228 @@
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt
+
+from c4factory.api.work_order_flow import (
+    _get_pick_list_balances_map,
+    insert_partial_stock_entry_from_pick_list,
+)
+from c4factory.c4_manufacturing.stock_netting import net_supply
+
+WALK_SEQUENCE_FIELD = "c4_pick_walk_sequence"
+
+
+class PickingWave(Document):
+    def validate(self):
+        self._validate_pick_lists()
+
+        if self.status == "Draft" and self._tasks_are_stale():
+            self.build_tasks()
+
+    def _validate_pick_lists(self):
+        seen = set()
+        for row in self.pick_lists:
+            if row.pick_list in seen:
+                frappe.throw(_("Pick List {0} is added more than once").format(row.pick_list))
+            seen.add(row.pick_list)
+
+            pick_list = frappe.db.get_value(
+                "Pick List",
+                row.pick_list,
+                ["docstatus", "company", "work_order"],
+                as_dict=True,
+            )
+            if not pick_list or pick_list.docstatus != 1:
+                frappe.throw(_("Pick List {0} must be submitted").format(row.pick_list))
+            if pick_list.company != self.company:
+                frappe.throw(
+                    _("Pick List {0} belongs to another company").format(row.pick_list)
+                )
+            if not pick_list.work_order:
+                frappe.throw(
+                    _("Pick List {0} is not linked to a Work Order").format(row.pick_list)
+                )
+            row.work_order = pick_list.work_order
+
+    def _tasks_are_stale(self) -> bool:
+        if not self.tasks or self.has_value_changed("walk_order"):
+            return True
+
+        allocated = {row.pick_list for row in self.allocations}
+        return allocated != {row.pick_list for row in self.pick_lists}
+
+    def build_tasks(self):
+        """
+        Merge the open balances of every Pick List into one task per source
+        warehouse and item, sorted in the wave's walk order.
+
+        Each Pick List Item keeps its own allocation row, in the order of the
+        Pick Lists table, so transfers stay linked to their Pick List rows.
+        """
+        tasks = {}
+        for wave_row in self.pick_lists:
+            pick_list = frappe.get_doc("Pick List", wave_row.pick_list)
+            balances = _get_pick_list_balances_map(pick_list)
+
+            for location in pick_list.get("locations") or []:
+                balance = flt((balances.get(location.name) or {}).get("balance"))
+                if balance <= 0.000001 or not location.warehouse:
+                    continue
+
+                key = (location.warehouse, location.item_code)
+                task = tasks.setdefault(
+                    key,
+                    frappe._dict(
+                        warehouse=location.warehouse,
+                        item_code=location.item_code,
+                        item_name=location.item_name,
+                        stock_uom=location.get("stock_uom") or location.get("uom"),
+                        qty=0.0,
+                        allocations=[],
+                    ),
+                )
+                task.qty += balance
+                task.allocations.append(
+                    {
+                        "pick_list": pick_list.name,
+                        "pick_list_item": location.name,
+                        "work_order": pick_list.work_order,
+                        "item_code": location.item_code,
+                        "warehouse": location.warehouse,
+                        "qty": balance,
+                    }
+                )
+
+        self.set("tasks", [])
+        self.set("allocations", [])
+        for sequence, task in enumerate(self._sort_tasks(tasks.values()), start=1):
+            self.append(
+                "tasks",
+                {
+                    "sequence": sequence,
+                    "warehouse": task.warehouse,
+                    "item_code": task.item_code,
+                    "item_name": task.item_name,
+                    "stock_uom": task.stock_uom,
+                    "qty": task.qty,
+                    "picked_qty": task.qty,
+                    "pick_lists": len({row["pick_list"] for row in task.allocations}),
+                },
+            )
+            for allocation in task.allocations:
+                self.append("allocations", {"task": sequence, **allocation})
+
+    def _sort_tasks(self, tasks):
+        tasks = list(tasks)
+        if self.walk_order == "Item Code":
+            return sorted(tasks, key=lambda task: (task.item_code, task.warehouse))
+
+        if self.walk_order == "Warehouse":
+            return sorted(tasks, key=lambda task: (task.warehouse, task.item_code))
+
+        walk_sequence = _get_walk_sequence({task.warehouse for task in tasks})
+        # Warehouses without a walk sequence come after the sequenced ones.
+        return sorted(
+            tasks,
+            key=lambda task: (
+                walk_sequence.get(task.warehouse) is None,
+                walk_sequence.get(task.warehouse) or 0,
+                task.warehouse,
+                task.item_code,
+            ),
+        )
+
+
+def _get_walk_sequence(warehouses) -> dict[str, int]:
+    """Walk sequence of the warehouses that have one; an unset (0) sequence is left out."""
+    if not warehouses or not frappe.get_meta("Warehouse").has_field(WALK_SEQUENCE_FIELD):
+        return {}
+
+    return {
+        row.name: cint(row.get(WALK_SEQUENCE_FIELD))
+        for row in frappe.get_all(
+            "Warehouse",
+            filters={"name": ["in", list(warehouses)]},
+            fields=["name", WALK_SEQUENCE_FIELD],
+        )
+        if cint(row.get(WALK_SEQUENCE_FIELD))
+    }
+
+
+@frappe.whitelist()
+def make_picking_wave(pick_lists: str | list, walk_order: str | None = None) -> str:
+    """Create a Picking Wave from selected submitted Pick Lists."""
+    pick_lists = frappe.parse_json(pick_lists) if isinstance(pick_lists, str) else pick_lists
+    pick_lists = list(dict.fromkeys(name for name in pick_lists or [] if name))
+    if not pick_lists:
+        frappe.throw(_("Select at least one Pick List."))
+
+    wave = frappe.new_doc("Picking Wave")
+    wave.company = frappe.db.get_value("Pick List", pick_lists[0], "company")
+    if walk_order:
+        wave.walk_order = walk_order
+
+    for pick_list in pick_lists:
+        wave.append("pick_lists", {"pick_list": pick_list})
+
+    wave.insert()
+    return wave.name
+
+
+@frappe.whitelist()
+def make_wave_transfers(picking_wave: str) -> list[str]:
+    """
+    Create one draft Material Transfer per Pick List from the picked tasks.
+
+    Picked quantities fill the earliest Pick Lists of the wave first, so a short
+    pick falls on the last ones; every Stock Entry row keeps its
+    custom_pick_list_item link. All transfers and the wave status are
+    committed together, so a failure never leaves transfers behind a wave
+    that is still Draft.
+    """
+    wave = frappe.get_doc("Picking Wave", picking_wave, for_update=True)
+    wave.check_permission("write")
+
+    if wave.status != "Draft":
+        frappe.throw(_("Transfers were already created for Picking Wave {0}").format(wave.name))
+
+    allocations_by_task = {}
+    for allocation in wave.allocations:
+        allocations_by_task.setdefault(allocation.task, []).append(allocation)
+
+    items_by_pick_list = {}
+    picked_rows = set()
+    for task in wave.tasks:
+        allocations = allocations_by_task.get(task.sequence) or []
+        picked_qty = min(flt(task.picked_qty), flt(task.qty))
+        _before, allotted = net_supply(picked_qty, [flt(row.qty) for row in allocations])
+
+        for allocation, qty in zip(allocations, allotted, strict=True):
+            if qty <= 0:
+                continue
+            picked_rows.add(allocation.name)
+            items_by_pick_list.setdefault(allocation.pick_list, []).append(
+                {"pl_item_name": allocation.pick_list_item, "qty": qty}
+            )
+
+    if not items_by_pick_list:
+        frappe.throw(_("Nothing was picked in Picking Wave {0}").format(wave.name))
+
+    stock_entries = {}
+    for wave_row in wave.pick_lists:
+        items = items_by_pick_list.get(wave_row.pick_list)
+        if items:
+            stock_entries[wave_row.pick_list] = insert_partial_stock_entry_from_pick_list(
+                wave_row.pick_list, items
+            ).name
+
+    for allocation in wave.allocations:
+        if allocation.name in picked_rows:
+            allocation.stock_entry = stock_entries.get(allocation.pick_list)
+
+    wave.status = "Transferred"
+    wave.save()
+    frappe.db.commit()
+    return list(stock_entries.values())
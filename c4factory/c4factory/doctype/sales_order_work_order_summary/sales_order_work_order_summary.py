@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import cint, flt, now_datetime
+
+SUMMARY_DOCTYPE = "Sales Order Work Order Summary"
+SUMMARY_FIELDS = ("work_order", "work_order_count", "wo_qty", "manufactured_qty")
+REBUILD_CHUNK_SIZE = 500
+
+
+class SalesOrderWorkOrderSummary(Document):
+    pass
+
+
+def on_doctype_update():
+    frappe.db.add_index(SUMMARY_DOCTYPE, ["sales_order", "production_item"])
+
+
+def refresh_sales_order_summary(sales_orders) -> None:
+    """
+    Recompute the Work Order summary rows of the given Sales Orders.
+
+    One grouped query per call; rows are updated in place, created when a new
+    (sales_order, production_item) pair appears and removed when the last
+    Work Order of a pair is cancelled or deleted.
+    """
+    sales_orders = sorted({so for so in sales_orders or [] if so})
+    if not sales_orders:
+        return
+
+    aggregates = {
+        (row.sales_order, row.production_item): row
+        for row in frappe.db.sql(
+            """
+            SELECT
+                sales_order,
+                production_item,
+                MAX(name) AS work_order,
+                COUNT(name) AS work_order_count,
+                SUM(qty) AS wo_qty,
+                SUM(produced_qty) AS manufactured_qty
+            FROM `tabWork Order`
+            WHERE docstatus < 2
+              AND sales_order IN %(sales_orders)s
+            GROUP BY sales_order, production_item
+            """,
+            {"sales_orders": tuple(sales_orders)},
+            as_dict=True,
+        )
+    }
+
+    existing = {
+        (row.sales_order, row.production_item): row
+        for row in frappe.get_all(
+            SUMMARY_DOCTYPE,
+            filters={"sales_order": ["in", sales_orders]},
+            fields=["name", "sales_order", "production_item", *SUMMARY_FIELDS],
+        )
+    }
+
+    new_rows = []
+    for key, aggregate in aggregates.items():
+        current = existing.pop(key, None)
+        if not current:
+            new_rows.append(aggregate)
+            continue
+
+        if _summary_changed(current, aggregate):
+            frappe.db.set_value(
+                SUMMARY_DOCTYPE,
+                current.name,
+                {fieldname: aggregate.get(fieldname) for fieldname in SUMMARY_FIELDS},
+            )
+
+    if existing:
+        frappe.db.delete(SUMMARY_DOCTYPE, {"name": ["in", [row.name for row in existing.values()]]})
+
+    _insert_summary_rows(new_rows)
+
+
+def rebuild_sales_order_work_order_summary() -> None:
+    """Backfill the summary from all Work Orders, a chunk of Sales Orders at a time."""
+    last_sales_order = ""
+    while True:
+        sales_orders = frappe.db.sql_list(
+            """
+            SELECT DISTINCT sales_order
+            FROM `tabWork Order`
+            WHERE docstatus < 2
+              AND IFNULL(sales_order, '') != ''
+              AND sales_order > %(last_sales_order)s
+            ORDER BY sales_order
+            LIMIT %(limit)s
+            """,
+            {"last_sales_order": last_sales_order, "limit": REBUILD_CHUNK_SIZE},
+        )
+        if not sales_orders:
+            break
+
+        refresh_sales_order_summary(sales_orders)
+        frappe.db.commit()
+        last_sales_order = sales_orders[-1]
+
+
+def on_work_order_change(doc, method=None):
+    """Work Order hook: keep the summary of its Sales Order current."""
+    sales_orders = {doc.get("sales_order")}
+
+    previous = doc.get_doc_before_save() if hasattr(doc, "get_doc_before_save") else None
+    if previous:
+        sales_orders.add(previous.get("sales_order"))
+
+    _refresh_safely(sales_orders)
+
+
+def on_stock_entry_change(doc, method=None):
+    """Stock Entry hook: produced qty of the Work Order changes on Manufacture entries."""
+    if doc.get("purpose") != "Manufacture" or not doc.get("work_order"):
+        return
+
+    _refresh_safely({frappe.db.get_value("Work Order", doc.work_order, "sales_order")})
+
+
+def _refresh_safely(sales_orders) -> None:
+    try:
+        refresh_sales_order_summary(sales_orders)
+    except Exception:
+        frappe.log_error(
+            frappe.get_traceback(),
+            "C4Factory: Sales Order Work Order Summary refresh failed",
+        )
+
+
+def _summary_changed(current, aggregate) -> bool:
+    return (
+        current.work_order != aggregate.work_order
+        or cint(current.work_order_count) != cint(aggregate.work_order_count)
+        or abs(flt(current.wo_qty) - flt(aggregate.wo_qty)) > 1e-9
+        or abs(flt(current.manufactured_qty) - flt(aggregate.manufactured_qty)) > 1e-9
+    )
+
+
+def _insert_summary_rows(rows) -> None:
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        SUMMARY_DOCTYPE,
+        fields=[
+            "name",
+            "creation",
+            "modified",
+            "owner",
+            "modified_by",
+            "sales_order",
+            "production_item",
+            *SUMMARY_FIELDS,
+        ],
+        values=[
+            (
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                row.sales_order,
+                row.production_item,
+                row.work_order,
+                cint(row.work_order_count),
+                flt(row.wo_qty),
+                flt(row.manufactured_qty),
+            )
+            for row in rows
+        ],
+    )
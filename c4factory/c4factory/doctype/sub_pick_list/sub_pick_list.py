@@ -152,8 +152,31 @@ def _get_balances(doc_or_name) -> dict:
     if not result:
         return result
 
+    transferred = _get_transferred_by_sub_pick_list_item(sub_pick_list=doc.name)
+    for name, qty in transferred.items():
+        if name in result:
+            result[name]["transferred"] = qty
+    for info in result.values():
+        info["balance"] = (
+            0.0
+            if doc.manually_completed
+            else max(info["qty"] - info["transferred"], 0.0)
+        )
+    return result
+
+
+def _get_transferred_by_sub_pick_list_item(
+    sub_pick_list: str | None = None,
+    work_order: str | None = None,
+) -> dict[str, float]:
+    """Submitted transfer qty per Sub Pick List Item, for one SPL or a whole Work Order."""
+    if sub_pick_list:
+        condition = "se.custom_sub_pick_list = %(sub_pick_list)s"
+    else:
+        condition = "se.work_order = %(work_order)s AND COALESCE(se.custom_sub_pick_list, '') != ''"
+
     rows = frappe.db.sql(
-        """
+        f"""
         SELECT sed.custom_sub_pick_list_item,
                COALESCE(SUM(ABS(CASE
                    WHEN COALESCE(sed.transfer_qty, 0) != 0
@@ -162,23 +185,14 @@ def _get_balances(doc_or_name) -> dict:
         FROM `tabStock Entry Detail` sed
         INNER JOIN `tabStock Entry` se ON se.name = sed.parent
         WHERE se.docstatus = 1
-          AND se.custom_sub_pick_list = %(sub_pick_list)s
+          AND {condition}
           AND COALESCE(sed.custom_sub_pick_list_item, '') != ''
         GROUP BY sed.custom_sub_pick_list_item
         """,
-        {"sub_pick_list": doc.name},
+        {"sub_pick_list": sub_pick_list, "work_order": work_order},
         as_dict=True,
     )
-    for row in rows:
-        if row.custom_sub_pick_list_item in result:
-            result[row.custom_sub_pick_list_item]["transferred"] = flt(row.qty)
-    for info in result.values():
-        info["balance"] = (
-            0.0
-            if doc.manually_completed
-            else max(info["qty"] - info["transferred"], 0.0)
-        )
-    return result
+    return {row.custom_sub_pick_list_item: flt(row.qty) for row in rows}
 
 
 @frappe.whitelist()
@@ -199,6 +213,119 @@ def get_balance_rows(sub_pick_list: str) -> list[dict]:
     ]
 
 
+@frappe.whitelist()
+def get_work_order_additional_materials(
+    work_order: str | None = None,
+    pick_list: str | None = None,
+) -> dict:
+    """
+    Every Sub Pick List of a Work Order with its rows and balances.
+
+    Rows, transferred quantities and the Work Order Item requirements they
+    contribute to are read with three grouped queries, however many Sub
+    Pick Lists the Work Order has. ``pick_list`` narrows the result to the
+    Sub Pick Lists of one main Pick List.
+    """
+    if not work_order and pick_list:
+        work_order = frappe.db.get_value("Pick List", pick_list, "work_order")
+    if not work_order:
+        frappe.throw(_("Work Order is required"))
+
+    frappe.has_permission("Sub Pick List", "read", throw=True)
+    frappe.has_permission("Work Order", "read", work_order, throw=True)
+    if pick_list:
+        frappe.has_permission("Pick List", "read", pick_list, throw=True)
+
+    conditions = ["spl.work_order = %(work_order)s", "spl.docstatus < 2"]
+    if pick_list:
+        conditions.append("spl.main_pick_list = %(pick_list)s")
+
+    rows = frappe.db.sql(
+        f"""
+        SELECT
+            spl.name AS sub_pick_list,
+            spl.status,
+            spl.docstatus,
+            spl.main_pick_list,
+            spl.manually_completed,
+            spli.name AS sub_pick_list_item,
+            spli.item_code,
+            spli.item_name,
+            spli.source_warehouse,
+            spli.stock_uom,
+            spli.qty,
+            spli.work_order_item,
+            spli.required_contribution_qty
+        FROM `tabSub Pick List` spl
+        INNER JOIN `tabSub Pick List Item` spli ON spli.parent = spl.name
+        WHERE {" AND ".join(conditions)}
+        ORDER BY spl.creation, spli.idx
+        """,
+        {"work_order": work_order, "pick_list": pick_list},
+        as_dict=True,
+    )
+
+    transferred = _get_transferred_by_sub_pick_list_item(work_order=work_order)
+
+    work_order_items = {}
+    wo_item_names = {row.work_order_item for row in rows if row.work_order_item}
+    if wo_item_names:
+        work_order_items = {
+            row.name: row
+            for row in frappe.get_all(
+                "Work Order Item",
+                filters={"name": ["in", list(wo_item_names)]},
+                fields=[
+                    "name",
+                    "item_code",
+                    "source_warehouse",
+                    "required_qty",
+                    "transferred_qty",
+                    "custom_additional_material_qty",
+                ],
+            )
+        }
+
+    sub_pick_lists = {}
+    for row in rows:
+        sub = sub_pick_lists.setdefault(
+            row.sub_pick_list,
+            {
+                "name": row.sub_pick_list,
+                "status": row.status,
+                "docstatus": row.docstatus,
+                "main_pick_list": row.main_pick_list,
+                "items": [],
+            },
+        )
+        transferred_qty = flt(transferred.get(row.sub_pick_list_item))
+        balance_qty = (
+            0.0
+            if row.manually_completed or row.docstatus != 1
+            else max(flt(row.qty) - transferred_qty, 0.0)
+        )
+        sub["items"].append(
+            {
+                "sub_pick_list_item": row.sub_pick_list_item,
+                "item_code": row.item_code,
+                "item_name": row.item_name,
+                "source_warehouse": row.source_warehouse,
+                "stock_uom": row.stock_uom,
+                "qty": flt(row.qty),
+                "transferred_qty": transferred_qty,
+                "balance_qty": balance_qty,
+                "work_order_item": row.work_order_item,
+                "required_contribution_qty": flt(row.required_contribution_qty),
+            }
+        )
+
+    return {
+        "work_order": work_order,
+        "sub_pick_lists": list(sub_pick_lists.values()),
+        "work_order_items": work_order_items,
+    }
+
+
 @frappe.whitelist()
 def make_partial_stock_entry(sub_pick_list: str, items_json: str) -> str:
     doc = frappe.get_doc("Sub Pick List", sub_pick_list)
@@ -314,8 +441,7 @@ def complete_sub_pick_list(sub_pick_list: str) -> dict:
 def update_from_stock_entry(doc, method=None):
     if not doc.get("custom_sub_pick_list"):
         return
-    _update_sub_pick_list_status(doc.custom_sub_pick_list)
-    _sync_work_order_transferred_quantities(doc.custom_sub_pick_list)
+    _update_sub_pick_list_status(doc.custom_sub_pick_list, sync_work_order=True)
 
 
 def prevent_main_pick_list_cancel(doc, method=None):
@@ -330,10 +456,18 @@ def prevent_main_pick_list_cancel(doc, method=None):
         )
 
 
-def _update_sub_pick_list_status(name: str):
+def _update_sub_pick_list_status(name: str, sync_work_order: bool = False):
+    """
+    Refresh status and row balances in one pass.
+
+    Balances are computed once and every changed row is written with a single
+    bulk UPDATE. With ``sync_work_order`` the linked Work Order Item transfer
+    balances are refreshed from the same loaded document.
+    """
     if not name or not frappe.db.exists("Sub Pick List", name):
         return
     doc = frappe.get_doc("Sub Pick List", name)
+    balances = _get_balances(doc)
     if doc.docstatus == 2:
         status = "Cancelled"
     elif doc.manually_completed:
@@ -341,58 +475,70 @@ def _update_sub_pick_list_status(name: str):
     else:
         status = (
             "Completed"
-            if all(info["balance"] <= 0.000001 for info in _get_balances(doc).values())
+            if all(info["balance"] <= 0.000001 for info in balances.values())
             else "Open"
         )
-    frappe.db.set_value("Sub Pick List", name, "status", status, update_modified=False)
-    balances = _get_balances(doc)
+    if doc.status != status:
+        frappe.db.set_value("Sub Pick List", name, "status", status, update_modified=False)
+
+    row_updates = {}
     for row in doc.items:
         info = balances.get(row.name, {})
-        frappe.db.set_value(
-            "Sub Pick List Item",
-            row.name,
-            {
-                "transferred_qty": flt(info.get("transferred")),
-                "balance_qty": flt(info.get("balance")),
-            },
-            update_modified=False,
-        )
+        values = {
+            "transferred_qty": flt(info.get("transferred")),
+            "balance_qty": flt(info.get("balance")),
+        }
+        if any(abs(flt(row.get(field)) - value) > 0.000001 for field, value in values.items()):
+            row_updates[row.name] = values
+    if row_updates:
+        frappe.db.bulk_update("Sub Pick List Item", row_updates, update_modified=False)
+
+    if sync_work_order:
+        _sync_work_order_transferred_quantities(doc)
 
 
-def _sync_work_order_transferred_quantities(sub_pick_list: str):
-    sub = frappe.get_doc("Sub Pick List", sub_pick_list)
+def _sync_work_order_transferred_quantities(sub):
     from c4factory.c4_manufacturing.stock_entry_hooks import (
-        _get_actual_transferred_qty,
-        _set_work_order_item_balances,
+        _get_actual_transferred_qty_map,
+        _get_work_order_item_balance_values,
     )
 
-    for row in sub.items:
-        if not row.work_order_item:
-            continue
-        transferred = _get_actual_transferred_qty(
-            sub.work_order,
-            row.item_code,
-            row.source_warehouse,
-            sub.wip_warehouse,
-        )
-        required, consumed = frappe.db.get_value(
-            "Work Order Item",
-            row.work_order_item,
-            ["required_qty", "consumed_qty"],
-        ) or (0, 0)
-        frappe.db.set_value(
+    rows = [row for row in sub.items if row.work_order_item]
+    if not rows:
+        return
+
+    transferred_map = _get_actual_transferred_qty_map(
+        sub.work_order,
+        sub.wip_warehouse,
+        item_codes=[row.item_code for row in rows],
+    )
+    wo_items = {
+        wo_item.name: wo_item
+        for wo_item in frappe.get_all(
             "Work Order Item",
-            row.work_order_item,
-            "transferred_qty",
-            transferred,
-            update_modified=False,
+            filters={"name": ["in", [row.work_order_item for row in rows]]},
+            fields=["name", "required_qty", "consumed_qty"],
         )
-        _set_work_order_item_balances(
-            row.work_order_item,
-            flt(required),
-            transferred,
-            flt(consumed),
+    }
+
+    updates = {}
+    for row in rows:
+        wo_item = wo_items.get(row.work_order_item)
+        if not wo_item:
+            continue
+        transferred = flt(
+            transferred_map.get((row.item_code, row.source_warehouse or ""))
         )
+        updates[row.work_order_item] = {
+            "transferred_qty": transferred,
+            **_get_work_order_item_balance_values(
+                flt(wo_item.required_qty),
+                transferred,
+                flt(wo_item.consumed_qty),
+            ),
+        }
+    if updates:
+        frappe.db.bulk_update("Work Order Item", updates, update_modified=False)
 
 
 def _apply_required_materials(doc):
@@ -0,0 +1,167 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, flt, getdate, now_datetime, nowdate
+
+from c4factory.c4factory.doctype.c4factory_settings.c4factory_settings import (
+    get_c4factory_setting,
+)
+from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+    COST_FIELDS,
+)
+
+DAILY_DOCTYPE = "Work Order Cost Daily"
+SETTINGS_DOCTYPE = "C4Factory Settings"
+ROLLED_UP_THROUGH_FIELD = "work_order_costs_rolled_up_through"
+GROUP_FIELDS = ("company", "production_item", "workstation")
+DAILY_FIELDS = (
+    "posting_date",
+    *GROUP_FIELDS,
+    "work_orders",
+    "snapshots",
+    *COST_FIELDS.values(),
+    "total_cost_change",
+)
+
+
+class WorkOrderCostDaily(Document):
+    pass
+
+
+def on_doctype_update():
+    for columns in (
+        ["posting_date", "production_item"],
+        ["posting_date", "workstation"],
+        ["company", "posting_date"],
+    ):
+        frappe.db.add_index(DAILY_DOCTYPE, columns)
+
+
+def roll_up_pending_work_order_costs() -> None:
+    """
+    Scheduled daily: roll up every day after the one last rolled up, to
+    yesterday, so days missed while the scheduler was down are caught up.
+
+    The last rolled-up day is kept in C4Factory Settings and moves on also
+    over days without snapshots, so idle days are scanned once.
+    """
+    yesterday = getdate(add_days(nowdate(), -1))
+    last_date = get_c4factory_setting(ROLLED_UP_THROUGH_FIELD)
+    if last_date:
+        posting_date = getdate(add_days(last_date, 1))
+    else:
+        first_snapshot = frappe.db.sql("SELECT MIN(snapshot_on) FROM `tabWork Order Cost Snapshot`")[0][0]
+        if not first_snapshot:
+            return
+        posting_date = getdate(first_snapshot)
+
+    while posting_date <= yesterday:
+        roll_up_work_order_costs(posting_date)
+        frappe.db.set_single_value(SETTINGS_DOCTYPE, ROLLED_UP_THROUGH_FIELD, posting_date)
+        frappe.db.commit()
+        posting_date = getdate(add_days(posting_date, 1))
+
+
+def roll_up_work_order_costs(posting_date) -> None:
+    """
+    Rebuild the roll-up rows of one day from its cost snapshots.
+
+    Each row groups the snapshots of one company, item and workstation: how
+    many Work Orders and snapshots it covers, the summed cost of each Work
+    Order as of its last snapshot that day and the summed total cost change.
+    Running it again for the same day replaces that day's rows.
+    """
+    posting_date = getdate(posting_date)
+    snapshots = frappe.db.sql(
+        """
+        SELECT work_order, company, production_item, workstation,
+               raw_material_cost, operating_cost, scrap_material_cost,
+               total_cost, total_cost_change
+        FROM `tabWork Order Cost Snapshot`
+        WHERE snapshot_on >= %(from_date)s
+          AND snapshot_on < %(to_date)s
+        ORDER BY snapshot_on
+        """,
+        {"from_date": posting_date, "to_date": add_days(posting_date, 1)},
+        as_dict=True,
+    )
+
+    groups = {}
+    for snapshot in snapshots:
+        key = tuple(snapshot.get(fieldname) for fieldname in GROUP_FIELDS)
+        group = groups.setdefault(key, {"snapshots": 0, "total_cost_change": 0.0, "latest": {}})
+        group["snapshots"] += 1
+        group["total_cost_change"] += flt(snapshot.total_cost_change)
+        group["latest"][snapshot.work_order] = snapshot
+
+    rows = []
+    for key, group in groups.items():
+        row = dict(zip(GROUP_FIELDS, key, strict=True))
+        row.update(
+            {
+                "posting_date": posting_date,
+                "work_orders": len(group["latest"]),
+                "snapshots": group["snapshots"],
+                "total_cost_change": group["total_cost_change"],
+            }
+        )
+        for field in COST_FIELDS.values():
+            row[field] = sum(flt(snapshot.get(field)) for snapshot in group["latest"].values())
+        rows.append(row)
+
+    frappe.db.delete(DAILY_DOCTYPE, {"posting_date": posting_date})
+    _insert_daily_rows(rows)
+    frappe.db.commit()
+
+
+@frappe.whitelist()
+def get_work_order_cost_trend(from_date, to_date, company=None, production_item=None, workstation=None) -> list[dict]:
+    """Daily cost totals between two dates, read from the roll-up only."""
+    frappe.has_permission(DAILY_DOCTYPE, "read", throw=True)
+
+    filters = {"posting_date": ["between", [getdate(from_date), getdate(to_date)]]}
+    for fieldname, value in (
+        ("company", company),
+        ("production_item", production_item),
+        ("workstation", workstation),
+    ):
+        if value:
+            filters[fieldname] = value
+
+    return frappe.get_all(
+        DAILY_DOCTYPE,
+        filters=filters,
+        fields=[
+            "posting_date",
+            "sum(work_orders) as work_orders",
+            "sum(snapshots) as snapshots",
+            *[f"sum({field}) as {field}" for field in COST_FIELDS.values()],
+            "sum(total_cost_change) as total_cost_change",
+        ],
+        group_by="posting_date",
+        order_by="posting_date asc",
+    )
+
+
+def _insert_daily_rows(rows) -> None:
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        DAILY_DOCTYPE,
+        fields=["name", "creation", "modified", "owner", "modified_by", *DAILY_FIELDS],
+        values=[
+            (
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                *(row.get(fieldname) for fieldname in DAILY_FIELDS),
+            )
+            for row in rows
+        ],
+    )
@@ -0,0 +1,138 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import flt, now_datetime
+
+SNAPSHOT_DOCTYPE = "Work Order Cost Snapshot"
+# Work Order cost field -> snapshot field
+COST_FIELDS = {
+    "c4_raw_material_cost": "raw_material_cost",
+    "c4_operating_cost": "operating_cost",
+    "c4_scrap_material_cost": "scrap_material_cost",
+    "c4_total_cost": "total_cost",
+}
+SNAPSHOT_FIELDS = (
+    "work_order",
+    "snapshot_on",
+    "company",
+    "production_item",
+    "workstation",
+    "reference_doctype",
+    "reference_name",
+    *COST_FIELDS.values(),
+    "total_cost_change",
+)
+TOLERANCE = 0.000001
+
+
+class WorkOrderCostSnapshot(Document):
+    pass
+
+
+def on_doctype_update():
+    for columns in (
+        ["work_order", "snapshot_on"],
+        ["snapshot_on"],
+    ):
+        frappe.db.add_index(SNAPSHOT_DOCTYPE, columns)
+
+
+@contextmanager
+def cost_snapshot_reference(doc):
+    """Record the document that triggered the costing recompute on the snapshots taken inside the block."""
+    previous = frappe.flags.c4_cost_snapshot_reference
+    frappe.flags.c4_cost_snapshot_reference = (doc.doctype, doc.name) if doc else None
+    try:
+        yield
+    finally:
+        frappe.flags.c4_cost_snapshot_reference = previous
+
+
+def record_cost_snapshot(work_order, values: dict, previous=None, reference=None) -> None:
+    """
+    Append a snapshot of a Work Order's cost fields when a recompute changed them.
+
+    ``work_order`` is the Work Order document or name, ``values`` its new cost
+    fields and ``previous`` the values they replace (the document itself when
+    omitted, so call this before writing). ``reference`` is a (doctype, name)
+    pair and defaults to the one set by cost_snapshot_reference.
+    """
+    try:
+        if previous is None:
+            previous = work_order if isinstance(work_order, Document) else {}
+
+        if all(
+            abs(flt(values.get(fieldname)) - flt(previous.get(fieldname))) <= TOLERANCE
+            for fieldname in COST_FIELDS
+        ):
+            return
+
+        reference_doctype, reference_name = reference or frappe.flags.c4_cost_snapshot_reference or (None, None)
+        row = {
+            **_get_snapshot_header(work_order),
+            "snapshot_on": now_datetime(),
+            "reference_doctype": reference_doctype,
+            "reference_name": reference_name,
+            "total_cost_change": flt(values.get("c4_total_cost")) - flt(previous.get("c4_total_cost")),
+        }
+        row.update({field: flt(values.get(fieldname)) for fieldname, field in COST_FIELDS.items()})
+        _insert_snapshot_rows([row])
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "C4Factory: Work Order cost snapshot failed")
+
+
+def _get_snapshot_header(work_order) -> dict:
+    """Work Order, company, item and workstation of its first operation."""
+    if isinstance(work_order, Document):
+        workstation = next(
+            (op.workstation for op in work_order.get("operations") or [] if op.get("workstation")),
+            None,
+        )
+        return {
+            "work_order": work_order.name,
+            "company": work_order.get("company"),
+            "production_item": work_order.get("production_item"),
+            "workstation": workstation,
+        }
+
+    header = frappe.db.get_value(
+        "Work Order", work_order, ["name", "company", "production_item"], as_dict=True
+    ) or frappe._dict(name=work_order)
+    workstation = frappe.db.get_value(
+        "Work Order Operation",
+        {"parent": work_order, "parenttype": "Work Order", "workstation": ["is", "set"]},
+        "workstation",
+        order_by="idx asc",
+    )
+    return {
+        "work_order": header.name,
+        "company": header.get("company"),
+        "production_item": header.get("production_item"),
+        "workstation": workstation,
+    }
+
+
+def _insert_snapshot_rows(rows) -> None:
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        SNAPSHOT_DOCTYPE,
+        fields=["name", "creation", "modified", "owner", "modified_by", *SNAPSHOT_FIELDS],
+        values=[
+            (
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                *(row.get(fieldname) for fieldname in SNAPSHOT_FIELDS),
+            )
+            for row in rows
+        ],
+    )
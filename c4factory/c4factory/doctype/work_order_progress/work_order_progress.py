@@ -0,0 +1,129 @@
+from __future__ import annotations
+
+import frappe
+from frappe.model.document import Document
+from frappe.utils import add_days, flt, getdate, now_datetime
+
+PROGRESS_DOCTYPE = "Work Order Progress"
+PROGRESS_FIELDS = (
+    "work_order",
+    "production_plan",
+    "company",
+    "sales_order",
+    "production_item",
+    "item_name",
+    "status",
+    "qty",
+    "produced_qty",
+    "pending_qty",
+    "percent_produced",
+    "planned_start_date",
+    "planned_date",
+    "week_start",
+)
+REBUILD_CHUNK_SIZE = 1000
+
+
+class WorkOrderProgress(Document):
+    pass
+
+
+def on_doctype_update():
+    for columns in (
+        ["company", "planned_date"],
+        ["production_plan", "planned_date"],
+        ["status", "planned_date"],
+        ["production_item", "planned_date"],
+        ["company", "week_start"],
+    ):
+        frappe.db.add_index(PROGRESS_DOCTYPE, columns)
+
+
+def get_progress_values(work_order) -> dict:
+    """Fact row of one Work Order: quantities, pending and its date buckets."""
+    qty = flt(work_order.get("qty"))
+    produced_qty = flt(work_order.get("produced_qty"))
+    planned_date = getdate(work_order.get("planned_start_date")) if work_order.get("planned_start_date") else None
+
+    return {
+        "work_order": work_order.get("name"),
+        "production_plan": work_order.get("production_plan"),
+        "company": work_order.get("company"),
+        "sales_order": work_order.get("sales_order"),
+        "production_item": work_order.get("production_item"),
+        "item_name": work_order.get("item_name"),
+        "status": work_order.get("status"),
+        "qty": qty,
+        "produced_qty": produced_qty,
+        "pending_qty": max(qty - produced_qty, 0.0),
+        "percent_produced": (produced_qty / qty * 100) if qty else 0.0,
+        "planned_start_date": work_order.get("planned_start_date"),
+        "planned_date": planned_date,
+        "week_start": add_days(planned_date, -planned_date.weekday()) if planned_date else None,
+    }
+
+
+def update_work_order_progress(doc, method=None):
+    """
+    Work Order hook (on_change / after_delete).
+
+    ERPNext moves status and produced_qty with db_set, which runs on_change,
+    so this keeps the fact row current without any Stock Entry hook.
+    """
+    try:
+        if method == "after_delete" or doc.docstatus == 2:
+            frappe.db.delete(PROGRESS_DOCTYPE, {"name": doc.name})
+            return
+
+        values = get_progress_values(doc)
+        if frappe.db.exists(PROGRESS_DOCTYPE, doc.name):
+            values.pop("work_order")
+            frappe.db.set_value(PROGRESS_DOCTYPE, doc.name, values)
+        else:
+            _insert_progress_rows([values])
+    except Exception:
+        frappe.log_error(frappe.get_traceback(), "C4Factory: Work Order Progress update failed")
+
+
+def rebuild_work_order_progress() -> None:
+    """Rebuild the fact table from all non-cancelled Work Orders, in chunks."""
+    frappe.db.delete(PROGRESS_DOCTYPE)
+
+    last_name = ""
+    while True:
+        work_orders = frappe.db.sql(
+            """
+            SELECT
+                name, production_plan, company, sales_order, production_item,
+                item_name, status, qty, produced_qty, planned_start_date
+            FROM `tabWork Order`
+            WHERE docstatus < 2
+              AND name > %(last_name)s
+            ORDER BY name
+            LIMIT %(limit)s
+            """,
+            {"last_name": last_name, "limit": REBUILD_CHUNK_SIZE},
+            as_dict=True,
+        )
+        if not work_orders:
+            break
+
+        _insert_progress_rows([get_progress_values(row) for row in work_orders])
+        frappe.db.commit()
+        last_name = work_orders[-1].name
+
+
+def _insert_progress_rows(rows) -> None:
+    if not rows:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    frappe.db.bulk_insert(
+        PROGRESS_DOCTYPE,
+        fields=["name", "creation", "modified", "owner", "modified_by", *PROGRESS_FIELDS],
+        values=[
+            (row["work_order"], now, now, user, user, *(row[fieldname] for fieldname in PROGRESS_FIELDS))
+            for row in rows
+        ],
+    )
@@ -0,0 +1,17 @@
+frappe.ui.form.on("Work Order Reconcile Run", {
+  refresh(frm) {
+    if (frm.is_new() || !["Running", "Failed"].includes(frm.doc.status)) return;
+
+    frm.add_custom_button(__("Resume"), () => {
+      frappe.call({
+        method:
+          "c4factory.c4factory.doctype.work_order_reconcile_run.work_order_reconcile_run.resume_work_order_reconcile",
+        args: { run: frm.doc.name },
+        callback: () => {
+          frappe.show_alert({ message: __("Unfinished shards queued again."), indicator: "blue" });
+          frm.reload_doc();
+        },
+      });
+    });
+  },
+});
@@ -0,0 +1,566 @@
+from __future__ import annotations
+
+import frappe
+from frappe import _
+from frappe.model.document import Document
+from frappe.utils import cint, flt, now_datetime
+
+from c4factory.api.work_order_flow import (
+    _get_pick_list_balances_map,
+    _get_pick_list_finished_goods_qty,
+    _get_pick_list_transfer_ratios,
+    _set_wo_transfer_state_stamp,
+    _update_wo_status,
+)
+from c4factory.c4_manufacturing.legacy_pick_list_links import (
+    legacy_pick_list_links_pending,
+)
+from c4factory.c4_manufacturing.stock_entry_hooks import (
+    _get_work_order_item_balance_values,
+    _get_work_order_material_costs,
+    get_work_order_cost_values,
+)
+from c4factory.c4_manufacturing.work_order_freeze import (
+    FROZEN_FIELD,
+    thawed_work_order,
+)
+from c4factory.c4factory.doctype.work_order_cost_snapshot.work_order_cost_snapshot import (
+    cost_snapshot_reference,
+    record_cost_snapshot,
+)
+
+RUN_DOCTYPE = "Work Order Reconcile Run"
+SHARD_DOCTYPE = "Work Order Reconcile Shard"
+DIFF_DOCTYPE = "Work Order Reconcile Diff"
+FINISHED_STATUSES = ("Completed", "Closed")
+COST_FIELDS = ("c4_raw_material_cost", "c4_scrap_material_cost", "c4_operating_cost", "c4_total_cost")
+FINISHED_GOODS_QTY_FIELDS = (
+    "qty_of_finished_goods_item",
+    "qty_of_finished_goods",
+    "for_qty",
+    "custom_for_qty",
+    "qty",
+)
+MAX_LOGGED_DIFFS = 5000
+TOLERANCE = 0.000001
+
+
+class WorkOrderReconcileRun(Document):
+    def validate(self):
+        self._clamp_settings()
+
+    def _clamp_settings(self):
+        self.shard_count = min(max(cint(self.shard_count) or 4, 1), 32)
+        self.chunk_size = min(max(cint(self.chunk_size) or 50, 1), 500)
+
+    def before_insert(self):
+        self.status = "Queued"
+        self.started_on = now_datetime()
+        self._plan_shards()
+
+    def after_insert(self):
+        _enqueue_shards(self)
+
+    def _plan_shards(self):
+        """Split the matching Work Orders into contiguous name ranges, one per shard."""
+        # before_insert runs ahead of validate
+        self._clamp_settings()
+        work_orders = frappe.get_all(
+            "Work Order",
+            filters=_get_work_order_filters(self),
+            order_by="name asc",
+            pluck="name",
+        )
+        if not work_orders:
+            frappe.throw(_("No Work Orders match the reconcile filters."))
+
+        self.work_orders = len(work_orders)
+        self.set("shards", [])
+        shard_size = -(-len(work_orders) // cint(self.shard_count))
+        for shard, start in enumerate(range(0, len(work_orders), shard_size), start=1):
+            shard_work_orders = work_orders[start : start + shard_size]
+            self.append(
+                "shards",
+                {
+                    "shard": shard,
+                    "from_work_order": shard_work_orders[0],
+                    "to_work_order": shard_work_orders[-1],
+                    "status": "Queued",
+                },
+            )
+
+
+@frappe.whitelist()
+def start_work_order_reconcile(
+    scope: str = "Open",
+    company: str | None = None,
+    shard_count: int = 4,
+    chunk_size: int = 50,
+    thaw_frozen: int = 0,
+    dry_run: int = 0,
+) -> str:
+    """Start a reconcile run; every shard runs in its own background job."""
+    run = frappe.new_doc(RUN_DOCTYPE)
+    run.update(
+        {
+            "scope": scope,
+            "company": company,
+            "shard_count": shard_count,
+            "chunk_size": chunk_size,
+            "thaw_frozen": cint(thaw_frozen),
+            "dry_run": cint(dry_run),
+        }
+    )
+    run.insert()
+    return run.name
+
+
+@frappe.whitelist()
+def resume_work_order_reconcile(run: str) -> str:
+    """Queue again every shard of a run that did not complete; each continues after its last Work Order."""
+    doc = frappe.get_doc(RUN_DOCTYPE, run)
+    doc.check_permission("write")
+    if doc.status == "Completed":
+        frappe.throw(_("Work Order Reconcile Run {0} is already completed.").format(doc.name))
+
+    _enqueue_shards(doc)
+    return doc.name
+
+
+def _enqueue_shards(run) -> None:
+    for shard in run.shards:
+        if shard.status == "Completed":
+            continue
+
+        frappe.enqueue(
+            "c4factory.c4factory.doctype.work_order_reconcile_run.work_order_reconcile_run.run_reconcile_shard",
+            queue="long",
+            timeout=7200,
+            run=run.name,
+            shard=shard.name,
+            job_id=f"c4factory:reconcile:{shard.name}",
+            deduplicate=True,
+            enqueue_after_commit=True,
+        )
+
+    frappe.db.set_value(RUN_DOCTYPE, run.name, "status", "Running")
+
+
+def _get_work_order_filters(run) -> list:
+    filters = [["Work Order", "docstatus", "=", 1]]
+    if run.scope != "All Submitted":
+        filters.append(["Work Order", "status", "not in", FINISHED_STATUSES])
+    if run.company:
+        filters.append(["Work Order", "company", "=", run.company])
+    return filters
+
+
+def run_reconcile_shard(run: str, shard: str) -> None:
+    """
+    Background job: reconcile one name range of a run, a chunk at a time.
+
+    Progress is committed after every chunk, so a resumed shard starts after
+    the last Work Order it finished.
+    """
+    run_doc = frappe.get_doc(RUN_DOCTYPE, run)
+    shard_row = frappe.db.get_value(
+        SHARD_DOCTYPE,
+        shard,
+        ["from_work_order", "to_work_order", "last_work_order", "checked", "corrected"],
+        as_dict=True,
+    )
+    frappe.db.set_value(SHARD_DOCTYPE, shard, {"status": "Running", "error": None})
+    frappe.db.commit()
+
+    filters = _get_work_order_filters(run_doc)
+    checked = cint(shard_row.checked)
+    corrected = cint(shard_row.corrected)
+    logged = frappe.db.count(DIFF_DOCTYPE, {"parent": run, "parenttype": RUN_DOCTYPE})
+    cursor = shard_row.last_work_order
+
+    try:
+        while True:
+            name_filter = [">", cursor] if cursor else [">=", shard_row.from_work_order]
+            work_orders = frappe.get_all(
+                "Work Order",
+                filters=[
+                    *filters,
+                    ["Work Order", "name", *name_filter],
+                    ["Work Order", "name", "<=", shard_row.to_work_order],
+                ],
+                order_by="name asc",
+                limit_page_length=run_doc.chunk_size,
+                pluck="name",
+            )
+            if not work_orders:
+                break
+
+            with cost_snapshot_reference(run_doc):
+                diffs = reconcile_work_orders(
+                    work_orders,
+                    thaw_frozen=run_doc.thaw_frozen,
+                    dry_run=run_doc.dry_run,
+                )
+            checked += len(work_orders)
+            corrected += len({diff["work_order"] for diff in diffs})
+
+            room = max(MAX_LOGGED_DIFFS - logged, 0)
+            _insert_diffs(run, diffs[:room])
+            logged += min(len(diffs), room)
+
+            cursor = work_orders[-1]
+            frappe.db.set_value(
+                SHARD_DOCTYPE,
+                shard,
+                {"last_work_order": cursor, "checked": checked, "corrected": corrected},
+            )
+            frappe.db.commit()
+    except Exception:
+        frappe.db.rollback()
+        frappe.db.set_value(
+            SHARD_DOCTYPE, shard, {"status": "Failed", "error": frappe.get_traceback()[-1000:]}
+        )
+        frappe.db.set_value(RUN_DOCTYPE, run, "status", "Failed")
+        frappe.db.commit()
+        frappe.log_error(frappe.get_traceback(), f"C4Factory: reconcile shard failed ({run})")
+        return
+
+    frappe.db.set_value(SHARD_DOCTYPE, shard, "status", "Completed")
+    _finish_run_if_done(run)
+    frappe.db.commit()
+
+
+def _finish_run_if_done(run: str) -> None:
+    # Shards finishing together serialize here, so the last one sees every other shard's status.
+    frappe.db.get_value(RUN_DOCTYPE, run, "name", for_update=True)
+    shards = frappe.get_all(
+        SHARD_DOCTYPE,
+        filters={"parent": run, "parenttype": RUN_DOCTYPE},
+        fields=["status", "checked", "corrected"],
+    )
+    values = {
+        "checked": sum(cint(row.checked) for row in shards),
+        "corrected": sum(cint(row.corrected) for row in shards),
+    }
+    if all(row.status == "Completed" for row in shards):
+        values.update({"status": "Completed", "finished_on": now_datetime()})
+
+    frappe.db.set_value(RUN_DOCTYPE, run, values)
+
+
+def _insert_diffs(run: str, diffs) -> None:
+    if not diffs:
+        return
+
+    now = now_datetime()
+    user = frappe.session.user
+    fields = ("work_order", "reference_doctype", "reference_name", "fieldname", "old_value", "new_value")
+    frappe.db.bulk_insert(
+        DIFF_DOCTYPE,
+        fields=["name", "creation", "modified", "owner", "modified_by", "parent", "parenttype", "parentfield", *fields],
+        values=[
+            (
+                frappe.generate_hash(length=10),
+                now,
+                now,
+                user,
+                user,
+                run,
+                RUN_DOCTYPE,
+                "diffs",
+                *(diff.get(fieldname) for fieldname in fields),
+            )
+            for diff in diffs
+        ],
+    )
+
+
+def reconcile_work_orders(work_orders, thaw_frozen=0, dry_run=0) -> list[dict]:
+    """
+    Recompute transfer, item balance, Pick List status and costing state of a
+    chunk of Work Orders from batched reads and correct what drifted.
+
+    Returns one diff per corrected (or, on a dry run, differing) value.
+    """
+    headers = {
+        row.name: row
+        for row in frappe.get_all(
+            "Work Order",
+            filters={"name": ["in", list(work_orders)]},
+            fields=[
+                "name",
+                "qty",
+                "status",
+                "material_transferred_for_manufacturing",
+                *[fieldname for fieldname in (*COST_FIELDS, FROZEN_FIELD) if _has_field("Work Order", fieldname)],
+            ],
+        )
+    }
+    if not cint(thaw_frozen):
+        headers = {name: row for name, row in headers.items() if not cint(row.get(FROZEN_FIELD))}
+    if not headers:
+        return []
+
+    names = list(headers)
+    pick_lists = _get_pick_lists(names)
+    diffs = []
+
+    diffs += _reconcile_pick_list_statuses(pick_lists, dry_run)
+    transferred = _get_transferred_production_qtys(names, pick_lists)
+    material_costs = _get_work_order_material_costs(names)
+
+    for name, header in headers.items():
+        wo_diffs = []
+        new_transferred = transferred.get(name, 0.0)
+        if abs(flt(header.material_transferred_for_manufacturing) - new_transferred) > TOLERANCE:
+            wo_diffs.append(
+                _diff(name, "Work Order", name, "material_transferred_for_manufacturing",
+                      header.material_transferred_for_manufacturing, new_transferred)
+            )
+
+        cost_values = get_work_order_cost_values(name, material_costs.get(name))
+        changed_costs = {
+            fieldname: value
+            for fieldname, value in cost_values.items()
+            if fieldname in header and abs(flt(header.get(fieldname)) - flt(value)) > TOLERANCE
+        }
+        wo_diffs += [
+            _diff(name, "Work Order", name, fieldname, header.get(fieldname), value)
+            for fieldname, value in changed_costs.items()
+        ]
+
+        if wo_diffs and not cint(dry_run):
+            if changed_costs:
+                record_cost_snapshot(name, {**header, **changed_costs}, previous=header)
+            with thawed_work_order(name):
+                _apply_work_order_corrections(name, new_transferred, changed_costs, wo_diffs)
+        diffs += wo_diffs
+
+    diffs += _reconcile_item_balances(names, dry_run)
+    return diffs
+
+
+def _apply_work_order_corrections(name, transferred_qty, cost_values, wo_diffs) -> None:
+    transfer_changed = any(
+        diff["fieldname"] == "material_transferred_for_manufacturing" for diff in wo_diffs
+    )
+    values = dict(cost_values)
+    if transfer_changed:
+        values["material_transferred_for_manufacturing"] = transferred_qty
+    frappe.db.set_value("Work Order", name, values, update_modified=False)
+
+    if transfer_changed:
+        _update_wo_status(frappe.get_doc("Work Order", name))
+        _set_wo_transfer_state_stamp(name)
+
+
+def _get_pick_lists(work_orders) -> list[frappe._dict]:
+    """Submitted Pick Lists of the Work Orders with their rows and grouped transfers."""
+    fields = ["name", "work_order", "status"]
+    fields += [fieldname for fieldname in FINISHED_GOODS_QTY_FIELDS if _has_field("Pick List", fieldname)]
+    if _has_field("Pick List", "custom_manually_completed"):
+        fields.append("custom_manually_completed")
+
+    pick_lists = frappe.get_all(
+        "Pick List",
+        filters={"work_order": ["in", list(work_orders)], "docstatus": 1},
+        fields=fields,
+        order_by="creation asc",
+    )
+    if not pick_lists:
+        return []
+
+    names = [pl.name for pl in pick_lists]
+    locations = {}
+    for row in frappe.get_all(
+        "Pick List Item",
+        filters={"parenttype": "Pick List", "parent": ["in", names]},
+        fields=["name", "parent", "idx", "item_code", "item_name", "qty", "custom_pl_qty"],
+        order_by="idx asc",
+    ):
+        locations.setdefault(row.parent, []).append(row)
+
+    linked = {}
+    unlinked = {}
+    for row in frappe.db.sql(
+        """
+        SELECT
+            se.pick_list,
+            IFNULL(sed.custom_pick_list_item, '') AS custom_pick_list_item,
+            sed.item_code,
+            COALESCE(SUM(sed.qty), 0) AS total_qty
+        FROM `tabStock Entry Detail` sed
+        INNER JOIN `tabStock Entry` se ON se.name = sed.parent
+        WHERE se.docstatus = 1
+          AND se.pick_list IN %(pick_lists)s
+          AND COALESCE(se.custom_is_additional_material, 0) = 0
+        GROUP BY se.pick_list, IFNULL(sed.custom_pick_list_item, ''), sed.item_code
+        """,
+        {"pick_lists": tuple(names)},
+        as_dict=True,
+    ):
+        if row.custom_pick_list_item:
+            linked.setdefault(row.pick_list, []).append(row)
+        else:
+            unlinked.setdefault(row.pick_list, []).append(row)
+
+    for pl in pick_lists:
+        pl.locations = locations.get(pl.name) or []
+        pl.transferred_rows = _merge_by(linked.get(pl.name) or [], "custom_pick_list_item")
+        pl.unlinked_rows = _merge_by(unlinked.get(pl.name) or [], "item_code")
+
+    return pick_lists
+
+
+def _merge_by(rows, key) -> list[frappe._dict]:
+    merged = {}
+    for row in rows:
+        current = merged.setdefault(row[key], frappe._dict({key: row[key], "total_qty": 0.0}))
+        current.total_qty += flt(row.total_qty)
+    return list(merged.values())
+
+
+def _reconcile_pick_list_statuses(pick_lists, dry_run) -> list[dict]:
+    use_unlinked = legacy_pick_list_links_pending()
+    diffs = []
+    for pl in pick_lists:
+        if flt(pl.get("custom_manually_completed")):
+            status = "Completed"
+        else:
+            balances = _get_pick_list_balances_map(
+                pl, pl.transferred_rows, pl.unlinked_rows if use_unlinked else []
+            )
+            has_balance = any(flt(info["balance"]) > TOLERANCE for info in balances.values())
+            status = "Open" if has_balance else "Completed"
+
+        if status == pl.status:
+            continue
+
+        diffs.append(_diff(pl.work_order, "Pick List", pl.name, "status", pl.status, status))
+        if not cint(dry_run):
+            frappe.db.set_value("Pick List", pl.name, "status", status)
+
+    return diffs
+
+
+def _get_transferred_production_qtys(work_orders, pick_lists) -> dict[str, float]:
+    """Batched form of _get_transferred_production_qty_from_stock_entries."""
+    rows = frappe.db.sql(
+        """
+        SELECT
+            se.work_order,
+            se.pick_list,
+            sed.custom_pick_list_item,
+            sed.item_code,
+            COALESCE(SUM(ABS(sed.qty)), 0) AS transferred_qty
+        FROM `tabStock Entry` se
+        INNER JOIN `tabStock Entry Detail` sed
+            ON sed.parent = se.name
+        WHERE
+            se.docstatus = 1
+            AND se.work_order IN %(work_orders)s
+            AND se.pick_list IS NOT NULL
+            AND se.pick_list != ''
+            AND COALESCE(se.custom_is_additional_material, 0) = 0
+            AND (se.stock_entry_type = 'Material Transfer for Manufacture'
+                 OR se.purpose = 'Material Transfer for Manufacture')
+            AND COALESCE(sed.is_finished_item, 0) = 0
+            AND COALESCE(sed.is_scrap_item, 0) = 0
+        GROUP BY se.work_order, se.pick_list, sed.custom_pick_list_item, sed.item_code
+        """,
+        {"work_orders": tuple(work_orders)},
+        as_dict=True,
+    )
+    by_pick_list = {}
+    for row in rows:
+        by_pick_list.setdefault(row.pick_list, []).append(row)
+
+    wo_qty = dict(
+        frappe.get_all(
+            "Work Order",
+            filters={"name": ["in", list(work_orders)]},
+            fields=["name", "qty"],
+            as_list=True,
+        )
+    )
+
+    totals = {}
+    for pl in pick_lists:
+        pl_for_qty = _get_pick_list_finished_goods_qty(pl)
+        if flt(pl.get("custom_manually_completed")):
+            totals[pl.work_order] = totals.get(pl.work_order, 0.0) + pl_for_qty
+            continue
+
+        transfer_rows = by_pick_list.get(pl.name) or []
+        if not transfer_rows:
+            continue
+        ratios = _get_pick_list_transfer_ratios(pl, transfer_rows)
+        if ratios:
+            totals[pl.work_order] = totals.get(pl.work_order, 0.0) + min(ratios) * pl_for_qty
+
+    return {
+        name: min(total, flt(wo_qty.get(name))) if flt(wo_qty.get(name)) > 0 else total
+        for name, total in totals.items()
+    }
+
+
+def _reconcile_item_balances(work_orders, dry_run) -> list[dict]:
+    if not (
+        _has_field("Work Order Item", "custom_balance_to_transfer")
+        or _has_field("Work Order Item", "custom_balance_to_consume")
+    ):
+        return []
+
+    fields = ["name", "parent", "required_qty", "transferred_qty", "consumed_qty"]
+    fields += [
+        fieldname
+        for fieldname in ("custom_balance_to_transfer", "custom_balance_to_consume")
+        if _has_field("Work Order Item", fieldname)
+    ]
+
+    diffs = []
+    updates = {}
+    for row in frappe.get_all(
+        "Work Order Item",
+        filters={"parenttype": "Work Order", "parent": ["in", list(work_orders)]},
+        fields=fields,
+    ):
+        expected = _get_work_order_item_balance_values(
+            flt(row.required_qty), flt(row.transferred_qty), flt(row.consumed_qty)
+        )
+        changed = {
+            fieldname: value
+            for fieldname, value in expected.items()
+            if abs(flt(row.get(fieldname)) - flt(value)) > TOLERANCE
+        }
+        if not changed:
+            continue
+
+        updates[row.name] = changed
+        diffs += [
+            _diff(row.parent, "Work Order Item", row.name, fieldname, row.get(fieldname), value)
+            for fieldname, value in changed.items()
+        ]
+
+    if updates and not cint(dry_run):
+        frappe.db.bulk_update("Work Order Item", updates, update_modified=False)
+
+    return diffs
+
+
+def _diff(work_order, reference_doctype, reference_name, fieldname, old_value, new_value) -> dict:
+    def _format(value):
+        return value if isinstance(value, str) or value is None else str(flt(value, 6))
+
+    return {
+        "work_order": work_order,
+        "reference_doctype": reference_doctype,
+        "reference_name": reference_name,
+        "fieldname": fieldname,
+        "old_value": _format(old_value),
+        "new_value": _format(new_value),
+    }
+
+
+def _has_field(doctype: str, fieldname: str) -> bool:
+    return frappe.get_meta(doctype).has_field(fieldname)
@@ -159,6 +159,8 @@ frappe.query_reports["C4 Production Planning Report"] = {
 		report.page.add_inner_button(__("Total Operations"), () => {
 			open_total_report("Total Operations");
 		});
+
+		c4factory.report_export.add_button(report);
 	},
 	formatter: function (value, row, column, data, default_formatter) {
 		value = default_formatter(value, row, column, data);
@@ -6,14 +6,40 @@ from frappe import _
 from frappe.utils import flt
 from pypika import Order
 
+from c4factory.c4_manufacturing.stock_netting import allocate_by_priority
 from c4factory.c4_manufacturing.work_order_hooks import get_default_source_warehouse
 from erpnext.stock.doctype.warehouse.warehouse import get_child_warehouses
 
 
+EXPORT_CHUNK_SIZE = 500
+
+TOTAL_QTY_FIELDS = (
+	"qty_to_manufacture",
+	"available_qty",
+	"required_qty",
+	"raw_available_qty",
+	"requested_qty",
+	"request_qty",
+	"allotted_qty",
+	"arrival_qty",
+)
+
+
 def execute(filters=None):
 	return ProductionPlanReport(filters).execute_report()
 
 
+def get_columns(filters=None):
+	report = ProductionPlanReport(filters)
+	report.get_columns()
+	return report.columns
+
+
+def iter_data(filters=None):
+	"""Yield report rows for background exports."""
+	yield from ProductionPlanReport(filters).iter_data()
+
+
 class ProductionPlanReport:
 	def __init__(self, filters=None):
 		self.filters = frappe._dict(filters or {})
@@ -21,20 +47,60 @@ class ProductionPlanReport:
 		self.data = []
 		self.item_group_cache = {}
 		self.item_group_warehouse_cache = {}
+		self.supply_index = {}
+		self.supply_available = []
 
 	def execute_report(self):
+		self.load_report_inputs()
+		self.prepare_data()
+		self.add_total_row()
+		self.get_columns()
+
+		return self.columns, self.data
+
+	def iter_data(self, chunk_size=EXPORT_CHUNK_SIZE):
+		"""
+		Yield report rows one chunk of orders at a time for background exports.
+
+		Only the open order list and the stock netting state are kept for the
+		whole run; raw materials, bins, purchases and material requests are
+		loaded for one chunk of orders at a time. Netting carries over from
+		chunk to chunk, so the rows match execute_report.
+		"""
+		self.get_open_orders()
+		total_row = frappe._dict({"name": _("Total")})
+		orders = self.orders or []
+
+		for start in range(0, len(orders), chunk_size):
+			self.orders = orders[start : start + chunk_size]
+			self.load_order_inputs()
+			self.data = []
+			self.prepare_data()
+			for row in self.data:
+				for fieldname in TOTAL_QTY_FIELDS:
+					total_row[fieldname] = flt(total_row.get(fieldname)) + flt(row.get(fieldname))
+				yield row
+
+		self.data = []
+		if len(total_row) > 1:
+			yield total_row
+
+	def load_report_inputs(self):
 		self.get_open_orders()
+		self.load_order_inputs()
+
+	def load_order_inputs(self):
+		"""Raw materials, stock, purchases and material requests of self.orders."""
+		self.raw_materials_dict = {}
+		self.bin_details = {}
+		self.purchase_details = {}
+		self.material_request_details = {}
 		self.get_raw_materials()
 		self.get_item_details()
 		self.set_item_group_warehouses()
 		self.get_bin_details()
 		self.get_purchase_details()
 		self.get_material_request_details()
-		self.prepare_data()
-		self.add_total_row()
-		self.get_columns()
-
-		return self.columns, self.data
 
 	def get_open_orders(self):
 		doctype, order_by = self.filters.based_on, self.filters.order_by
@@ -337,75 +403,124 @@ class ProductionPlanReport:
 			if d.parent not in self.material_request_details[key].material_requests:
 				self.material_request_details[key].material_requests.append(d.parent)
 
-	def prepare_data(self):
-		if not self.orders:
+	def prepare_data(self, orders=None):
+		orders = self.orders if orders is None else orders
+		if not (orders and self.raw_materials_dict):
 			return
 
-		for d in self.orders:
+		demands = []
+
+		# Demand columns, in order priority: the finished good netted against its
+		# own warehouse first, then every raw material against its warehouses.
+		for d in orders:
 			key = d.name if self.filters.based_on == "Work Order" else d.bom_no
 
 			if not self.raw_materials_dict.get(key):
 				continue
 
-			bin_data = self.bin_details.get((d.production_item, d.warehouse)) or {}
 			d.update({"for_warehouse": d.warehouse, "available_qty": 0})
+			order_demands = [
+				frappe._dict(
+					{
+						"order": d,
+						"qty": flt(d.qty_to_manufacture),
+						"supply": [self.get_supply_index(d.production_item, d.warehouse)],
+					}
+				)
+			]
 
-			if bin_data and bin_data.get("actual_qty") > 0 and d.qty_to_manufacture:
-				d.available_qty = (
-					bin_data.get("actual_qty")
-					if (d.qty_to_manufacture > bin_data.get("actual_qty"))
-					else d.qty_to_manufacture
+			for raw_material in self.raw_materials_dict.get(key):
+				args = frappe._dict(raw_material)
+				if self.filters.based_on != "Work Order":
+					args.required_qty = args.required_qty_per_unit * d.qty_to_manufacture
+
+				args.remaining_qty = args.required_qty
+				warehouses = self.get_raw_material_warehouses(args, d)
+				order_demands.append(
+					frappe._dict(
+						{
+							"order": d,
+							"args": args,
+							"warehouses": warehouses,
+							"qty": flt(args.required_qty),
+							"supply": [self.get_supply_index(args.item_code, wh) for wh in warehouses],
+						}
+					)
 				)
 
-				bin_data["actual_qty"] -= d.available_qty
+			demands.extend(order_demands)
 
-			self.update_raw_materials(d, key)
+		before, allotted = allocate_by_priority(
+			self.supply_available,
+			[demand.qty for demand in demands],
+			[demand.supply for demand in demands],
+		)
 
-	def update_raw_materials(self, data, key):
 		self.index = 0
+		current_order = None
+		for demand, demand_before, demand_allotted in zip(demands, before, allotted, strict=True):
+			for supply_index, qty in zip(demand.supply, demand_allotted, strict=False):
+				self.supply_available[supply_index] -= qty
+
+			if demand.order is not current_order:
+				current_order = demand.order
+				self.index = 0
+
+			if not demand.args:
+				if demand_allotted and demand.qty:
+					demand.order.available_qty = demand_allotted[0]
+				continue
 
-		base_warehouses = self.mrp_warehouses or []
-		for d in self.raw_materials_dict.get(key):
-			warehouses = list(base_warehouses)
-			if self.filters.based_on != "Work Order":
-				d.required_qty = d.required_qty_per_unit * data.qty_to_manufacture
+			self.update_raw_materials(demand, demand_before, demand_allotted)
 
-			if not warehouses:
-				warehouses = [data.warehouse]
+	def get_supply_index(self, item_code, warehouse):
+		key = (item_code, warehouse)
+		if key not in self.supply_index:
+			bin_data = self.bin_details.get(key) or {}
+			self.supply_index[key] = len(self.supply_available)
+			self.supply_available.append(flt(bin_data.get("actual_qty")))
 
-			item_group_warehouse = d.get("item_group_warehouse") or self.get_item_group_warehouse(d.item_code)
-			if item_group_warehouse:
-				warehouses = [item_group_warehouse]
-			elif self.filters.based_on == "Work Order" and d.warehouse:
-				warehouses = [d.warehouse]
-			else:
-				item_details = self.item_details.get(d.item_code)
-				if item_details:
-					warehouses = [item_details["default_warehouse"]]
-
-			if self.filters.raw_material_warehouse:
-				warehouses = get_child_warehouses(self.filters.raw_material_warehouse)
-
-			d.remaining_qty = d.required_qty
-			self.pick_materials_from_warehouses(d, data, warehouses)
-
-			if d.remaining_qty and self.filters.raw_material_warehouse and d.remaining_qty != d.required_qty:
-				row = self.get_args()
-				d.warehouse = self.filters.raw_material_warehouse
-				d.required_qty = d.remaining_qty
-				d.allotted_qty = 0
-				d.raw_available_qty = 0
-				d.requested_qty = self.get_requested_qty(d.item_code, d.warehouse)
-				d.material_request_reference = self.get_material_request_reference(d.item_code, d.warehouse)
-				d.request_qty = flt(d.required_qty)
-				row.update(d)
-				self.data.append(row)
+		return self.supply_index[key]
 
-	def pick_materials_from_warehouses(self, args, order_data, warehouses):
-		for index, warehouse in enumerate(warehouses):
-			if not args.remaining_qty:
-				return
+	def get_raw_material_warehouses(self, args, order_data):
+		if self.filters.raw_material_warehouse:
+			return list(self.mrp_warehouses)
 
+		item_group_warehouse = args.get("item_group_warehouse") or self.get_item_group_warehouse(args.item_code)
+		if item_group_warehouse:
+			return [item_group_warehouse]
+
+		if self.filters.based_on == "Work Order" and args.warehouse:
+			return [args.warehouse]
+
+		item_details = self.item_details.get(args.item_code)
+		if item_details:
+			return [item_details["default_warehouse"]]
+
+		return list(self.mrp_warehouses) or [order_data.warehouse]
+
+	def update_raw_materials(self, demand, demand_before, demand_allotted):
+		d = demand.args
+		self.pick_materials_from_warehouses(d, demand, demand_before, demand_allotted)
+
+		if d.remaining_qty and self.filters.raw_material_warehouse and d.remaining_qty != d.required_qty:
+			row = self.get_args()
+			d.warehouse = self.filters.raw_material_warehouse
+			d.required_qty = d.remaining_qty
+			d.allotted_qty = 0
+			d.raw_available_qty = 0
+			d.requested_qty = self.get_requested_qty(d.item_code, d.warehouse)
+			d.material_request_reference = self.get_material_request_reference(d.item_code, d.warehouse)
+			d.request_qty = flt(d.required_qty)
+			row.update(d)
+			self.data.append(row)
+
+	def pick_materials_from_warehouses(self, args, demand, demand_before, demand_allotted):
+		warehouses = demand.warehouses
+		for index, (raw_available_qty, allotted_qty) in enumerate(
+			zip(demand_before, demand_allotted, strict=True)
+		):
+			warehouse = warehouses[index]
 			row = self.get_args()
 
 			key = (args.item_code, warehouse)
@@ -413,28 +528,20 @@ class ProductionPlanReport:
 
 			if bin_data:
 				row.update(bin_data)
+				row.actual_qty = raw_available_qty
 
-			args.allotted_qty = 0
-			args.raw_available_qty = flt(bin_data.get("actual_qty")) if bin_data else 0
+			args.allotted_qty = allotted_qty
+			args.raw_available_qty = raw_available_qty if bin_data else 0
 			args.requested_qty = self.get_requested_qty(args.item_code, warehouse)
 			args.material_request_reference = self.get_material_request_reference(args.item_code, warehouse)
 			args.request_qty = max(flt(args.required_qty) - flt(args.raw_available_qty), 0)
-
-			if bin_data and bin_data.get("actual_qty") > 0:
-				args.allotted_qty = (
-					bin_data.get("actual_qty")
-					if (args.required_qty > bin_data.get("actual_qty"))
-					else args.required_qty
-				)
-
-				args.remaining_qty -= args.allotted_qty
-				bin_data["actual_qty"] -= args.allotted_qty
+			args.remaining_qty -= allotted_qty
 
 			if (
 				self.mrp_warehouses and (args.allotted_qty or index == len(warehouses) - 1)
 			) or not self.mrp_warehouses:
 				if not self.index:
-					row.update(order_data)
+					row.update(demand.order)
 					self.index += 1
 
 				args.warehouse = warehouse
@@ -462,19 +569,8 @@ class ProductionPlanReport:
 		if not self.data:
 			return
 
-		qty_fields = [
-			"qty_to_manufacture",
-			"available_qty",
-			"required_qty",
-			"raw_available_qty",
-			"requested_qty",
-			"request_qty",
-			"allotted_qty",
-			"arrival_qty",
-		]
-
 		total_row = frappe._dict({"name": _("Total")})
-		for fieldname in qty_fields:
+		for fieldname in TOTAL_QTY_FIELDS:
 			total_row[fieldname] = sum(flt(row.get(fieldname)) for row in self.data)
 
 		self.data.append(total_row)
@@ -50,5 +50,14 @@ frappe.query_reports["Manufacture Plan"] = {
 			label: __("To Date"),
 			fieldtype: "Date",
 		},
+		{
+			fieldname: "period",
+			label: __("Roll Up"),
+			fieldtype: "Select",
+			options: ["", "Daily", "Weekly"],
+		},
 	],
+	onload(report) {
+		c4factory.report_export.add_button(report);
+	},
 };
@@ -1,12 +1,21 @@
 import frappe
 
+# Roll-up period -> date bucket column of Work Order Progress
+PERIOD_BUCKETS = {
+	"Daily": "planned_date",
+	"Weekly": "week_start",
+}
+
 
 def execute(filters=None):
 	filters = frappe._dict(filters or {})
-	return get_columns(), get_data(filters)
+	return get_columns(filters), get_data(filters)
+
 
+def get_columns(filters=None):
+	if filters and PERIOD_BUCKETS.get(filters.get("period")):
+		return get_rollup_columns()
 
-def get_columns():
 	return [
 		{
 			"label": "Production Plan",
@@ -35,63 +44,107 @@ def get_columns():
 	]
 
 
+def get_rollup_columns():
+	return [
+		{"label": "Period", "fieldname": "period_start", "fieldtype": "Date", "width": 120},
+		{"label": "Company", "fieldname": "company", "fieldtype": "Link", "options": "Company", "width": 140},
+		{"label": "Work Orders", "fieldname": "work_orders", "fieldtype": "Int", "width": 110},
+		{"label": "Qty", "fieldname": "qty", "fieldtype": "Float", "width": 100},
+		{"label": "Produced Qty", "fieldname": "produced_qty", "fieldtype": "Float", "width": 120},
+		{"label": "Pending Qty", "fieldname": "pending_qty", "fieldtype": "Float", "width": 120},
+		{"label": "% Produced", "fieldname": "percent_produced", "fieldtype": "Percent", "width": 110},
+	]
+
+
 def get_data(filters):
-	conditions = ["wo.docstatus < 2"]
+	query, values = get_query(filters)
+	return frappe.db.sql(query, values, as_dict=True)
+
+
+def iter_data(filters):
+	"""Yield report rows from an unbuffered cursor for background exports."""
+	query, values = get_query(filters)
+	with frappe.db.unbuffered_cursor():
+		yield from frappe.db.sql(query, values, as_dict=True, as_iterator=True)
+
+
+def get_query(filters):
+	"""
+	Read the maintained Work Order Progress fact table.
+
+	Pending qty, % produced and the day/week buckets are kept up to date by the
+	Work Order hooks, so loads only filter and sort indexed columns.
+	"""
+	conditions = ["1 = 1"]
 	values = {}
 
 	if filters.get("production_plan"):
-		conditions.append("wo.production_plan = %(production_plan)s")
+		conditions.append("wop.production_plan = %(production_plan)s")
 		values["production_plan"] = filters.production_plan
 
 	if filters.get("company"):
-		conditions.append("wo.company = %(company)s")
+		conditions.append("wop.company = %(company)s")
 		values["company"] = filters.company
 
 	if filters.get("status"):
-		conditions.append("wo.status = %(status)s")
+		conditions.append("wop.status = %(status)s")
 		values["status"] = filters.status
 
 	if filters.get("item"):
-		conditions.append("wo.production_item = %(item)s")
+		conditions.append("wop.production_item = %(item)s")
 		values["item"] = filters.item
 
 	if filters.get("sales_order"):
-		conditions.append("wo.sales_order = %(sales_order)s")
+		conditions.append("wop.sales_order = %(sales_order)s")
 		values["sales_order"] = filters.sales_order
 
 	if filters.get("from_date"):
-		conditions.append("wo.planned_start_date >= %(from_date)s")
+		conditions.append("wop.planned_date >= %(from_date)s")
 		values["from_date"] = filters.from_date
 
 	if filters.get("to_date"):
-		conditions.append("wo.planned_start_date <= %(to_date)s")
+		conditions.append("wop.planned_date <= %(to_date)s")
 		values["to_date"] = filters.to_date
 
 	where_clause = " AND ".join(conditions)
 
-	return frappe.db.sql(
-		f"""
+	bucket = PERIOD_BUCKETS.get(filters.get("period"))
+	if bucket:
+		query = f"""
+			SELECT
+				wop.{bucket} AS period_start,
+				wop.company,
+				COUNT(wop.name) AS work_orders,
+				SUM(wop.qty) AS qty,
+				SUM(wop.produced_qty) AS produced_qty,
+				SUM(wop.pending_qty) AS pending_qty,
+				CASE
+					WHEN IFNULL(SUM(wop.qty), 0) = 0 THEN 0
+					ELSE (SUM(wop.produced_qty) / SUM(wop.qty)) * 100
+				END AS percent_produced
+			FROM `tabWork Order Progress` wop
+			WHERE {where_clause}
+			GROUP BY wop.{bucket}, wop.company
+			ORDER BY wop.{bucket} DESC, wop.company
+		"""
+		return query, values
+
+	query = f"""
 		SELECT
-			wo.production_plan AS production_plan,
-			wo.name AS work_order,
-			wo.planned_start_date,
-			wo.company,
-			wo.sales_order,
-			wo.production_item AS item,
-			i.item_name AS item_name,
-			wo.status,
-			wo.qty,
-			wo.produced_qty,
-			GREATEST(IFNULL(wo.qty, 0) - IFNULL(wo.produced_qty, 0), 0) AS pending_qty,
-			CASE
-				WHEN IFNULL(wo.qty, 0) = 0 THEN 0
-				ELSE (IFNULL(wo.produced_qty, 0) / wo.qty) * 100
-			END AS percent_produced
-		FROM `tabWork Order` wo
-		LEFT JOIN `tabItem` i ON i.name = wo.production_item
+			wop.production_plan AS production_plan,
+			wop.work_order AS work_order,
+			wop.planned_start_date,
+			wop.company,
+			wop.sales_order,
+			wop.production_item AS item,
+			wop.item_name AS item_name,
+			wop.status,
+			wop.qty,
+			wop.produced_qty,
+			wop.pending_qty,
+			wop.percent_produced
+		FROM `tabWork Order Progress` wop
 		WHERE {where_clause}
-		ORDER BY wo.production_plan DESC, wo.planned_start_date DESC, wo.name
-		""",
-		values,
-		as_dict=True,
-	)
+		ORDER BY wop.production_plan DESC, wop.planned_start_date DESC, wop.work_order
+	"""
+	return query, values
@@ -51,6 +51,23 @@ frappe.query_reports["Operation Status"] = {
 			label: __("Has Default BOM"),
 			fieldtype: "Check",
 		},
+		{
+			fieldname: "page_length",
+			label: __("Page Length"),
+			fieldtype: "Int",
+		},
+		{
+			fieldname: "after_modified",
+			label: __("After Modified"),
+			fieldtype: "Data",
+			hidden: 1,
+		},
+		{
+			fieldname: "after_name",
+			label: __("After Sales Order"),
+			fieldtype: "Data",
+			hidden: 1,
+		},
 	],
 	get_datatable_options(options) {
 		return Object.assign(options, {
@@ -150,5 +167,29 @@ frappe.query_reports["Operation Status"] = {
 				rows: JSON.stringify(rows),
 			});
 		});
+
+		report.page.add_inner_button(__("Next Page"), () => {
+			const data = report.data || [];
+			const last = data[data.length - 1];
+
+			if (!last || !last.modified) {
+				frappe.msgprint(__("No more Sales Orders to load."));
+				return;
+			}
+
+			report.set_filter_value({
+				after_modified: last.modified,
+				after_name: last.name,
+			});
+		});
+
+		report.page.add_inner_button(__("First Page"), () => {
+			report.set_filter_value({
+				after_modified: "",
+				after_name: "",
+			});
+		});
+
+		c4factory.report_export.add_button(report);
 	},
 };
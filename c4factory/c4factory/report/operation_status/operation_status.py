@@ -1,10 +1,29 @@
 import frappe
+from frappe import _
+from frappe.utils import cint
+
+from c4factory.c4_manufacturing.bom_index import get_default_boms
+from c4factory.c4factory.doctype.c4factory_settings.c4factory_settings import (
+    get_c4factory_setting,
+)
+
+DEFAULT_PAGE_LENGTH = 500
+EXPORT_PAGE_LENGTH = 1000
 
 
 def execute(filters=None):
+    filters = frappe._dict(filters or {})
     columns = get_columns()
-    data = get_data(filters or {})
-    return columns, data
+    data = get_data(filters)
+
+    message = None
+    page_length = get_page_length(filters)
+    if page_length and len({row.name for row in data}) >= page_length:
+        message = _("Showing the latest {0} Sales Orders. Use Next Page to load older ones.").format(
+            page_length
+        )
+
+    return columns, data, message
 
 
 def get_columns():
@@ -36,6 +55,144 @@ def get_columns():
 
 
 def get_data(filters):
+    sales_orders = get_sales_order_page(filters)
+    if not sales_orders:
+        return []
+
+    query, values = get_query(filters, [row.name for row in sales_orders])
+    return set_default_boms(frappe.db.sql(query, values, as_dict=True), filters)
+
+
+def iter_data(filters):
+    """Walk every page with the keyset cursor for background exports."""
+    filters = frappe._dict(filters)
+    filters.page_length = EXPORT_PAGE_LENGTH
+    filters.pop("after_modified", None)
+    filters.pop("after_name", None)
+
+    while True:
+        sales_orders = get_sales_order_page(filters)
+        if not sales_orders:
+            break
+
+        query, values = get_query(filters, [row.name for row in sales_orders])
+        yield from set_default_boms(frappe.db.sql(query, values, as_dict=True), filters)
+
+        if len(sales_orders) < EXPORT_PAGE_LENGTH:
+            break
+
+        filters.after_modified = sales_orders[-1].modified
+        filters.after_name = sales_orders[-1].name
+
+
+def set_default_boms(rows, filters):
+    """Fill bom_no from the shared default-BOM index instead of joining tabBOM."""
+    default_boms = get_default_boms(row.item_code for row in rows)
+
+    data = []
+    for row in rows:
+        default_bom = default_boms.get(row.item_code)
+        if filters.get("has_default_bom") and not default_bom:
+            continue
+
+        row.bom_no = row.bom_no or default_bom
+        data.append(row)
+
+    return data
+
+
+def get_page_length(filters):
+    if filters.get("page_length") is not None and filters.get("page_length") != "":
+        return max(cint(filters.page_length), 0)
+
+    return max(cint(get_c4factory_setting("report_page_length", DEFAULT_PAGE_LENGTH)), 0)
+
+
+def get_sales_order_page(filters):
+    """
+    One page of Sales Orders, newest first.
+
+    Pages are cut with a keyset on (modified, name), so loading an older page
+    costs the same as the first one however much history the site has.
+    """
+    if filters.get("has_default_bom"):
+        return get_sales_orders_with_default_bom(filters)
+
+    return get_sales_order_batch(filters, get_page_length(filters))
+
+
+def get_sales_orders_with_default_bom(filters):
+    """
+    One page of Sales Orders having at least one item with a default BOM.
+
+    Candidates are read in keyset batches and their items are checked against
+    the shared default-BOM index, so tabBOM is not joined into the page query.
+    """
+    page_length = get_page_length(filters)
+    batch_length = page_length or EXPORT_PAGE_LENGTH
+    scan_filters = frappe._dict(filters)
+    page = []
+
+    while True:
+        candidates = get_sales_order_batch(scan_filters, batch_length)
+        if not candidates:
+            break
+
+        items = frappe.get_all(
+            "Sales Order Item",
+            filters={"parenttype": "Sales Order", "parent": ["in", [row.name for row in candidates]]},
+            fields=["parent", "item_code"],
+        )
+        default_boms = get_default_boms(row.item_code for row in items)
+        with_default_bom = {row.parent for row in items if default_boms.get(row.item_code)}
+
+        for sales_order in candidates:
+            if sales_order.name in with_default_bom:
+                page.append(sales_order)
+                if page_length and len(page) >= page_length:
+                    return page
+
+        if len(candidates) < batch_length:
+            break
+
+        scan_filters.after_modified = candidates[-1].modified
+        scan_filters.after_name = candidates[-1].name
+
+    return page
+
+
+def get_sales_order_batch(filters, page_length):
+    conditions, values = get_conditions(filters)
+
+    if filters.get("after_modified") and filters.get("after_name"):
+        conditions.append(
+            """(
+                so.modified < %(after_modified)s
+                OR (so.modified = %(after_modified)s AND so.name < %(after_name)s)
+            )"""
+        )
+        values["after_modified"] = filters.after_modified
+        values["after_name"] = filters.after_name
+
+    limit_clause = ""
+    if page_length:
+        limit_clause = "LIMIT %(page_length)s"
+        values["page_length"] = page_length
+
+    return frappe.db.sql(
+        f"""
+        SELECT so.name, so.modified
+        FROM `tabSales Order` so
+        WHERE {" AND ".join(conditions)}
+        ORDER BY so.modified DESC, so.name DESC
+        {limit_clause}
+        """,
+        values,
+        as_dict=True,
+    )
+
+
+def get_conditions(filters):
     values = {}
 
     conditions = [
@@ -74,15 +231,36 @@ def get_data(filters):
         conditions.append("so.billing_status = %(billing_status)s")
         values["billing_status"] = filters["billing_status"]
 
-    if filters.get("has_default_bom"):
-        conditions.append("b.name IS NOT NULL")
+    return conditions, values
 
-    where_clause = " AND ".join(conditions)
 
-    return frappe.db.sql(
-        f"""
+def get_query(filters, sales_orders):
+    values = {"sales_orders": tuple(sales_orders)}
+
+    if cint(get_c4factory_setting("use_work_order_summary", 0)):
+        work_order_join = """
+        LEFT JOIN `tabSales Order Work Order Summary` wo
+            ON wo.sales_order = so.name AND wo.production_item = soi.item_code"""
+    else:
+        # Aggregate only the Work Orders of this page's Sales Orders.
+        work_order_join = """
+        LEFT JOIN (
+            SELECT
+                sales_order,
+                production_item,
+                MAX(name) AS work_order,
+                SUM(qty) AS wo_qty,
+                SUM(produced_qty) AS manufactured_qty
+            FROM `tabWork Order`
+            WHERE docstatus < 2
+              AND sales_order IN %(sales_orders)s
+            GROUP BY sales_order, production_item
+        ) wo ON wo.sales_order = so.name AND wo.production_item = soi.item_code"""
+
+    query = f"""
         SELECT
             so.name AS name,
+            so.modified AS modified,
             so.custom_priority_ AS priority,
             so.customer_name AS customer_name,
             so.transaction_date AS transaction_date,
@@ -104,25 +282,11 @@ def get_data(filters):
             so.per_billed AS per_billed,
             so.billing_status AS billing_status,
             so.base_grand_total AS base_grand_total,
-            COALESCE(soi.bom_no, b.name) AS bom_no
+            soi.bom_no AS bom_no
         FROM `tabSales Order` so
         LEFT JOIN `tabSales Order Item` soi ON soi.parent = so.name
-        LEFT JOIN `tabItem` item ON item.name = soi.item_code
-        LEFT JOIN (
-            SELECT
-                sales_order,
-                production_item,
-                MAX(name) AS work_order,
-                SUM(qty) AS wo_qty,
-                SUM(produced_qty) AS manufactured_qty
-            FROM `tabWork Order`
-            WHERE docstatus < 2
-            GROUP BY sales_order, production_item
-        ) wo ON wo.sales_order = so.name AND wo.production_item = soi.item_code
-        LEFT JOIN `tabBOM` b ON b.item = soi.item_code AND b.is_default = 1 AND b.is_active = 1
-        WHERE {where_clause}
-        ORDER BY so.modified DESC
-        """,
-        values,
-        as_dict=True,
-    )
+        LEFT JOIN `tabItem` item ON item.name = soi.item_code{work_order_join}
+        WHERE so.name IN %(sales_orders)s
+        ORDER BY so.modified DESC, so.name DESC, soi.idx
+    """
+    return query, values
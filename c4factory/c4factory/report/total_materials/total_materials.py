@@ -1,5 +1,6 @@
 import frappe
 
+from c4factory.c4_manufacturing.bom_index import get_default_boms
 from c4factory.c4_manufacturing.work_order_hooks import get_default_source_warehouse
 
 
@@ -92,13 +93,6 @@ def get_data(filters):
 		bin_cache[key] = bin_row
 		return bin_row
 
-	def get_default_bom(item_code):
-		return frappe.db.get_value(
-			"BOM",
-			{"item": item_code, "is_default": 1, "is_active": 1},
-			"name",
-		)
-
 	def explode_bom(bom_no, qty):
 		if not bom_no or qty is None:
 			return
@@ -122,6 +116,8 @@ def get_data(filters):
 
 			totals[component_item] = (totals.get(component_item) or 0) + component_qty
 
+	default_boms = get_default_boms(row.get("item_code") for row in rows if not row.get("bom_no"))
+
 	for row in rows:
 		item_code = row.get("item_code")
 		if not item_code:
@@ -131,7 +127,7 @@ def get_data(filters):
 		if qty <= 0:
 			continue
 
-		bom_no = row.get("bom_no") or get_default_bom(item_code)
+		bom_no = row.get("bom_no") or default_boms.get(item_code)
 		explode_bom(bom_no, qty)
 
 	data = []
@@ -1,5 +1,7 @@
 import frappe
 
+from c4factory.c4_manufacturing.bom_index import get_default_boms
+
 
 def execute(filters=None):
 	filters = filters or {}
@@ -22,13 +24,6 @@ def get_data(filters):
 	bom_cache = {}
 	bom_operation_meta = frappe.get_meta("BOM Operation")
 
-	def get_default_bom(item_code):
-		return frappe.db.get_value(
-			"BOM",
-			{"item": item_code, "is_default": 1, "is_active": 1},
-			"name",
-		)
-
 	def get_operation_time_per_unit(op_row, base_qty):
 		if bom_operation_meta.has_field("time_in_mins_per_unit"):
 			per_unit = op_row.get("time_in_mins_per_unit")
@@ -60,6 +55,8 @@ def get_data(filters):
 			total_time = per_unit * qty
 			totals[operation] = (totals.get(operation) or 0) + total_time
 
+	default_boms = get_default_boms(row.get("item_code") for row in rows if not row.get("bom_no"))
+
 	for row in rows:
 		item_code = row.get("item_code")
 		if not item_code:
@@ -69,7 +66,7 @@ def get_data(filters):
 		if qty <= 0:
 			continue
 
-		bom_no = row.get("bom_no") or get_default_bom(item_code)
+		bom_no = row.get("bom_no") or default_boms.get(item_code)
 		add_bom_operations(bom_no, qty)
 
 	return [{"operation": operation, "total_time": totals[operation]} for operation in sorted(totals.keys())]
@@ -0,0 +1,51 @@
+import click
+from frappe.commands import pass_context
+
+
+@click.command("c4factory-reconcile-work-orders")
+@click.option(
+    "--scope",
+    type=click.Choice(["Open", "All Submitted"]),
+    default="Open",
+    help="Open skips Completed and Closed Work Orders.",
+)
+@click.option("--company", help="Only Work Orders of this company.")
+@click.option("--shards", default=4, type=int, help="Parallel background jobs.")
+@click.option("--chunk-size", default=50, type=int, help="Work Orders per committed chunk.")
+@click.option("--thaw-frozen", is_flag=True, help="Also recompute frozen (finished) Work Orders.")
+@click.option("--dry-run", is_flag=True, help="Only report differences.")
+@click.option("--resume", "resume_run", help="Resume an earlier Work Order Reconcile Run.")
+@pass_context
+def reconcile_work_orders(
+    context, scope, company, shards, chunk_size, thaw_frozen, dry_run, resume_run
+):
+    """Queue a sharded reconcile of Work Order transfer, Pick List and costing state."""
+    import frappe
+
+    from c4factory.c4factory.doctype.work_order_reconcile_run.work_order_reconcile_run import (
+        resume_work_order_reconcile,
+        start_work_order_reconcile,
+    )
+
+    for site in context.sites:
+        frappe.init(site=site)
+        frappe.connect()
+        try:
+            if resume_run:
+                run = resume_work_order_reconcile(resume_run)
+            else:
+                run = start_work_order_reconcile(
+                    scope=scope,
+                    company=company,
+                    shard_count=shards,
+                    chunk_size=chunk_size,
+                    thaw_frozen=int(thaw_frozen),
+                    dry_run=int(dry_run),
+                )
+            frappe.db.commit()
+            click.echo(f"{site}: Work Order Reconcile Run {run} queued")
+        finally:
+            frappe.destroy()
+
+
+commands = [reconcile_work_orders]
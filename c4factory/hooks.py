@@ -11,6 +11,12 @@ app_license = "mit"
 # Client Scripts
 # ---------------------------------------------------------
 
+app_include_js = [
+    "/assets/c4factory/js/utils/report_export.js",
+    "/assets/c4factory/js/utils/additional_materials.js",
+    "/assets/c4factory/js/utils/progress_events.js",
+]
+
 doctype_js = {
     "Pick List": "public/js/doctype/pick_list.js",
     "Stock Entry": "public/js/doctype/stock_entry.js",
@@ -23,17 +29,46 @@ doctype_js = {
     "Sample Request": "public/js/doctype/sample_request/sample_request.js",
 }
 
+doctype_list_js = {
+    "Work Order": "public/js/doctype/work_order_list.js",
+    "Pick List": "public/js/doctype/pick_list_list.js",
+}
+
 # ---------------------------------------------------------
 # Doc Events (server hooks)
 # ---------------------------------------------------------
 
 doc_events = {
+    # Item Group – source warehouse map used by Work Order grid edits
+    "Item Group": {
+        "on_update": "c4factory.c4_manufacturing.work_order_hooks.clear_item_group_warehouse_map",
+        "on_trash": "c4factory.c4_manufacturing.work_order_hooks.clear_item_group_warehouse_map",
+        "after_rename": "c4factory.c4_manufacturing.work_order_hooks.clear_item_group_warehouse_map",
+    },
     # Work Order – source warehouse autofill from Item Group
     "Work Order": {
         "validate": [
             "c4factory.c4_manufacturing.work_order_hooks.set_source_warehouse_from_item_group",
             "c4factory.c4_manufacturing.work_order_hooks.update_scrap_and_costing",
         ],
+        "on_update": "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_work_order_change",
+        "on_submit": "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_work_order_change",
+        "on_update_after_submit": "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_work_order_change",
+        "on_cancel": "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_work_order_change",
+        "on_change": [
+            "c4factory.c4factory.doctype.work_order_progress.work_order_progress.update_work_order_progress",
+            "c4factory.c4_manufacturing.work_order_freeze.sync_frozen_state",
+        ],
+        "after_delete": [
+            "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_work_order_change",
+            "c4factory.c4factory.doctype.work_order_progress.work_order_progress.update_work_order_progress",
+        ],
+    },
+
+    # BOM – keep the shared default-BOM index in sync
+    "BOM": {
+        "on_change": "c4factory.c4_manufacturing.bom_index.clear_default_bom_cache",
+        "on_trash": "c4factory.c4_manufacturing.bom_index.clear_default_bom_cache",
     },
 
     # Pick List custom flow
@@ -51,26 +86,38 @@ doc_events = {
         "validate": [
             "c4factory.c4_manufacturing.stock_entry_hooks.validate_additional_material_transfer",
             "c4factory.c4_manufacturing.stock_entry_hooks.set_wip_target_warehouse",
+            "c4factory.c4_manufacturing.legacy_pick_list_links.link_stock_entry_pick_list_rows",
         ],
         "before_submit": [
             "c4factory.c4_manufacturing.stock_entry_hooks.validate_additional_material_transfer",
             "c4factory.c4_manufacturing.stock_entry_hooks.set_wip_target_warehouse",
             "c4factory.c4_manufacturing.stock_entry_hooks.set_pick_list_transferred_production_qty",
+            "c4factory.c4_manufacturing.work_order_freeze.thaw_for_stock_entry",
         ],
         "on_submit": [
             "c4factory.c4_manufacturing.stock_entry_hooks.apply_additional_material_to_work_order",
             "c4factory.c4_manufacturing.stock_entry_hooks.on_submit_update_work_order_costing",
             "c4factory.api.work_order_flow.on_stock_entry_submit",
             "c4factory.c4factory.doctype.sub_pick_list.sub_pick_list.update_from_stock_entry",
+            "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_stock_entry_change",
+            "c4factory.c4_manufacturing.work_order_freeze.refreeze_after_stock_entry",
         ],
+        "before_cancel": "c4factory.c4_manufacturing.work_order_freeze.thaw_for_stock_entry",
         "on_cancel": [
             "c4factory.c4_manufacturing.stock_entry_hooks.reverse_additional_material_from_work_order",
             "c4factory.api.work_order_flow.on_stock_entry_cancel",
             "c4factory.c4factory.doctype.sub_pick_list.sub_pick_list.update_from_stock_entry",
+            "c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary.on_stock_entry_change",
+            "c4factory.c4_manufacturing.work_order_freeze.refreeze_after_stock_entry",
         ],
         "on_trash": "c4factory.api.work_order_flow.on_stock_entry_trash",
     },
 
+    # Repost Item Valuation – refresh costing of the revalued Work Orders
+    "Repost Item Valuation": {
+        "on_change": "c4factory.c4_manufacturing.repost_costing.on_repost_item_valuation_change",
+    },
+
     # Job Card – keep partial completion from becoming process loss
     "Job Card": {
         "before_validate": "c4factory.c4_manufacturing.job_card_hooks.set_operation_row_reference",
@@ -97,6 +144,25 @@ override_doctype_class = {
     "Stock Entry": "c4factory.overrides.stock_entry.StockEntry",
 }
 
+# ---------------------------------------------------------
+# Scheduled jobs
+# ---------------------------------------------------------
+
+scheduler_events = {
+    "cron": {
+        # Debounced Pick List operation cost from changed Job Cards
+        "* * * * *": [
+            "c4factory.api.work_order_flow.rollup_pick_list_operation_costs",
+        ],
+    },
+    "daily": [
+        # Work Order cost snapshots rolled up by day, item and workstation
+        "c4factory.c4factory.doctype.work_order_cost_daily.work_order_cost_daily.roll_up_pending_work_order_costs",
+        # Background report exports past their retention
+        "c4factory.api.report_export.purge_old_report_exports",
+    ],
+}
+
 # ---------------------------------------------------------
 # Database patches for custom fields
 # ---------------------------------------------------------
@@ -113,6 +179,20 @@ patches = [
     # Additional material transfers linked to a Pick List and Work Order
     "c4factory.patches.v1_0.setup_additional_material_flow",
     "c4factory.patches.v1_0.setup_sub_pick_list_stock_fields",
+    # Maintained Work Order totals per Sales Order item for Operation Status
+    "c4factory.patches.v1_0.build_sales_order_work_order_summary",
+    # Per Work Order production-progress fact table for Manufacture Plan
+    "c4factory.patches.v1_0.build_work_order_progress",
+    # Warehouse walk order for consolidated Picking Waves
+    "c4factory.patches.v1_0.setup_picking_wave_fields",
+    # Available / shortage quantities on Pick List rows
+    "c4factory.patches.v1_0.setup_pick_list_availability_fields",
+    # Transfer state checksum so Pick List creation can skip the recompute
+    "c4factory.patches.v1_0.setup_work_order_transfer_stamp",
+    # Row-level Pick List links on legacy Stock Entry rows (background job)
+    "c4factory.patches.v1_0.backfill_legacy_pick_list_links",
+    # Frozen costing / transfer snapshot for Completed and Closed Work Orders
+    "c4factory.patches.v1_0.setup_work_order_freeze",
 ]
 
 override_doctype_dashboards = {
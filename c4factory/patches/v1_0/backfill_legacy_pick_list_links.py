@@ -0,0 +1,9 @@
+from c4factory.c4_manufacturing.legacy_pick_list_links import (
+    enqueue_legacy_pick_list_link_backfill,
+)
+
+
+def execute():
+    # The backfill commits per chunk and resumes from its cursor, so it runs
+    # as a background job instead of holding up the migration.
+    enqueue_legacy_pick_list_link_backfill()
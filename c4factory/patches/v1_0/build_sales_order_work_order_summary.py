@@ -0,0 +1,7 @@
+from c4factory.c4factory.doctype.sales_order_work_order_summary.sales_order_work_order_summary import (
+    rebuild_sales_order_work_order_summary,
+)
+
+
+def execute():
+    rebuild_sales_order_work_order_summary()
@@ -0,0 +1,7 @@
+from c4factory.c4factory.doctype.work_order_progress.work_order_progress import (
+    rebuild_work_order_progress,
+)
+
+
+def execute():
+    rebuild_work_order_progress()
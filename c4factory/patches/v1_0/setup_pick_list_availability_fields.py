@@ -0,0 +1,30 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Pick List Item": [
+                {
+                    "fieldname": "custom_available_qty",
+                    "label": "Available Qty",
+                    "fieldtype": "Float",
+                    "insert_after": "custom_pl_qty",
+                    "read_only": 1,
+                    "no_copy": 1,
+                },
+                {
+                    "fieldname": "custom_shortage_qty",
+                    "label": "Shortage Qty",
+                    "fieldtype": "Float",
+                    "insert_after": "custom_available_qty",
+                    "read_only": 1,
+                    "no_copy": 1,
+                },
+            ]
+        },
+        update=True,
+    )
+
+    frappe.clear_cache(doctype="Pick List")
@@ -19,15 +19,14 @@ def execute():
     )
 
     try:
-        from c4factory.api.work_order_flow import update_pick_list_operation_cost
+        from c4factory.api.work_order_flow import update_pick_list_operation_costs
 
         pick_lists = frappe.get_all(
             "Pick List",
             filters={"work_order": ["!=", ""]},
             pluck="name",
         )
-        for pick_list in pick_lists:
-            update_pick_list_operation_cost(pick_list)
+        update_pick_list_operation_costs(pick_lists)
     except Exception:
         frappe.log_error(
             frappe.get_traceback(),
@@ -0,0 +1,21 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Warehouse": [
+                {
+                    "fieldname": "c4_pick_walk_sequence",
+                    "label": "Pick Walk Sequence",
+                    "fieldtype": "Int",
+                    "insert_after": "parent_warehouse",
+                    "description": "Order in which pickers visit this warehouse in a Picking Wave.",
+                }
+            ]
+        },
+        update=True,
+    )
+
+    frappe.clear_cache(doctype="Warehouse")
@@ -0,0 +1,50 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+from c4factory.c4_manufacturing.work_order_freeze import freeze_finished_work_orders
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Work Order": [
+                {
+                    "fieldname": "custom_costing_frozen",
+                    "label": "Costing Frozen",
+                    "fieldtype": "Check",
+                    "insert_after": "c4_total_cost",
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "allow_on_submit": 1,
+                    "description": "Set when the Work Order is Completed or Closed. "
+                    "Costing and transfer totals are kept until a Stock Entry or "
+                    "Job Card is posted against it.",
+                },
+                {
+                    "fieldname": "custom_costing_frozen_on",
+                    "label": "Costing Frozen On",
+                    "fieldtype": "Datetime",
+                    "insert_after": "custom_costing_frozen",
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "allow_on_submit": 1,
+                    "depends_on": "custom_costing_frozen",
+                },
+                {
+                    "fieldname": "custom_frozen_snapshot",
+                    "label": "Frozen Snapshot",
+                    "fieldtype": "JSON",
+                    "insert_after": "custom_costing_frozen_on",
+                    "hidden": 1,
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "allow_on_submit": 1,
+                    "print_hide": 1,
+                },
+            ]
+        },
+        update=True,
+    )
+
+    frappe.clear_cache(doctype="Work Order")
+    freeze_finished_work_orders()
@@ -0,0 +1,24 @@
+import frappe
+from frappe.custom.doctype.custom_field.custom_field import create_custom_fields
+
+
+def execute():
+    create_custom_fields(
+        {
+            "Work Order": [
+                {
+                    "fieldname": "custom_transfer_state_stamp",
+                    "label": "Transfer State Stamp",
+                    "fieldtype": "Data",
+                    "insert_after": "material_transferred_for_manufacturing",
+                    "hidden": 1,
+                    "read_only": 1,
+                    "no_copy": 1,
+                    "print_hide": 1,
+                },
+            ]
+        },
+        update=True,
+    )
+
+    frappe.clear_cache(doctype="Work Order")
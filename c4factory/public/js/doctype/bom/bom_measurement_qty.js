@@ -1,132 +1,161 @@
 // c4factory/public/js/doctype/bom/bom_measurement_qty.js
 // Final logic: Area / Perimeter / Value / NOS
 // Keep Stock UOM = Item.stock_uom (do not change it logically)
+//
+// Quantities are computed on the server for many rows at once
+// (c4factory.api.bom_measurement.get_bom_measurement_quantities):
+// - item_code edits are collected briefly and sent together; a row keeps a
+//   quantity the user already entered
+// - editing the BOM width / height / depth / quantity recomputes every
+//   measured row and applies the whole result in one grid refresh; rows
+//   that already have a different quantity are only replaced after one
+//   confirmation for the whole batch
+
+frappe.ui.form.on("BOM", {
+  custom_width: (frm) => recompute_all_measurement_rows(frm),
+  custom_height: (frm) => recompute_all_measurement_rows(frm),
+  custom_depth: (frm) => recompute_all_measurement_rows(frm),
+  quantity: (frm) => recompute_all_measurement_rows(frm),
+});
 
 frappe.ui.form.on("BOM Item", {
   item_code: function (frm, cdt, cdn) {
     const row = frappe.get_doc(cdt, cdn);
     if (!row.item_code) return;
 
-    const toFloat = (v) => {
-      const x = parseFloat(v);
-      return isNaN(x) ? 0 : x;
-    };
-
-    const normalizeType = (v) =>
-      (v || "").toString().trim().toLowerCase();
-
-    // Read BOM header dimensions and FG qty from custom fields
-    const W = toFloat(frm.doc.custom_width);
-    const H = toFloat(frm.doc.custom_height);
-    const D = toFloat(frm.doc.custom_depth);
-    const FG_QTY = toFloat(frm.doc.quantity || 1);
-
-    // Fetch Item fields
-    frappe.call({
-      method: "frappe.client.get_value",
-      args: {
-        doctype: "Item",
-        filters: { name: row.item_code },
-        fieldname: [
-          "custom_measurement_type",
-          "custom_techniacl_uom",
-          "stock_uom",          // <-- IMPORTANT: original stock UOM
-        ],
-      },
-      callback: function (res) {
-        if (!res || !res.message) return;
-
-        const data = res.message;
-        const measurement_type_raw = data.custom_measurement_type || "";
-        const mt = normalizeType(measurement_type_raw); // area / perimeter / value / nos
-        const tech_uom = data.custom_techniacl_uom || "";
-        const item_stock_uom = data.stock_uom || row.stock_uom;
-
-        // 1️⃣ Set BOM Item UOM (display UOM) - DO NOT touch stock qty here
-        if (tech_uom) {
-          frappe.model.set_value(cdt, cdn, "uom", tech_uom);
-        }
-
-        // 2️⃣ NOS or empty → qty is always manual
-        if (!mt || mt === "nos") {
-          // لكن لازم نضمن أن Stock UOM ثابت من الـ Item
-          if (item_stock_uom) {
-            frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-          }
-          return;
-        }
-
-        // 3️⃣ Don't overwrite qty if user already filled it
-        const current_qty = toFloat(row.qty);
-        if (current_qty > 0) {
-          if (item_stock_uom) {
-            frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-          }
-          return;
-        }
-
-        const has_dim = (val) => toFloat(val) > 0;
-
-        // 4️⃣ Validate required dimensions
-        if (mt === "area" || mt === "perimeter") {
-          if (!has_dim(W) || !has_dim(H)) {
-            frappe.msgprint(
-              __(
-                "Missing Width/Height on BOM. Cannot auto-calculate qty for item {0}.",
-                [row.item_code]
-              )
-            );
-            // Ensure stock_uom reset anyway
-            if (item_stock_uom) {
-              frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-            }
-            return;
-          }
-        } else if (mt === "value") {
-          if (!has_dim(W) || !has_dim(H) || !has_dim(D)) {
-            frappe.msgprint(
-              __(
-                "Missing Width/Height/Depth on BOM. Cannot auto-calculate qty for item {0}.",
-                [row.item_code]
-              )
-            );
-            if (item_stock_uom) {
-              frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-            }
-            return;
-          }
-        }
-
-        // 5️⃣ Apply formulas EXACTLY as specified
-        let new_qty = 0;
-
-        if (mt === "area") {
-          // Area → qty = (Width × Height) × BOM_qty
-          new_qty = W * H * FG_QTY;
-        } else if (mt === "perimeter") {
-          // Perimeter → qty = (2 × (Width + Height)) × BOM_qty
-          new_qty = 2 * (W + H) * FG_QTY;
-        } else if (mt === "value") {
-          // Value → qty = (Width × Height × Depth) × BOM_qty
-          new_qty = W * H * D * FG_QTY;
-        } else {
-          if (item_stock_uom) {
-            frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-          }
-          return;
-        }
-
-        // 6️⃣ Set calculated qty (rounded) + reset Stock UOM to Item's default
-        if (new_qty > 0) {
-          const rounded = Number(new_qty.toFixed(6));
-          frappe.model.set_value(cdt, cdn, "qty", rounded);
-        }
-
-        // Always force stock_uom back to the Item's default UOM
-        if (item_stock_uom) {
-          frappe.model.set_value(cdt, cdn, "stock_uom", item_stock_uom);
-        }
-      },
-    });
+    frm.__c4_measurement_queue = frm.__c4_measurement_queue || new Set();
+    frm.__c4_measurement_queue.add(cdn);
+
+    clearTimeout(frm.__c4_measurement_timer);
+    frm.__c4_measurement_timer = setTimeout(() => {
+      const names = frm.__c4_measurement_queue;
+      frm.__c4_measurement_queue = new Set();
+      const rows = (frm.doc.items || []).filter(
+        (r) => names.has(r.name) && r.item_code
+      );
+      apply_measurement_quantities(frm, rows, false);
+    }, 150);
   },
 });
+
+function recompute_all_measurement_rows(frm) {
+  if (frm.doc.docstatus !== 0) return;
+
+  clearTimeout(frm.__c4_measurement_header_timer);
+  frm.__c4_measurement_header_timer = setTimeout(() => {
+    const rows = (frm.doc.items || []).filter((r) => r.item_code);
+    apply_measurement_quantities(frm, rows, true);
+  }, 300);
+}
+
+async function apply_measurement_quantities(frm, rows, overwrite) {
+  if (!rows.length) return;
+
+  const { message } = await frappe.call({
+    method: "c4factory.api.bom_measurement.get_bom_measurement_quantities",
+    args: {
+      rows: rows.map((r) => ({ name: r.name, item_code: r.item_code, qty: r.qty })),
+      width: frm.doc.custom_width,
+      height: frm.doc.custom_height,
+      depth: frm.doc.custom_depth,
+      quantity: frm.doc.quantity || 1,
+      overwrite: overwrite ? 1 : 0,
+    },
+  });
+
+  const results = message || [];
+  if (overwrite) {
+    await confirm_replaced_quantities(results);
+  }
+
+  const missing = [];
+  const conversion_missing = [];
+  let changed = false;
+  for (const result of results) {
+    const row = locals["BOM Item"] && locals["BOM Item"][result.name];
+    if (!row) continue;
+
+    // 1️⃣ Set BOM Item UOM (display UOM) and its conversion factor
+    let row_changed = false;
+    if (result.uom && !result.conversion_missing && row.uom !== result.uom) {
+      row.uom = result.uom;
+      row_changed = true;
+    }
+    if (result.uom && !result.conversion_missing && flt(row.conversion_factor) !== flt(result.conversion_factor)) {
+      row.conversion_factor = result.conversion_factor;
+      row_changed = true;
+    }
+
+    // 2️⃣ Calculated qty
+    if (result.qty && flt(row.qty) !== result.qty) {
+      row.qty = result.qty;
+      row_changed = true;
+    }
+
+    // Stock qty follows through the conversion factor
+    if (row_changed) {
+      row.stock_qty = flt(flt(row.qty) * (flt(row.conversion_factor) || 1), 6);
+      changed = true;
+    }
+
+    if (result.missing) {
+      missing.push(result.item_code);
+    }
+    if (result.conversion_missing) {
+      conversion_missing.push(result.item_code);
+    }
+
+    // Always force stock_uom back to the Item's default UOM
+    if (result.stock_uom && row.stock_uom !== result.stock_uom) {
+      row.stock_uom = result.stock_uom;
+      changed = true;
+    }
+  }
+
+  if (changed) {
+    // Amounts and costs as the BOM Item qty / uom triggers would refresh them
+    if (window.erpnext && erpnext.bom && erpnext.bom.calculate_rm_cost) {
+      erpnext.bom.calculate_rm_cost(frm.doc);
+      erpnext.bom.calculate_total(frm.doc);
+    }
+    frm.dirty();
+    frm.refresh_fields();
+  }
+
+  if (missing.length) {
+    frappe.msgprint(
+      __("Missing dimensions on BOM. Cannot auto-calculate qty for items: {0}", [
+        missing.join(", "),
+      ])
+    );
+  }
+
+  if (conversion_missing.length) {
+    frappe.msgprint(
+      __("Technical UOM has no conversion factor on the Item. Cannot auto-calculate qty for items: {0}", [
+        conversion_missing.join(", "),
+      ])
+    );
+  }
+}
+
+// Ask once before measured quantities replace quantities already on the rows;
+// when declined, only rows without a quantity are filled.
+function confirm_replaced_quantities(results) {
+  const replaced = results.filter((result) => {
+    const row = locals["BOM Item"] && locals["BOM Item"][result.name];
+    return row && result.qty && flt(row.qty) > 0 && flt(row.qty) !== result.qty;
+  });
+  if (!replaced.length) return Promise.resolve();
+
+  return new Promise((resolve) => {
+    frappe.confirm(
+      __("Replace the quantity of {0} BOM Item rows with the measured quantity?", [replaced.length]),
+      () => resolve(),
+      () => {
+        replaced.forEach((result) => delete result.qty);
+        resolve();
+      }
+    );
+  });
+}
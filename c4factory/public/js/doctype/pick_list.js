@@ -8,6 +8,16 @@
 frappe.ui.form.on("Pick List", {
   async refresh(frm) {
     configure_work_order_pick_list_grid(frm);
+    subscribe_progress_events(frm);
+
+    if (!frm.is_new() && frm.doc.work_order && frm.doc.docstatus < 2) {
+      frm.add_custom_button(
+        __("Check Availability"),
+        () => open_availability_dialog(frm),
+        __("Factory")
+      );
+    }
+
     // نشتغل فقط لما تكون الوثيقة Submitted
     if (frm.doc.docstatus !== 1) return;
 
@@ -18,6 +28,12 @@ frappe.ui.form.on("Pick List", {
         __("Factory")
       );
 
+      frm.add_custom_button(
+        __("Scan Transfer"),
+        () => open_scan_transfer_dialog(frm),
+        __("Factory")
+      );
+
       frm.add_custom_button(
         __("Completed"),
         () => complete_pick_list(frm),
@@ -31,9 +47,20 @@ frappe.ui.form.on("Pick List", {
         () => open_additional_material_stock_entry(frm),
         __("Factory")
       );
+      frm.add_custom_button(
+        __("Additional Materials Summary"),
+        () =>
+          c4factory.additional_materials.show({
+            work_order: frm.doc.work_order,
+            pick_list: frm.doc.name,
+          }),
+        __("Factory")
+      );
     }
 
-    if (frm.doc.work_order && !(await is_work_order_operation_disabled(frm.doc.work_order))) {
+    // Only the operation flag is needed here; the full workspace is loaded
+    // when a dialog that shows it opens.
+    if (frm.doc.work_order && !(await is_operation_disabled(frm))) {
       frm.add_custom_button(
         __("Create Job Card"),
         () => create_job_cards_from_pick_list(frm),
@@ -43,6 +70,36 @@ frappe.ui.form.on("Pick List", {
   },
 });
 
+function subscribe_progress_events(frm) {
+  c4factory.progress.subscribe(
+    frm,
+    "c4_pick_list_progress",
+    "pick_list",
+    (frm, data) => apply_pick_list_progress(frm, data)
+  );
+}
+
+// Row balances from the server update the loaded workspace; a status change
+// redraws the Factory buttons from the local document.
+function apply_pick_list_progress(frm, values) {
+  const workspace = frm.__c4_workspace;
+  if (values.rows && workspace && workspace.pick_list.name === frm.doc.name) {
+    (workspace.rows || []).forEach((row) => {
+      const update = values.rows[row.pl_item_name];
+      if (update) Object.assign(row, update);
+    });
+  }
+
+  const changed = c4factory.progress.patch_fields(frm, {
+    status: values.status,
+    custom_manually_completed: values.custom_manually_completed,
+    modified: values.modified,
+  });
+  if (changed.includes("status")) {
+    frm.refresh();
+  }
+}
+
 function configure_work_order_pick_list_grid(frm) {
   if (!frm.doc.work_order) return;
 
@@ -88,16 +145,32 @@ function configure_work_order_pick_list_grid(frm) {
   frm.__c4_lock_pick_list_grid = setTimeout(lock_grid, 0);
 }
 
-async function is_work_order_operation_disabled(work_order) {
-  if (!work_order) return false;
-
+async function is_operation_disabled(frm) {
   const { message } = await frappe.db.get_value(
     "Work Order",
-    work_order,
+    frm.doc.work_order,
     "custom_disable_operation"
   );
+  return cint(message && message.custom_disable_operation) === 1;
+}
 
-  return !!(message && cint(message.custom_disable_operation));
+// Row balances, Work Order summary, operation flag, Sub Pick Lists and Job
+// Cards in one call; an unchanged workspace is confirmed by its etag only.
+async function load_pick_list_workspace(frm) {
+  if (frm.is_new()) return null;
+
+  const cached = frm.__c4_workspace;
+  const etag = cached && cached.pick_list.name === frm.doc.name ? cached.etag : null;
+  const { message } = await frappe.call({
+    method: "c4factory.api.pick_list_workspace.get_pick_list_workspace",
+    args: { pick_list: frm.doc.name, etag },
+  });
+  if (!message) return null;
+
+  if (!cint(message.not_modified)) {
+    frm.__c4_workspace = message;
+  }
+  return frm.__c4_workspace;
 }
 
 function complete_pick_list(frm) {
@@ -107,7 +180,7 @@ function complete_pick_list(frm) {
     ),
     async () => {
       try {
-        await frappe.call({
+        const { message } = await frappe.call({
           method: "c4factory.api.work_order_flow.complete_pick_list",
           args: {
             pick_list: frm.doc.name,
@@ -120,7 +193,10 @@ function complete_pick_list(frm) {
           message: __("Pick List completed. Remaining balances were waived."),
           indicator: "green",
         });
-        await frm.reload_doc();
+        apply_pick_list_progress(frm, {
+          status: (message && message.status) || "Completed",
+          custom_manually_completed: 1,
+        });
       } catch (e) {
         console.error(e);
         frappe.msgprint(__("Failed to complete Pick List."));
@@ -165,16 +241,10 @@ async function open_additional_material_stock_entry(frm) {
 
 async function open_partial_se_dialog(frm) {
   try {
-    const { message } = await frappe.call({
-      method: "c4factory.api.work_order_flow.get_pick_list_balance_rows",
-      args: {
-        pick_list: frm.doc.name,
-      },
-      freeze: true,
-      freeze_message: __("Loading balance rows..."),
-    });
-
-    const rows = message || [];
+    const workspace = await load_pick_list_workspace(frm);
+    const rows = ((workspace && workspace.rows) || [])
+      .filter((r) => flt(r.balance) > 0.000001)
+      .map((r) => ({ ...r, balance_qty: flt(r.balance) }));
     if (!rows.length) {
       frappe.msgprint(__("No remaining balance to transfer for this Pick List."));
       return;
@@ -309,6 +379,173 @@ async function submit_partial_se(frm, dialog, rows) {
   }
 }
 
+// ----------------------------------------------
+// Scan mode: item / batch / serial barcodes against a preloaded index of the
+// open rows; quantities are counted here and sent as one transfer.
+// ----------------------------------------------
+
+async function open_scan_transfer_dialog(frm) {
+  const { message: scan_index } = await frappe.call({
+    method: "c4factory.api.pick_list_workspace.get_pick_list_scan_index",
+    args: { pick_list: frm.doc.name },
+    freeze: true,
+    freeze_message: __("Loading Pick List rows..."),
+  });
+
+  if (!scan_index || !Object.keys(scan_index.rows || {}).length) {
+    frappe.msgprint(__("No remaining balance to transfer for this Pick List."));
+    return;
+  }
+
+  const scanned = {};
+  const scanned_serials = new Set();
+  // Per row: the serials and batch quantities to move, sent with the transfer
+  const scanned_details = {};
+
+  const d = new frappe.ui.Dialog({
+    title: __("Scan Transfer"),
+    size: "large",
+    fields: [
+      {
+        fieldname: "barcode",
+        fieldtype: "Data",
+        label: __("Scan Item / Batch / Serial Barcode"),
+        onchange: () => {
+          const code = (d.get_value("barcode") || "").trim();
+          if (!code) return;
+          d.set_value("barcode", "");
+          scan(code);
+        },
+      },
+      { fieldname: "scanned_html", fieldtype: "HTML" },
+    ],
+    primary_action_label: __("Create Stock Entry"),
+    primary_action: () => submit_scanned_transfer(frm, d, scanned, scanned_details),
+  });
+
+  const reject = (message) => {
+    frappe.utils.play_sound("error");
+    frappe.show_alert({ message, indicator: "red" });
+  };
+
+  const scan = (code) => {
+    const serial_row = scan_index.serials[code];
+    if (serial_row && scanned_serials.has(code)) {
+      reject(__("Serial No {0} was already scanned.", [code]));
+      return;
+    }
+
+    const candidates = serial_row ? [serial_row] : scan_index.index[code] || [];
+    if (!candidates.length) {
+      reject(__("{0} is not on an open row of this Pick List.", [code]));
+      return;
+    }
+
+    // First row of the code with balance left, in Pick List row order.
+    const remaining = (name) =>
+      flt(scan_index.rows[name].balance) - flt(scanned[name]);
+    const target = candidates.find((name) => remaining(name) > 0.000001);
+    if (!target) {
+      reject(__("Scanning {0} would exceed the Pick List balance.", [code]));
+      return;
+    }
+
+    const qty = Math.min(1, remaining(target));
+    const details = (scanned_details[target] = scanned_details[target] || {
+      serial_nos: [],
+      batches: {},
+    });
+    scanned[target] = flt(scanned[target]) + qty;
+    if (serial_row) {
+      scanned_serials.add(code);
+      details.serial_nos.push(code);
+    } else if (scan_index.batches && scan_index.batches[code]) {
+      details.batches[code] = flt(details.batches[code]) + qty;
+    }
+    render();
+  };
+
+  const render = () => {
+    const rows = Object.keys(scanned).map((name) => ({
+      name,
+      ...scan_index.rows[name],
+      qty: scanned[name],
+    }));
+
+    d.fields_dict.scanned_html.$wrapper.html(
+      rows.length
+        ? `<table class="table table-bordered table-sm" style="margin-top: 10px;">
+            <thead>
+              <tr>
+                <th>${__("Item Code")}</th>
+                <th>${__("Item Name")}</th>
+                <th style="width:120px; text-align:right;">${__("Scanned")}</th>
+                <th style="width:120px; text-align:right;">${__("Balance Qty")}</th>
+              </tr>
+            </thead>
+            <tbody>
+              ${rows
+                .map(
+                  (r) => `
+                <tr>
+                  <td>${frappe.utils.escape_html(r.item_code || "")}</td>
+                  <td>${frappe.utils.escape_html(r.item_name || "")}</td>
+                  <td style="text-align:right;">${frappe.format(r.qty, { fieldtype: "Float" })}</td>
+                  <td style="text-align:right;">${frappe.format(r.balance, { fieldtype: "Float" })}</td>
+                </tr>
+              `
+                )
+                .join("")}
+            </tbody>
+          </table>`
+        : `<p class="text-muted" style="margin-top: 10px;">${__("Scan a barcode to start.")}</p>`
+    );
+  };
+
+  render();
+  d.show();
+  setTimeout(() => d.fields_dict.barcode.set_focus(), 300);
+}
+
+async function submit_scanned_transfer(frm, dialog, scanned, scanned_details) {
+  const items = Object.entries(scanned)
+    .filter(([, qty]) => flt(qty) > 0)
+    .map(([pl_item_name, qty]) => ({
+      pl_item_name,
+      qty,
+      serial_nos: (scanned_details[pl_item_name] || {}).serial_nos || [],
+      batches: (scanned_details[pl_item_name] || {}).batches || {},
+    }));
+
+  if (!items.length) {
+    frappe.msgprint(__("Scan at least one item before creating the Stock Entry."));
+    return;
+  }
+
+  try {
+    const { message } = await frappe.call({
+      method: "c4factory.api.work_order_flow.make_partial_stock_entry_from_pick_list",
+      args: {
+        pick_list: frm.doc.name,
+        items_json: JSON.stringify(items),
+      },
+      freeze: true,
+      freeze_message: __("Creating Stock Entry..."),
+    });
+
+    if (!message) {
+      frappe.msgprint(__("Server did not return a Stock Entry name."));
+      return;
+    }
+
+    dialog.hide();
+    frappe.set_route("Form", "Stock Entry", message);
+  } catch (e) {
+    console.error(e);
+    frappe.msgprint(__("Failed to create Stock Entry. Check server error log."));
+  }
+}
+
 async function create_job_cards_from_pick_list(frm) {
   try {
     const { message } = await frappe.call({
@@ -342,3 +579,72 @@ async function create_job_cards_from_pick_list(frm) {
     frappe.msgprint(__("Failed to create Job Cards. Check server error log."));
   }
 }
+
+async function open_availability_dialog(frm) {
+  const { message } = await frappe.call({
+    method: "c4factory.api.pick_list_availability.get_pick_list_availability",
+    args: { pick_lists: [frm.doc.name] },
+    freeze: true,
+    freeze_message: __("Checking stock..."),
+  });
+
+  const rows = message || [];
+  if (!rows.length) {
+    frappe.msgprint(__("No remaining balance."));
+    return;
+  }
+
+  const short_rows = rows.filter((row) => flt(row.shortage_qty) > 0);
+  const body = rows
+    .map(
+      (row) => `
+        <tr class="${flt(row.shortage_qty) > 0 ? "text-danger" : ""}">
+          <td>${frappe.utils.escape_html(row.item_code)}</td>
+          <td>${frappe.utils.escape_html(row.warehouse || "")}</td>
+          <td class="text-right">${format_number(row.qty)}</td>
+          <td class="text-right">${format_number(row.available_qty)}</td>
+          <td class="text-right">${format_number(row.shortage_qty)}</td>
+        </tr>`
+    )
+    .join("");
+
+  const dialog = new frappe.ui.Dialog({
+    title: __("Stock Availability"),
+    size: "large",
+    fields: [{ fieldname: "availability", fieldtype: "HTML" }],
+    primary_action_label: short_rows.length ? __("Create Material Request") : __("Close"),
+    primary_action: async () => {
+      if (!short_rows.length) {
+        dialog.hide();
+        return;
+      }
+
+      const { message: material_request } = await frappe.call({
+        method: "c4factory.api.pick_list_availability.make_material_request_for_shortages",
+        args: { pick_lists: [frm.doc.name] },
+        freeze: true,
+        freeze_message: __("Creating Material Request..."),
+      });
+      dialog.hide();
+      if (material_request) {
+        frappe.set_route("Form", "Material Request", material_request);
+      }
+    },
+  });
+
+  dialog.fields_dict.availability.$wrapper.html(`
+    <table class="table table-bordered table-sm">
+      <thead>
+        <tr>
+          <th>${__("Item")}</th>
+          <th>${__("Warehouse")}</th>
+          <th class="text-right">${__("Required")}</th>
+          <th class="text-right">${__("Available")}</th>
+          <th class="text-right">${__("Short")}</th>
+        </tr>
+      </thead>
+      <tbody>${body}</tbody>
+    </table>
+  `);
+  dialog.show();
+}
@@ -0,0 +1,99 @@
+// c4factory • Pick List list — Picking Waves and shortage requests
+
+(() => {
+  const settings = (frappe.listview_settings["Pick List"] =
+    frappe.listview_settings["Pick List"] || {});
+  const erpnext_onload = settings.onload;
+
+  settings.onload = function (listview) {
+    if (erpnext_onload) erpnext_onload.call(this, listview);
+
+    listview.page.add_actions_menu_item(__("Create Picking Wave"), () => {
+      const pick_lists = listview.get_checked_items(true);
+      if (!pick_lists.length) {
+        frappe.msgprint(__("Select at least one Pick List."));
+        return;
+      }
+
+      frappe.call({
+        method:
+          "c4factory.c4factory.doctype.picking_wave.picking_wave.make_picking_wave",
+        args: { pick_lists: pick_lists },
+        freeze: true,
+        freeze_message: __("Creating Picking Wave..."),
+        callback: (r) => {
+          if (r.message) frappe.set_route("Form", "Picking Wave", r.message);
+        },
+      });
+    });
+
+    listview.page.add_actions_menu_item(__("Request Shortages"), () => {
+      const pick_lists = listview.get_checked_items(true);
+      if (!pick_lists.length) {
+        frappe.msgprint(__("Select at least one Pick List."));
+        return;
+      }
+
+      frappe.call({
+        method: "c4factory.api.pick_list_availability.make_material_request_for_shortages",
+        args: { pick_lists: pick_lists },
+        freeze: true,
+        freeze_message: __("Checking stock..."),
+        callback: (r) => {
+          if (r.message) frappe.set_route("Form", "Material Request", r.message);
+        },
+      });
+    });
+
+    listview.page.add_actions_menu_item(__("Create Job Cards"), () => {
+      const pick_lists = listview.get_checked_items(true);
+      if (!pick_lists.length) {
+        frappe.msgprint(__("Select at least one Pick List."));
+        return;
+      }
+
+      frappe.call({
+        method:
+          "c4factory.c4_manufacturing.job_card_generation.start_job_card_generation",
+        args: { pick_lists: pick_lists },
+        callback: () =>
+          frappe.show_alert({
+            message: __("Creating Job Cards for {0} Pick List(s) in the background.", [
+              pick_lists.length,
+            ]),
+            indicator: "blue",
+          }),
+      });
+    });
+
+    if (!settings.__c4_job_card_generation_bound) {
+      settings.__c4_job_card_generation_bound = true;
+      frappe.realtime.on("c4_job_card_generation", (data) =>
+        show_job_card_generation_results((data && data.results) || {})
+      );
+    }
+  };
+
+  function show_job_card_generation_results(results) {
+    const rows = Object.entries(results).map(([pick_list, result]) => {
+      let outcome;
+      if (result.error) {
+        outcome = `<span class="text-danger">${frappe.utils.escape_html(result.error)}</span>`;
+      } else if (result.skipped) {
+        outcome = `<span class="text-muted">${frappe.utils.escape_html(result.skipped)}</span>`;
+      } else {
+        outcome = __("{0} Job Card(s) created", [(result.created || []).length]);
+      }
+      return `<tr><td>${frappe.utils.escape_html(pick_list)}</td><td>${outcome}</td></tr>`;
+    });
+
+    frappe.msgprint({
+      title: __("Job Card Generation"),
+      message: `<table class="table table-bordered table-sm">
+        <thead><tr><th>${__("Pick List")}</th><th>${__("Result")}</th></tr></thead>
+        <tbody>${rows.join("")}</tbody>
+      </table>`,
+      wide: true,
+    });
+  }
+})();
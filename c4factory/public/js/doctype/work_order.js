@@ -6,6 +6,9 @@ frappe.ui.form.on("Work Order", {
     set_missing_source_warehouses(frm);
     hide_create_job_card_button(frm);
     refresh_material_transferred_qty(frm);
+    add_additional_materials_button(frm);
+    add_recompute_frozen_button(frm);
+    subscribe_progress_events(frm);
   },
   onload_post_render(frm) {
     configure_required_items_grid(frm);
@@ -65,25 +68,59 @@ function configure_required_items_grid(frm) {
   }, 0);
 }
 
+// Progress events carry the recomputed values; fields the Work Order buttons
+// and indicator depend on redraw the form from the local document.
+const PROGRESS_REDRAW_FIELDS = [
+  "status",
+  "material_transferred_for_manufacturing",
+  "produced_qty",
+];
+
+function subscribe_progress_events(frm) {
+  c4factory.progress.subscribe(
+    frm,
+    "c4_work_order_progress",
+    "work_order",
+    (frm, data) => apply_work_order_progress(frm, data)
+  );
+}
+
+function apply_work_order_progress(frm, values) {
+  const changed = c4factory.progress.patch_fields(frm, values);
+  if (!changed.some((fieldname) => PROGRESS_REDRAW_FIELDS.includes(fieldname))) {
+    return;
+  }
+
+  // The values are current; skip the transfer status read on this refresh.
+  frm.__c4_skip_transfer_sync = true;
+  frm.refresh();
+}
+
 async function refresh_material_transferred_qty(frm) {
+  if (frm.__c4_skip_transfer_sync) {
+    frm.__c4_skip_transfer_sync = false;
+    return;
+  }
   if (frm.doc.docstatus !== 1 || frm.__c4_syncing_transferred_qty) return;
 
   frm.__c4_syncing_transferred_qty = true;
   try {
+    // Read-only status; the server recomputes only when the version stamp
+    // of the Work Order's Stock Entries and Pick Lists moved.
     const { message } = await frappe.call({
-      method: "c4factory.api.work_order_flow.sync_work_order_material_transfer",
+      method: "c4factory.api.work_order_flow.get_work_order_transfer_status",
       args: { wo_name: frm.doc.name },
     });
-    const transferred = flt(message);
-    if (
-      Math.abs(
-        transferred - flt(frm.doc.material_transferred_for_manufacturing)
-      ) > 0.000001
-    ) {
-      frm.doc.material_transferred_for_manufacturing = transferred;
-      frm.refresh_field("material_transferred_for_manufacturing");
-      await frm.reload_doc();
-    }
+    if (!message) return;
+
+    frm.__c4_transfer_version = message.version;
+    apply_work_order_progress(frm, {
+      status: message.status,
+      material_transferred_for_manufacturing: flt(
+        message.material_transferred_for_manufacturing
+      ),
+      produced_qty: flt(message.produced_qty),
+    });
   } finally {
     frm.__c4_syncing_transferred_qty = false;
   }
@@ -110,35 +147,93 @@ function apply_required_items_grid_permissions(table_field) {
   grid.refresh();
 }
 
-async function set_missing_source_warehouses(frm) {
+function set_missing_source_warehouses(frm) {
   if (frm.doc.docstatus !== 0) return;
 
   const rows = frm.doc.required_items || frm.doc.items || [];
   for (const row of rows) {
     if (row.item_code && !row.source_warehouse) {
-      await set_source_warehouse_from_item_group(frm, row.doctype, row.name);
+      set_source_warehouse_from_item_group(frm, row.doctype, row.name);
     }
   }
 }
 
-async function set_source_warehouse_from_item_group(frm, cdt, cdn) {
+// Rows are collected for a short moment and resolved with one call, so a
+// pasted BOM or a company change costs one request instead of one per row.
+function set_source_warehouse_from_item_group(frm, cdt, cdn) {
   const row = locals[cdt] && locals[cdt][cdn];
   if (!row || !row.item_code || row.source_warehouse) return;
 
-  const { message: warehouse } = await frappe.call({
-    method: "c4factory.c4_manufacturing.work_order_hooks.get_default_source_warehouse",
+  frm.__c4_source_warehouse_queue = frm.__c4_source_warehouse_queue || new Map();
+  frm.__c4_source_warehouse_queue.set(cdn, cdt);
+
+  clearTimeout(frm.__c4_source_warehouse_timer);
+  frm.__c4_source_warehouse_timer = setTimeout(
+    () => resolve_queued_source_warehouses(frm),
+    150
+  );
+}
+
+async function resolve_queued_source_warehouses(frm) {
+  const queued = frm.__c4_source_warehouse_queue || new Map();
+  frm.__c4_source_warehouse_queue = new Map();
+
+  const rows = [...queued.entries()]
+    .map(([cdn, cdt]) => locals[cdt] && locals[cdt][cdn])
+    .filter((row) => row && row.item_code && !row.source_warehouse);
+  if (!rows.length) return;
+
+  const { message: warehouses } = await frappe.call({
+    method: "c4factory.c4_manufacturing.work_order_hooks.get_default_source_warehouses",
     args: {
-      item_code: row.item_code,
-      item_group: row.item_group,
-      company: frm.doc.company
+      items: rows.map((row) => ({
+        item_code: row.item_code,
+        item_group: row.item_group,
+        company: frm.doc.company
+      }))
     }
   });
 
-  if (warehouse && !locals[cdt][cdn].source_warehouse) {
-    await frappe.model.set_value(cdt, cdn, "source_warehouse", warehouse);
+  for (const [idx, row] of rows.entries()) {
+    const warehouse = (warehouses || [])[idx];
+    if (warehouse && !row.source_warehouse) {
+      await frappe.model.set_value(row.doctype, row.name, "source_warehouse", warehouse);
+    }
   }
 }
 
+function add_additional_materials_button(frm) {
+  if (frm.is_new() || frm.doc.docstatus !== 1) return;
+
+  frm.add_custom_button(
+    __("Additional Materials"),
+    () => c4factory.additional_materials.show({ work_order: frm.doc.name }),
+    __("View")
+  );
+}
+
+function add_recompute_frozen_button(frm) {
+  if (!frm.doc.custom_costing_frozen) return;
+  if (!frappe.user.has_role(["System Manager", "Manufacturing Manager"])) return;
+
+  frm.add_custom_button(
+    __("Recompute Frozen Costing"),
+    () => {
+      frappe.confirm(
+        __("Recompute costing and transfer totals of this finished Work Order from its entries?"),
+        () =>
+          frappe.call({
+            method: "c4factory.c4_manufacturing.work_order_freeze.recompute_frozen_work_order",
+            args: { work_order: frm.doc.name },
+            freeze: true,
+            callback: () => frm.reload_doc(),
+          })
+      );
+    },
+    __("Tools")
+  );
+}
+
 function hide_create_job_card_button(frm) {
   if (!frm.doc.custom_disable_operation) return;
 
@@ -0,0 +1,74 @@
+// c4factory • Work Order list — bulk Pick List creation
+
+(() => {
+  const settings = (frappe.listview_settings["Work Order"] =
+    frappe.listview_settings["Work Order"] || {});
+  const erpnext_onload = settings.onload;
+
+  settings.onload = function (listview) {
+    if (erpnext_onload) erpnext_onload.call(this, listview);
+
+    listview.page.add_actions_menu_item(__("Create Pick Lists"), () => {
+      const work_orders = listview.get_checked_items(true);
+      if (!work_orders.length) {
+        frappe.msgprint(__("Select at least one Work Order."));
+        return;
+      }
+
+      frappe.prompt(
+        [
+          {
+            fieldname: "submit",
+            label: __("Submit Pick Lists"),
+            fieldtype: "Check",
+            default: 0,
+          },
+        ],
+        (values) => {
+          frappe.call({
+            method: "c4factory.api.work_order_pick_list.enqueue_bulk_pick_lists",
+            args: {
+              work_orders: work_orders,
+              submit: values.submit ? 1 : 0,
+            },
+            callback: (r) => {
+              if (!r.message) return;
+              frappe.show_alert({
+                message: __("Creating Pick Lists for {0} Work Orders in the background", [
+                  r.message.work_orders,
+                ]),
+                indicator: "blue",
+              });
+            },
+          });
+        },
+        __("Create Pick Lists"),
+        __("Create")
+      );
+    });
+  };
+
+  const failures = [];
+
+  frappe.realtime.on("c4_bulk_pick_list_progress", (data) => {
+    if (!data || !data.total) return;
+
+    if (data.result && data.result.status === "Failed") {
+      failures.push(`${data.result.work_order}: ${data.result.error || __("Failed")}`);
+    }
+
+    frappe.show_progress(__("Creating Pick Lists"), data.done, data.total);
+    if (data.done < data.total) return;
+
+    frappe.hide_progress();
+    if (failures.length) {
+      frappe.msgprint({
+        title: __("Pick Lists not created"),
+        message: failures.splice(0).join("<br>"),
+        indicator: "orange",
+      });
+    } else {
+      frappe.show_alert({ message: __("Pick Lists created"), indicator: "green" });
+    }
+  });
+})();
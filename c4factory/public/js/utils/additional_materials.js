@@ -0,0 +1,75 @@
+// c4factory/public/js/utils/additional_materials.js
+// Work Order level view of every Sub Pick List (additional materials).
+
+frappe.provide("c4factory.additional_materials");
+
+c4factory.additional_materials.show = async function ({ work_order, pick_list }) {
+  const { message } = await frappe.call({
+    method:
+      "c4factory.c4factory.doctype.sub_pick_list.sub_pick_list.get_work_order_additional_materials",
+    args: { work_order, pick_list },
+    freeze: true,
+    freeze_message: __("Loading additional materials..."),
+  });
+
+  const data = message || {};
+  const sub_pick_lists = data.sub_pick_lists || [];
+  if (!sub_pick_lists.length) {
+    frappe.msgprint(__("No Sub Pick Lists found."));
+    return;
+  }
+
+  const wo_items = data.work_order_items || {};
+  const body = sub_pick_lists
+    .map((sub) =>
+      sub.items
+        .map((row, index) => {
+          const wo_item = wo_items[row.work_order_item] || {};
+          return `
+            <tr>
+              <td>${
+                index === 0
+                  ? `${frappe.utils.get_form_link("Sub Pick List", sub.name, true)}
+                     <div class="text-muted small">${__(sub.status || "")}</div>`
+                  : ""
+              }</td>
+              <td>${frappe.utils.escape_html(row.item_code)}</td>
+              <td>${frappe.utils.escape_html(row.source_warehouse || "")}</td>
+              <td class="text-right">${format_number(row.qty)}</td>
+              <td class="text-right">${format_number(row.transferred_qty)}</td>
+              <td class="text-right">${format_number(row.balance_qty)}</td>
+              <td class="text-right">${format_number(row.required_contribution_qty)}</td>
+              <td class="text-right">${
+                wo_item.required_qty !== undefined ? format_number(wo_item.required_qty) : ""
+              }</td>
+            </tr>`;
+        })
+        .join("")
+    )
+    .join("");
+
+  const dialog = new frappe.ui.Dialog({
+    title: __("Additional Materials"),
+    size: "extra-large",
+    fields: [{ fieldname: "materials", fieldtype: "HTML" }],
+  });
+
+  dialog.fields_dict.materials.$wrapper.html(`
+    <table class="table table-bordered table-sm">
+      <thead>
+        <tr>
+          <th>${__("Sub Pick List")}</th>
+          <th>${__("Item")}</th>
+          <th>${__("Source Warehouse")}</th>
+          <th class="text-right">${__("Qty")}</th>
+          <th class="text-right">${__("Transferred")}</th>
+          <th class="text-right">${__("Balance")}</th>
+          <th class="text-right">${__("Added To Required")}</th>
+          <th class="text-right">${__("WO Required Qty")}</th>
+        </tr>
+      </thead>
+      <tbody>${body}</tbody>
+    </table>
+  `);
+  dialog.show();
+};
@@ -0,0 +1,41 @@
+// c4factory/public/js/utils/progress_events.js
+// Realtime Work Order / Pick List progress pushed by the recompute pipeline.
+
+frappe.provide("c4factory.progress");
+
+// Subscribe a form to one progress event. The form object is reused for
+// every document of its DocType, so the handler is bound once and checks the
+// open document when the event arrives.
+c4factory.progress.subscribe = function (frm, event, name_key, apply) {
+  const flag = `__c4_${event}_bound`;
+  if (frm[flag]) return;
+  frm[flag] = true;
+
+  frappe.realtime.on(event, (data) => {
+    if (!data || !frm.doc || frm.is_new() || data[name_key] !== frm.doc.name) {
+      return;
+    }
+    apply(frm, data);
+  });
+};
+
+// Write changed values into the open document without marking it dirty.
+// Returns the fieldnames that changed.
+c4factory.progress.patch_fields = function (frm, values) {
+  const changed = [];
+  for (const [fieldname, value] of Object.entries(values || {})) {
+    if (value === undefined || value === null) continue;
+    if (fieldname === "modified" || !frm.fields_dict[fieldname]) continue;
+    if (frm.doc[fieldname] === value) continue;
+
+    frm.doc[fieldname] = value;
+    frm.refresh_field(fieldname);
+    changed.push(fieldname);
+  }
+
+  // Take over the server timestamp so a later save is not rejected as stale.
+  if (values && values.modified && !frm.is_dirty()) {
+    frm.doc.modified = values.modified;
+  }
+  return changed;
+};
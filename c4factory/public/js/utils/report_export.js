@@ -0,0 +1,64 @@
+// c4factory/public/js/utils/report_export.js
+// Background CSV / Excel export for large planning reports.
+
+frappe.provide("c4factory.report_export");
+
+c4factory.report_export.add_button = function (report) {
+  report.page.add_inner_button(
+    __("Export in Background"),
+    () => c4factory.report_export.open_dialog(report),
+    __("Export")
+  );
+};
+
+c4factory.report_export.open_dialog = function (report) {
+  const dialog = new frappe.ui.Dialog({
+    title: __("Export {0}", [__(report.report_name)]),
+    fields: [
+      {
+        fieldname: "file_format",
+        label: __("File Format"),
+        fieldtype: "Select",
+        options: ["CSV", "Excel"],
+        default: "CSV",
+        reqd: 1,
+      },
+    ],
+    primary_action_label: __("Export"),
+    primary_action: async (values) => {
+      await frappe.call({
+        method: "c4factory.api.report_export.enqueue_report_export",
+        args: {
+          report_name: report.report_name,
+          filters: report.get_filter_values(),
+          file_format: values.file_format,
+        },
+      });
+      dialog.hide();
+      frappe.show_alert({
+        message: __("Export queued. You will be notified when the file is ready."),
+        indicator: "blue",
+      });
+    },
+  });
+  dialog.show();
+};
+
+frappe.realtime.on("c4_report_export_ready", (data) => {
+  if (!data) return;
+
+  if (data.error) {
+    frappe.msgprint({ message: data.error, indicator: "red" });
+    return;
+  }
+
+  frappe.msgprint({
+    title: __("Export Ready"),
+    indicator: "green",
+    message: __("{0} rows of {1} exported. {2}", [
+      data.row_count || 0,
+      __(data.report_name),
+      `<a href="${encodeURI(data.file_url)}" target="_blank">${__("Download")}</a>`,
+    ]),
+  });
+});